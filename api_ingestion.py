@@ -0,0 +1,143 @@
+"""
+Service HTTP d'ingestion - Envoi de mesures et d'observations sans passer par l'interface
+
+    python api_ingestion.py --port 8502
+
+    POST /suivi          lot de mesures de suivi (JSON ou CSV)
+    POST /observations   lot d'observations (JSON ou CSV)
+    GET  /sante          disponibilité du service
+
+Partage le stockage de l'application Streamlit (data_manager, choisi par
+MAINTENANCE_STOCKAGE) ; validation et écriture groupée : data/ingestion.py.
+"""
+
+import os
+import json
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from outils import metriques
+from data.stockage import data_manager, REPLIQUE
+from data.depot import invalider_table
+from data import ingestion, versions
+
+PORT_INGESTION = int(os.environ.get("MAINTENANCE_INGESTION_PORT", "8502"))
+
+# Jeton attendu dans l'en-tête « Authorization: Bearer <jeton> » (aucun si vide)
+JETON = os.environ.get("MAINTENANCE_INGESTION_JETON", "")
+
+TAILLE_CORPS_MAX = 32 * 1024 * 1024  # octets
+
+TABLES = {
+    '/suivi': 'suivi',
+    '/observations': 'observations',
+}
+
+
+class _GestionnaireIngestion(BaseHTTPRequestHandler):
+    """Reçoit les lots, répond avec le rapport d'ingestion en JSON."""
+
+    protocol_version = "HTTP/1.1"
+
+    def _repondre(self, statut, contenu):
+        corps = json.dumps(contenu, ensure_ascii=False).encode('utf-8')
+        self.send_response(statut)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(corps)))
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/sante':
+            self._repondre(404, {'message': "❌ Adresse inconnue"})
+            return
+        self._repondre(200, {'message': "✅ Service d'ingestion disponible"})
+
+    def do_POST(self):
+        table = TABLES.get(self.path.split('?')[0])
+        longueur = int(self.headers.get('Content-Length') or 0)
+
+        if longueur > TAILLE_CORPS_MAX:
+            # Corps non lu : la connexion ne peut pas être réutilisée
+            self.close_connection = True
+            self._repondre(413, {'message': f"❌ Lot trop volumineux (max {TAILLE_CORPS_MAX} octets)"})
+            return
+
+        corps = self.rfile.read(longueur)
+
+        if JETON and self.headers.get('Authorization') != f"Bearer {JETON}":
+            self._repondre(401, {'message': "❌ Jeton d'accès invalide"})
+            return
+        if table is None:
+            self._repondre(404, {'message': "❌ Adresse inconnue (/suivi ou /observations)"})
+            return
+
+        format_csv = 'csv' in (self.headers.get('Content-Type') or '')
+
+        try:
+            with metriques.chronometre(f"ingestion_lecture_{table}"):
+                df = ingestion.lire_csv(corps) if format_csv else ingestion.lire_json(corps)
+            success, message, rapport = ingestion.ingerer(table, df)
+        except ValueError as e:
+            self._repondre(400, {'message': f"❌ {str(e)}"})
+            return
+        except Exception as e:
+            self._repondre(503, {'message': f"❌ Erreur lors de l'enregistrement : {str(e)}"})
+            return
+
+        if success:
+            statut = 200
+        elif message.startswith("⚠️"):
+            statut = 422  # toutes les lignes rejetées
+        else:
+            statut = 503
+
+        self._repondre(statut, {'message': message, **rapport})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def creer_serveur(hote='127.0.0.1', port=PORT_INGESTION):
+    """Initialise le stockage et crée le serveur d'ingestion (non démarré).
+
+    Returns:
+        ThreadingHTTPServer ; ``server_address`` donne le port effectif
+        (utile avec port=0).
+    """
+    data_manager.initialiser_fichiers()
+
+    # Réplique locale : instantanés et index des doublons suivent les autres postes
+    if REPLIQUE:
+        data_manager.demarrer_synchronisation(sur_changement=invalider_table)
+
+    # Référentiel et index des doublons à jour des écritures de l'application
+    versions.demarrer_surveillance(sur_changement=invalider_table)
+
+    ingestion.demarrer()
+    return ThreadingHTTPServer((hote, port), _GestionnaireIngestion)
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Service HTTP d'ingestion")
+    parser.add_argument("--hote", default="127.0.0.1",
+                        help="adresse d'écoute (0.0.0.0 pour le réseau)")
+    parser.add_argument("--port", type=int, default=PORT_INGESTION)
+    args = parser.parse_args()
+
+    serveur = creer_serveur(args.hote, args.port)
+
+    # Point d'accès Prometheus local (si MAINTENANCE_METRIQUES_PORT est défini)
+    metriques.demarrer_serveur()
+
+    print(f"Ingestion : http://{args.hote}:{serveur.server_address[1]}")
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        serveur.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,18 @@ Application Streamlit - Gestion des Rapports de Maintenance
 Version refactorisée avec navigation par onglets
 """
 
+import os
 import streamlit as st
-from ui import equipements, observations, telechargements, suppressions
-from data.data_manager import initialiser_fichiers
+from ui import equipements, observations, telechargements, suppressions, metriques, profilage
+from ui import tableau_de_bord
+from ui import boite_envoi as panneau_boite_envoi
+from ui import selecteur_equipement
+from outils.metriques import chronometre, instrumenter, ecrire_prometheus, demarrer_serveur
+from outils.profilage import profilage_actif, profiler_rerun
+from data.stockage import data_manager, REPLIQUE
+from data import boite_envoi, versions
+from data.depot import invalider_table, expedier_envois
+from data.cache import rapport_memoire, dates_invalides, precharger
 
 # =============================================================================
 # CONFIGURATION
@@ -22,42 +31,122 @@ st.set_page_config(
 # =============================================================================
 
 # Créer les fichiers de données au démarrage si nécessaire
-initialiser_fichiers()
+data_manager.initialiser_fichiers()
+
+# Réplique locale : suit les écritures des autres postes (MAINTENANCE_REPLIQUE=1)
+if REPLIQUE:
+    data_manager.demarrer_synchronisation(sur_changement=invalider_table)
+
+# Autres processus (workers, service d'ingestion) : leurs écritures invalident nos instantanés
+versions.demarrer_surveillance(sur_changement=invalider_table)
+
+# Boîte d'envoi : saisies écrites localement, envoyées en arrière-plan (MAINTENANCE_BOITE_ENVOI=1)
+if boite_envoi.ACTIVE:
+    boite_envoi.demarrer(expedier=expedier_envois)
+
+# Point d'accès Prometheus local (si MAINTENANCE_METRIQUES_PORT est défini)
+demarrer_serveur()
 
 # =============================================================================
 # INTERFACE PRINCIPALE
 # =============================================================================
 
+def mode_admin():
+    """Onglet Métriques visible avec ?admin=1 ou MAINTENANCE_ADMIN=1"""
+    return (
+        os.environ.get("MAINTENANCE_ADMIN") == "1"
+        or st.query_params.get("admin") == "1"
+    )
 
 
+@instrumenter("rerun")
 def main():
     """Point d'entrée principal de l'application"""
 
+    # Tables chargées en parallèle, en arrière-plan : chaque onglet
+    # s'affiche dès que les tables dont il a besoin sont prêtes
+    precharger()
+
     # En-tête
     st.title("🔧 Gestion des rapports de Maintenance")
     st.caption("Système de suivi des équipements et observations")
     st.markdown("---")
 
+    admin = mode_admin()
+
+    # Analyste courant : récents et favoris des sélecteurs d'équipement
+    selecteur_equipement.render_analyste()
+
     # Navigation par onglets
-    tab1, tab2, tab3, tab4 = st.tabs([
+    onglets = [
         "📦 Équipements",
         "📝 Observations",
+        "📊 Tableau de bord",
         "📥 Téléchargements",
         "🗑️ Suppressions"
-    ])
+    ]
+    if admin:
+        onglets.append("📈 Métriques")
+
+    tab1, tab2, tab3, tab4, tab5, *tab_admin = st.tabs(onglets)
 
-    with tab1:
+    with tab1, chronometre("render.equipements"):
         equipements.render()
 
-    with tab2:
+    with tab2, chronometre("render.observations"):
         observations.render()
 
-    with tab3:
+    with tab3, chronometre("render.tableau_de_bord"):
+        tableau_de_bord.render()
+
+    with tab4, chronometre("render.telechargements"):
         telechargements.render()
 
-    with tab4:
+    with tab5, chronometre("render.suppressions"):
         suppressions.render()
 
+    if admin:
+        with tab_admin[0]:
+            metriques.render()
+
+    # Saisies en attente d'envoi et conflits
+    if boite_envoi.ACTIVE:
+        panneau_boite_envoi.render()
+
+    # Dates invalides écartées au chargement
+    for table, libelle in (('observations', 'observation(s)'), ('suivi', 'mesure(s) de suivi')):
+        lignes_invalides = dates_invalides(table)
+        if not lignes_invalides.empty:
+            with st.sidebar.expander(f"⚠️ {len(lignes_invalides)} {libelle} à date invalide"):
+                st.caption("Lignes ignorées au chargement : corrigez la date dans le fichier source")
+                st.dataframe(lignes_invalides, use_container_width=True, hide_index=True)
+
+    # Mémoire : instantanés partagés par le processus vs état propre à la session
+    with st.sidebar.expander("🧠 Mémoire"):
+        rapport = rapport_memoire(st.session_state)
+        rapport['Ko'] = rapport['octets'] / 1024
+
+        st.dataframe(
+            rapport[['table', 'lignes', 'Ko', 'partage']],
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'table': 'Table',
+                'lignes': 'Lignes',
+                'Ko': st.column_config.NumberColumn('Mémoire (Ko)', format='%.1f'),
+                'partage': 'Partagée'
+            }
+        )
+        st.caption("Les tables partagées sont chargées une fois pour toutes les sessions")
+
+    # Fichier Prometheus (si MAINTENANCE_METRIQUES_FICHIER est défini)
+    ecrire_prometheus()
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Profilage du rerun sur demande (?profil=1 ou MAINTENANCE_PROFIL=1)
+    if profilage_actif(st.query_params.to_dict()):
+        profiler_rerun(main, st.session_state.to_dict(), st.query_params.to_dict())
+        profilage.render()
+    else:
+        main()
\ No newline at end of file
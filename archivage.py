@@ -0,0 +1,56 @@
+"""
+Archivage des partitions froides (stockage partitionné)
+
+    MAINTENANCE_STOCKAGE=partitions python archivage.py --annees 3
+
+Convertit les partitions dont la dernière date a plus de ``--annees`` ans
+en fichiers Parquet compressés (data_manager_partitions.archiver) et
+rapporte l'espace disque économisé et le gain de temps de chargement des
+données courantes. Les applications en cours rechargent leurs instantanés
+(signal de version).
+"""
+
+import sys
+import argparse
+import pandas as pd
+from data.stockage import data_manager, PARTITIONNE
+from data import versions
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Archivage des partitions froides")
+    parser.add_argument("--annees", type=int, default=None,
+                        help="ancienneté (années) au-delà de laquelle une partition est archivée")
+    args = parser.parse_args()
+
+    if not PARTITIONNE:
+        print("❌ Archivage disponible avec le stockage partitionné (MAINTENANCE_STOCKAGE=partitions)")
+        sys.exit(1)
+
+    data_manager.initialiser_fichiers()
+    annees = data_manager.ANNEES_CHAUDES if args.annees is None else args.annees
+    success, message, rapport = data_manager.archiver(annees)
+
+    if any(ligne['partitions'] for ligne in rapport):
+        versions.publier([ligne['table'] for ligne in rapport if ligne['partitions']])
+
+        df = pd.DataFrame(rapport)
+        df = pd.DataFrame({
+            'table': df['table'],
+            'partitions': df['partitions'],
+            'lignes': df['lignes'],
+            'Mo avant': df['octets_avant'] / 1024 / 1024,
+            'Mo après': df['octets_apres'] / 1024 / 1024,
+            'chargement avant (ms)': df['chargement_avant_s'] * 1000,
+            'chargement après (ms)': df['chargement_apres_s'] * 1000,
+        })
+        print(df.to_string(index=False, float_format=lambda x: f"{x:.1f}"))
+
+    print(message)
+    if not success:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Lancement des benchmarks : python -m benchmarks [options]
+
+Les résultats sont enregistrés en JSON (un fichier par exécution, nommé
+d'après la date et le commit) pour comparaison avec ``benchmarks.comparer``.
+"""
+
+import os
+import sys
+import json
+import argparse
+import platform
+from datetime import datetime
+import pandas as pd
+from benchmarks.generateur import generer_jeu
+from benchmarks.environnement import executer_dans_copie, commit_courant, chemin_resultats
+from benchmarks import pipelines
+
+
+def executer_stockage(parametres):
+    """Benchmarks de stockage, dans une copie temporaire du projet."""
+    return executer_dans_copie("benchmarks.stockage", parametres)
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Benchmarks des chemins de données")
+    parser.add_argument("--departements", type=int, default=8)
+    parser.add_argument("--equipements", type=int, default=2000)
+    parser.add_argument("--observations", type=int, default=50000)
+    parser.add_argument("--mesures", type=int, default=200000)
+    parser.add_argument("--longueur-texte", type=int, default=400,
+                        help="longueur moyenne des observations (caractères)")
+    parser.add_argument("--annees", type=int, default=5)
+    parser.add_argument("--graine", type=int, default=0)
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--equipements-export", type=int, default=10,
+                        help="équipements inclus dans l'export de suivi")
+    parser.add_argument("--mesures-stockees", type=int, default=2000,
+                        help="mesures de suivi écrites dans le stockage de test")
+    parser.add_argument("--sans-stockage", action="store_true",
+                        help="ne mesure que les pipelines en mémoire")
+    parser.add_argument("--sortie", help="fichier JSON de résultats")
+    args = parser.parse_args()
+
+    parametres_jeu = {
+        'nb_departements': args.departements,
+        'nb_equipements': args.equipements,
+        'nb_observations': args.observations,
+        'nb_mesures': args.mesures,
+        'longueur_texte': args.longueur_texte,
+        'annees': args.annees,
+        'graine': args.graine,
+    }
+
+    print("Génération du jeu synthétique...", file=sys.stderr)
+    jeu = generer_jeu(**parametres_jeu)
+
+    print("Pipelines en mémoire...", file=sys.stderr)
+    resultats = pipelines.executer(
+        jeu,
+        repetitions=args.repetitions,
+        nb_equipements_export=args.equipements_export
+    )
+
+    if not args.sans_stockage:
+        print("Stockage (copie temporaire)...", file=sys.stderr)
+        resultats.update(executer_stockage({
+            'jeu': parametres_jeu,
+            'repetitions': args.repetitions,
+            'mesures_stockees': args.mesures_stockees,
+        }))
+
+    commit = commit_courant()
+    horodatage = datetime.now()
+    rapport = {
+        'date': horodatage.isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'parametres': vars(args),
+        'resultats': resultats,
+    }
+
+    chemin = args.sortie or chemin_resultats("", horodatage, commit)
+    os.makedirs(os.path.dirname(os.path.abspath(chemin)), exist_ok=True)
+    with open(chemin, 'w', encoding='utf-8') as f:
+        json.dump(rapport, f, ensure_ascii=False, indent=2)
+
+    largeur = max(len(nom) for nom in resultats)
+    for nom, stats in resultats.items():
+        print(f"{nom:<{largeur}}  {stats['mediane_ms']:>10.2f} ms")
+    print(f"\nRésultats : {chemin}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Test de charge : python -m benchmarks.charge --sessions 10 --duree 60
+
+Simule des techniciens en parallèle sur les vrais onglets (enregistrement
+d'observation, tendances, export, suppression) et rapporte, par scénario,
+les percentiles de latence et le débit.
+"""
+
+import os
+import sys
+import json
+import argparse
+import platform
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from benchmarks.environnement import executer_dans_copie, commit_courant, chemin_resultats
+from benchmarks.scenarios import SCENARIOS
+
+PAQUETS_CHARGE = ("data", "outils", "benchmarks", "ui")
+
+MELANGE_DEFAUT = "consulter_tendances=4,enregistrer_observation=3,exporter_rapport=2,supprimer_observation=1"
+
+
+def lire_melange(texte):
+    """Mélange « scenario=poids,... » → {scenario: poids}."""
+    melange = {}
+    for element in texte.split(','):
+        nom, _, poids = element.partition('=')
+        nom = nom.strip()
+        if nom not in SCENARIOS:
+            raise argparse.ArgumentTypeError(
+                f"Scénario inconnu : {nom} (disponibles : {', '.join(SCENARIOS)})"
+            )
+        melange[nom] = float(poids or 1)
+    return melange
+
+
+def synthese(sessions):
+    """Percentiles de latence et débit par scénario.
+
+    Le débit est rapporté à la fenêtre pendant laquelle toutes les sessions
+    tournaient en même temps (après leurs échauffements respectifs).
+
+    Returns:
+        DataFrame scenario, executions, erreurs, p50/p90/p99/max_ms,
+        rerun_p50_ms, debit_par_s.
+    """
+    executions = pd.DataFrame([e for s in sessions for e in s['executions']])
+    if executions.empty:
+        return pd.DataFrame()
+
+    debut = max(s['debut'] for s in sessions)
+    fin = min(s['fin'] for s in sessions)
+    fenetre = executions[(executions['fin'] >= debut) & (executions['fin'] <= fin)]
+    duree_fenetre = max(fin - debut, 1e-9)
+
+    lignes = []
+    for nom, groupe in executions.groupby('scenario'):
+        reussies = groupe[groupe['erreur'].isna()]
+        durees = reussies['duree_ms'].to_numpy()
+        reruns = np.concatenate(reussies['reruns_ms'].to_numpy()) if len(reussies) else np.array([])
+        p50, p90, p99 = np.percentile(durees, [50, 90, 99]) if len(durees) else (np.nan,) * 3
+
+        lignes.append({
+            'scenario': nom,
+            'executions': len(groupe),
+            'erreurs': int(groupe['erreur'].notna().sum()),
+            'p50_ms': p50,
+            'p90_ms': p90,
+            'p99_ms': p99,
+            'max_ms': durees.max() if len(durees) else np.nan,
+            'rerun_p50_ms': np.median(reruns) if len(reruns) else np.nan,
+            'debit_par_s': (fenetre['scenario'] == nom).sum() / duree_fenetre,
+        })
+
+    return pd.DataFrame(lignes)
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Test de charge multi-sessions")
+    parser.add_argument("--sessions", type=int, default=10,
+                        help="techniciens simulés en parallèle")
+    parser.add_argument("--duree", type=float, default=60,
+                        help="durée de la mesure par session (s)")
+    parser.add_argument("--pause", type=float, default=0,
+                        help="temps de réflexion moyen entre deux scénarios (s)")
+    parser.add_argument("--echauffement", type=int, default=1,
+                        help="exécutions non mesurées de chaque scénario par session")
+    parser.add_argument("--melange", type=lire_melange, default=lire_melange(MELANGE_DEFAUT),
+                        help=f"poids des scénarios (défaut : {MELANGE_DEFAUT})")
+    parser.add_argument("--tous-coeurs", action="store_true",
+                        help="ne pas épingler les sessions sur un seul cœur")
+    parser.add_argument("--departements", type=int, default=8)
+    parser.add_argument("--equipements", type=int, default=2000)
+    parser.add_argument("--observations", type=int, default=50000)
+    parser.add_argument("--mesures-stockees", type=int, default=2000,
+                        help="mesures de suivi écrites dans le stockage de test")
+    parser.add_argument("--graine", type=int, default=0)
+    parser.add_argument("--sortie", help="fichier JSON de résultats")
+    args = parser.parse_args()
+
+    parametres = {
+        'jeu': {
+            'nb_departements': args.departements,
+            'nb_equipements': args.equipements,
+            'nb_observations': args.observations,
+            'nb_mesures': args.mesures_stockees,
+            'graine': args.graine,
+        },
+        'mesures_stockees': args.mesures_stockees,
+        'sessions': args.sessions,
+        'duree_s': args.duree,
+        'pause_s': args.pause,
+        'echauffement': args.echauffement,
+        'melange': args.melange,
+        'un_coeur': not args.tous_coeurs,
+        'graine': args.graine,
+    }
+
+    print(f"{args.sessions} session(s) pendant {args.duree:.0f} s...", file=sys.stderr)
+    sessions = executer_dans_copie("benchmarks.scenarios", parametres, PAQUETS_CHARGE)
+    resultats = synthese(sessions)
+
+    commit = commit_courant()
+    horodatage = datetime.now()
+    rapport = {
+        'date': horodatage.isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'parametres': parametres,
+        'resultats': resultats.to_dict(orient='records'),
+        'erreurs': sorted({
+            e['erreur'] for s in sessions for e in s['executions'] if e['erreur']
+        }),
+    }
+
+    chemin = args.sortie or chemin_resultats("charge_", horodatage, commit)
+    os.makedirs(os.path.dirname(os.path.abspath(chemin)), exist_ok=True)
+    with open(chemin, 'w', encoding='utf-8') as f:
+        json.dump(rapport, f, ensure_ascii=False, indent=2, default=float)
+
+    print(resultats.to_string(index=False, float_format=lambda x: f"{x:.1f}"))
+    for erreur in rapport['erreurs'][:10]:
+        print(f"❌ {erreur}")
+    print(f"\nRésultats : {chemin}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Collecteurs simulés : débit du service d'ingestion HTTP
+
+Le serveur (api_ingestion) tourne dans ce processus, épinglé sur un cœur ;
+chaque collecteur est un processus qui envoie ses lots en boucle sur une
+connexion persistante. Exécuté par ``python -m benchmarks.ingestion`` dans
+une copie temporaire du projet remplie avec le jeu synthétique.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import http.client
+import multiprocessing
+import numpy as np
+from benchmarks.generateur import generer_jeu, generer_observations, generer_suivi
+from benchmarks.stockage import preparer_stockage
+from api_ingestion import creer_serveur
+
+
+def _corps(lot, format_lot):
+    """Corps HTTP et type de contenu d'un lot (DataFrame)."""
+    lot = lot.assign(date=lot['date'].dt.strftime('%Y-%m-%d'))
+    if format_lot == 'csv':
+        return lot.to_csv(index=False).encode('utf-8'), 'text/csv'
+    return lot.to_json(orient='records', force_ascii=False).encode('utf-8'), 'application/json'
+
+
+def _preparer_lots(jeu, table, nb_lots, taille_lot, format_lot, graine):
+    """Lots inédits (absents du stockage) pour une table."""
+    nombre = nb_lots * taille_lot
+    if table == 'observations':
+        df = generer_observations(jeu['equipements'], nombre, longueur_texte=200, graine=graine + 100)
+    else:
+        df = generer_suivi(jeu['equipements'], nombre, graine=graine + 100)
+
+    return [_corps(df.iloc[i:i + taille_lot], format_lot) for i in range(0, nombre, taille_lot)]
+
+
+def envoyer(port, chemin, lots):
+    """Collecteur : envoie ses lots l'un après l'autre.
+
+    Returns:
+        Dictionnaire latences_ms, enregistrees, rejets, erreurs.
+    """
+    connexion = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+    resultat = {'latences_ms': [], 'enregistrees': 0, 'rejets': 0, 'erreurs': []}
+
+    for corps, type_contenu in lots:
+        debut = time.perf_counter()
+        connexion.request('POST', chemin, body=corps, headers={'Content-Type': type_contenu})
+        reponse = connexion.getresponse()
+        rapport = json.loads(reponse.read())
+        resultat['latences_ms'].append((time.perf_counter() - debut) * 1000)
+
+        resultat['enregistrees'] += rapport.get('enregistrees', 0)
+        resultat['rejets'] += len(rapport.get('rejets', []))
+        if reponse.status >= 500 or reponse.status == 400:
+            resultat['erreurs'].append(rapport['message'])
+
+    connexion.close()
+    return resultat
+
+
+def _initialiser_collecteur(coeurs):
+    """Collecteurs hors du cœur du serveur (si la machine en a plusieurs)."""
+    if coeurs and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, coeurs)
+
+
+def executer(parametres):
+    """Remplit le stockage, démarre le serveur puis mesure chaque (table, format).
+
+    Returns:
+        Liste de dictionnaires table, format, lignes, enregistrees, rejets,
+        duree_s, lignes_par_s, p50_ms, p99_ms, erreurs.
+    """
+    jeu = generer_jeu(**parametres['jeu'])
+    preparer_stockage(jeu, parametres['mesures_stockees'])
+
+    # Serveur sur un seul cœur, collecteurs sur les autres
+    coeurs_collecteurs = None
+    if hasattr(os, "sched_getaffinity"):
+        coeurs = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, {coeurs[0]})
+        coeurs_collecteurs = set(coeurs[1:]) or None
+
+    serveur = creer_serveur('127.0.0.1', 0)
+    port = serveur.server_address[1]
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+
+    resultats = []
+    contexte = multiprocessing.get_context("spawn")
+
+    with contexte.Pool(
+            processes=parametres['collecteurs'],
+            initializer=_initialiser_collecteur,
+            initargs=(coeurs_collecteurs,)
+    ) as pool:
+        for table in parametres['tables']:
+            for format_lot in parametres['formats']:
+                lots = _preparer_lots(
+                    jeu, table, parametres['collecteurs'] * parametres['lots'],
+                    parametres['taille_lot'], format_lot,
+                    parametres['jeu']['graine'] + len(resultats)
+                )
+                repartition = [
+                    (port, f"/{table}", lots[i::parametres['collecteurs']])
+                    for i in range(parametres['collecteurs'])
+                ]
+
+                debut = time.perf_counter()
+                collecteurs = pool.starmap(envoyer, repartition)
+                duree = time.perf_counter() - debut
+
+                latences = np.concatenate([c['latences_ms'] for c in collecteurs])
+                enregistrees = sum(c['enregistrees'] for c in collecteurs)
+                resultats.append({
+                    'table': table,
+                    'format': format_lot,
+                    'lignes': len(lots) * parametres['taille_lot'],
+                    'enregistrees': enregistrees,
+                    'rejets': sum(c['rejets'] for c in collecteurs),
+                    'duree_s': duree,
+                    'lignes_par_s': enregistrees / duree,
+                    'p50_ms': float(np.percentile(latences, 50)),
+                    'p99_ms': float(np.percentile(latences, 99)),
+                    'erreurs': sorted({e for c in collecteurs for e in c['erreurs']}),
+                })
+
+    serveur.shutdown()
+    return resultats
+
+
+if __name__ == "__main__":
+    # Paramètres transmis par benchmarks.ingestion (JSON), résultats sur stdout
+    print(json.dumps(executer(json.loads(sys.argv[1]))))
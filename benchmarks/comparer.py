@@ -0,0 +1,35 @@
+"""
+Comparaison de deux exécutions : python -m benchmarks.comparer ancien.json nouveau.json
+"""
+
+import sys
+import json
+
+
+def comparer(chemin_ancien, chemin_nouveau):
+    """Affiche les médianes des deux exécutions et leur rapport (nouveau / ancien)."""
+    with open(chemin_ancien, encoding='utf-8') as f:
+        ancien = json.load(f)
+    with open(chemin_nouveau, encoding='utf-8') as f:
+        nouveau = json.load(f)
+
+    noms = sorted(set(ancien['resultats']) | set(nouveau['resultats']))
+    largeur = max(len(nom) for nom in noms)
+
+    print(f"{'benchmark':<{largeur}}  {ancien['commit']:>10}  {nouveau['commit']:>10}  rapport")
+    for nom in noms:
+        avant = ancien['resultats'].get(nom, {}).get('mediane_ms')
+        apres = nouveau['resultats'].get(nom, {}).get('mediane_ms')
+        rapport = f"{apres / avant:6.2f}x" if avant and apres else "     —"
+        print(
+            f"{nom:<{largeur}}  "
+            f"{avant if avant is not None else float('nan'):>10.2f}  "
+            f"{apres if apres is not None else float('nan'):>10.2f}  {rapport}"
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print(__doc__.strip())
+        sys.exit(1)
+    comparer(sys.argv[1], sys.argv[2])
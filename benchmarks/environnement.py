@@ -0,0 +1,74 @@
+"""
+Environnement d'exécution des benchmarks : copie isolée du projet, commit courant
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import subprocess
+
+RACINE_PROJET = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DOSSIER_RESULTATS = os.path.join(RACINE_PROJET, "benchmarks", "resultats")
+
+# Paquets (ou modules) copiés : code uniquement, jamais les fichiers de données
+PAQUETS_COPIES = ("data", "outils", "benchmarks")
+
+
+def commit_courant():
+    """Identifiant court du commit courant (ou 'inconnu' hors dépôt git)."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=RACINE_PROJET, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "inconnu"
+
+
+def _ignorer_non_code(dossier, noms):
+    """Filtre de copie : sources Python et sous-paquets uniquement."""
+    return [
+        n for n in noms
+        if n in ('__pycache__', 'resultats')
+        or not (n.endswith('.py') or os.path.isdir(os.path.join(dossier, n)))
+    ]
+
+
+def executer_dans_copie(module, parametres, paquets=PAQUETS_COPIES):
+    """Lance ``python -m <module> '<parametres JSON>'`` dans une copie temporaire du projet.
+
+    Le module s'exécute avec la copie comme répertoire courant : les fichiers
+    de données qu'il crée ou modifie disparaissent avec elle.
+
+    Args:
+        module: Module à exécuter (ex. "benchmarks.stockage").
+        parametres: Paramètres sérialisables, transmis en JSON.
+        paquets: Paquets (dossiers) ou modules (.py) du projet à copier.
+
+    Returns:
+        Résultat JSON imprimé par le module sur sa dernière ligne de stdout.
+    """
+    with tempfile.TemporaryDirectory(prefix="bench_maintenance_") as copie:
+        for paquet in paquets:
+            source = os.path.join(RACINE_PROJET, paquet)
+            if os.path.isfile(source):
+                shutil.copy2(source, os.path.join(copie, paquet))
+                continue
+            shutil.copytree(source, os.path.join(copie, paquet), ignore=_ignorer_non_code)
+
+        sortie = subprocess.run(
+            [sys.executable, "-m", module, json.dumps(parametres)],
+            cwd=copie, stdout=subprocess.PIPE, text=True, check=True
+        ).stdout
+
+    # Dernière ligne : résultats JSON (data_manager peut écrire sur stdout)
+    return json.loads(sortie.strip().splitlines()[-1])
+
+
+def chemin_resultats(prefixe, horodatage, commit):
+    """Fichier de résultats ``benchmarks/resultats/<prefixe><date>_<commit>.json``."""
+    return os.path.join(
+        DOSSIER_RESULTATS, f"{prefixe}{horodatage.strftime('%Y%m%d_%H%M%S')}_{commit}.json"
+    )
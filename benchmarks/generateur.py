@@ -0,0 +1,144 @@
+"""
+Générateur de jeux de données synthétiques à l'échelle d'une usine
+"""
+
+import numpy as np
+import pandas as pd
+from data.constantes import POINTS_MESURE, NIVEAUX_IMPORTANCE
+
+# Importance optionnelle : None = non renseignée, comme à l'enregistrement
+IMPORTANCES = [None] + NIVEAUX_IMPORTANCE
+
+VOCABULAIRE = (
+    "vibration roulement palier accouplement réducteur moteur pompe "
+    "désalignement balourd jeu usure graissage lubrification échauffement "
+    "bruit anormal défaut bague externe interne cage engrènement denture "
+    "contrôle visuel mesure tendance hausse stable niveau alarme seuil "
+    "remplacement prévoir commande pièce arrêt programmé intervention "
+    "serrage fixation fissure corrosion fuite joint étanchéité courroie"
+).split()
+
+PREFIXES_DEPARTEMENTS = ["ELECTROLYSE", "FONDERIE", "CARBONE", "UTILITES", "PORT", "LAMINOIR"]
+
+
+def generer_referentiel(nb_departements=8, nb_equipements=2000, graine=0):
+    """Référentiel équipements réparti sur plusieurs départements.
+
+    Args:
+        nb_departements: Nombre de départements.
+        nb_equipements: Nombre total d'équipements.
+        graine: Graine aléatoire (jeux reproductibles).
+
+    Returns:
+        DataFrame id_equipement, departement.
+    """
+    rng = np.random.default_rng(graine)
+
+    departements = [
+        f"{PREFIXES_DEPARTEMENTS[i % len(PREFIXES_DEPARTEMENTS)]} {i // len(PREFIXES_DEPARTEMENTS) + 1}"
+        for i in range(nb_departements)
+    ]
+    # Tailles de départements inégales, comme sur site
+    poids = rng.dirichlet(np.full(nb_departements, 2.0))
+    dept_par_equip = rng.choice(nb_departements, size=nb_equipements, p=poids)
+
+    return pd.DataFrame({
+        'id_equipement': [f"{200 + d}-{i % 9 + 1}P-{i}" for i, d in enumerate(dept_par_equip)],
+        'departement': np.array(departements, dtype=object)[dept_par_equip],
+    })
+
+
+def _textes(rng, nombre, longueur_moyenne):
+    """Textes libres de longueur variable (loi log-normale autour de la moyenne)."""
+    longueurs = np.maximum(
+        1, rng.lognormal(np.log(max(longueur_moyenne, 1) / 7), 0.5, size=nombre).astype(int)
+    )
+    mots = rng.choice(VOCABULAIRE, size=int(longueurs.sum()))
+    bornes = np.concatenate([[0], np.cumsum(longueurs)])
+    return [' '.join(mots[bornes[i]:bornes[i + 1]]) for i in range(nombre)]
+
+
+def _dates(rng, nombre, annees):
+    """Dates uniformes sur les ``annees`` dernières années (jour près)."""
+    fin = pd.Timestamp.today().normalize()
+    jours = rng.integers(0, int(annees * 365), size=nombre)
+    return fin - pd.to_timedelta(jours, unit='D')
+
+
+def generer_observations(df_equipements, nb_observations=50000, longueur_texte=400,
+                         annees=5, nb_analystes=25, graine=0):
+    """Historique d'observations sur les équipements du référentiel.
+
+    Args:
+        df_equipements: Référentiel (``generer_referentiel``).
+        nb_observations: Nombre d'observations.
+        longueur_texte: Longueur moyenne (caractères) du texte d'observation ;
+            recommandation et travaux sont plus courts.
+        annees: Profondeur de l'historique.
+        nb_analystes: Nombre d'analystes distincts.
+        graine: Graine aléatoire.
+
+    Returns:
+        DataFrame id_equipement, date, observation, recommandation, travaux,
+        analyste, importance (dates datetime64, non triées).
+    """
+    rng = np.random.default_rng(graine + 1)
+    ids = df_equipements['id_equipement'].to_numpy()
+
+    return pd.DataFrame({
+        'id_equipement': rng.choice(ids, size=nb_observations),
+        'date': _dates(rng, nb_observations, annees),
+        'observation': _textes(rng, nb_observations, longueur_texte),
+        'recommandation': _textes(rng, nb_observations, longueur_texte // 2),
+        'travaux': _textes(rng, nb_observations, longueur_texte // 3),
+        'analyste': rng.choice([f"Analyste {i + 1}" for i in range(nb_analystes)], size=nb_observations),
+        'importance': rng.choice(np.array(IMPORTANCES, dtype=object), size=nb_observations),
+    })
+
+
+def generer_suivi(df_equipements, nb_mesures=200000, annees=5, graine=0):
+    """Mesures de suivi vibratoire sur les six points de mesure.
+
+    Args:
+        df_equipements: Référentiel (``generer_referentiel``).
+        nb_mesures: Nombre de lignes de mesure.
+        annees: Profondeur de l'historique.
+        graine: Graine aléatoire.
+
+    Returns:
+        DataFrame id_equipement, point_mesure, date, vitesse_rpm, twf_rms_g,
+        crest_factor, twf_peak_to_peak_g (dates datetime64, non triées).
+    """
+    rng = np.random.default_rng(graine + 2)
+    ids = df_equipements['id_equipement'].to_numpy()
+
+    twf_rms = rng.gamma(2.0, 0.4, size=nb_mesures)
+    crest = rng.normal(3.5, 0.8, size=nb_mesures).clip(1.0)
+
+    return pd.DataFrame({
+        'id_equipement': rng.choice(ids, size=nb_mesures),
+        'point_mesure': rng.choice(POINTS_MESURE, size=nb_mesures),
+        'date': _dates(rng, nb_mesures, annees),
+        'vitesse_rpm': rng.choice([750.0, 1000.0, 1500.0, 3000.0], size=nb_mesures)
+        * rng.normal(1.0, 0.01, size=nb_mesures),
+        'twf_rms_g': twf_rms.round(2),
+        'crest_factor': crest.round(2),
+        'twf_peak_to_peak_g': (twf_rms * crest * 2).round(2),
+    })
+
+
+def generer_jeu(nb_departements=8, nb_equipements=2000, nb_observations=50000,
+                nb_mesures=200000, longueur_texte=400, annees=5, graine=0):
+    """Jeu complet (référentiel, observations, suivi).
+
+    Returns:
+        Dictionnaire {'equipements', 'observations', 'suivi'} de DataFrames.
+    """
+    df_equipements = generer_referentiel(nb_departements, nb_equipements, graine)
+    return {
+        'equipements': df_equipements,
+        'observations': generer_observations(
+            df_equipements, nb_observations, longueur_texte, annees, graine=graine
+        ),
+        'suivi': generer_suivi(df_equipements, nb_mesures, annees, graine=graine),
+    }
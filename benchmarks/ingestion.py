@@ -0,0 +1,87 @@
+"""
+Débit d'ingestion : python -m benchmarks.ingestion --collecteurs 4 --taille-lot 500
+
+Lance le service HTTP d'ingestion sur un cœur dans une copie temporaire du
+projet, puis des collecteurs simulés qui envoient des lots de mesures et
+d'observations (JSON et CSV). Rapporte le débit en lignes par seconde et la
+latence des requêtes.
+"""
+
+import os
+import sys
+import json
+import argparse
+import platform
+from datetime import datetime
+import pandas as pd
+from benchmarks.environnement import executer_dans_copie, commit_courant, chemin_resultats
+
+PAQUETS_INGESTION = ("data", "outils", "benchmarks", "api_ingestion.py")
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Débit du service d'ingestion")
+    parser.add_argument("--collecteurs", type=int, default=4,
+                        help="collecteurs simulés en parallèle")
+    parser.add_argument("--lots", type=int, default=20,
+                        help="lots envoyés par collecteur, pour chaque table et format")
+    parser.add_argument("--taille-lot", type=int, default=500,
+                        help="lignes par lot")
+    parser.add_argument("--tables", nargs="+", default=["suivi", "observations"],
+                        choices=["suivi", "observations"])
+    parser.add_argument("--formats", nargs="+", default=["json", "csv"],
+                        choices=["json", "csv"])
+    parser.add_argument("--departements", type=int, default=8)
+    parser.add_argument("--equipements", type=int, default=2000)
+    parser.add_argument("--observations", type=int, default=50000)
+    parser.add_argument("--mesures-stockees", type=int, default=2000,
+                        help="mesures de suivi écrites dans le stockage de test")
+    parser.add_argument("--graine", type=int, default=0)
+    parser.add_argument("--sortie", help="fichier JSON de résultats")
+    args = parser.parse_args()
+
+    parametres = {
+        'jeu': {
+            'nb_departements': args.departements,
+            'nb_equipements': args.equipements,
+            'nb_observations': args.observations,
+            'nb_mesures': args.mesures_stockees,
+            'graine': args.graine,
+        },
+        'mesures_stockees': args.mesures_stockees,
+        'collecteurs': args.collecteurs,
+        'lots': args.lots,
+        'taille_lot': args.taille_lot,
+        'tables': args.tables,
+        'formats': args.formats,
+    }
+
+    print(f"{args.collecteurs} collecteur(s), lots de {args.taille_lot} lignes...", file=sys.stderr)
+    resultats = pd.DataFrame(executer_dans_copie("benchmarks.collecteurs", parametres, PAQUETS_INGESTION))
+
+    commit = commit_courant()
+    horodatage = datetime.now()
+    rapport = {
+        'date': horodatage.isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'parametres': parametres,
+        'resultats': resultats.to_dict(orient='records'),
+    }
+
+    chemin = args.sortie or chemin_resultats("ingestion_", horodatage, commit)
+    os.makedirs(os.path.dirname(os.path.abspath(chemin)), exist_ok=True)
+    with open(chemin, 'w', encoding='utf-8') as f:
+        json.dump(rapport, f, ensure_ascii=False, indent=2)
+
+    print(resultats.drop(columns='erreurs').to_string(index=False, float_format=lambda x: f"{x:.1f}"))
+    for erreur in sorted({e for erreurs in resultats['erreurs'] for e in erreurs})[:10]:
+        print(f"❌ {erreur}")
+    print(f"\nRésultats : {chemin}")
+
+
+if __name__ == "__main__":
+    main()
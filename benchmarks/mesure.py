@@ -0,0 +1,36 @@
+"""
+Chronométrage des benchmarks
+"""
+
+import time
+import numpy as np
+
+
+def mesurer(fonction, repetitions=5, echauffement=1):
+    """Exécute ``fonction`` plusieurs fois et résume les durées (ms).
+
+    Args:
+        fonction: Fonction sans argument à mesurer.
+        repetitions: Nombre d'exécutions mesurées.
+        echauffement: Exécutions préalables non mesurées.
+
+    Returns:
+        Dictionnaire repetitions, min_ms, mediane_ms, moyenne_ms, max_ms.
+    """
+    for _ in range(echauffement):
+        fonction()
+
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        durees.append((time.perf_counter() - debut) * 1000)
+
+    durees = np.array(durees)
+    return {
+        'repetitions': repetitions,
+        'min_ms': float(durees.min()),
+        'mediane_ms': float(np.median(durees)),
+        'moyenne_ms': float(durees.mean()),
+        'max_ms': float(durees.max()),
+    }
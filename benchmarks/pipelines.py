@@ -0,0 +1,105 @@
+"""
+Benchmarks en mémoire : filtres des onglets, exports Excel, doublons, import
+"""
+
+import pandas as pd
+from benchmarks.generateur import POINTS_MESURE
+from benchmarks.mesure import mesurer
+from data import data_manager
+from data.doublons import hash_observations, hash_suivi
+from data.filtres import (
+    filtrer_equipements,
+    filtrer_observations,
+    filtrer_suivi,
+    dates_disponibles
+)
+from data.import_equipements import calculer_diff_equipements
+
+
+def _comme_au_chargement(df):
+    """Tri par date, comme les instantanés de data.cache."""
+    return df.sort_values('date', kind='stable').reset_index(drop=True)
+
+
+def executer(jeu, repetitions=5, nb_equipements_export=10):
+    """Mesure les pipelines de données sur un jeu synthétique.
+
+    Args:
+        jeu: Jeu de ``generateur.generer_jeu``.
+        repetitions: Répétitions par benchmark.
+        nb_equipements_export: Équipements inclus dans l'export de suivi
+            (un onglet et des graphiques par équipement).
+
+    Returns:
+        Dictionnaire {nom du benchmark: statistiques de durée}.
+    """
+    df_equipements = jeu['equipements']
+    df_observations = _comme_au_chargement(jeu['observations'])
+    df_suivi = _comme_au_chargement(jeu['suivi'])
+
+    departements = sorted(df_equipements['departement'].unique())
+    ids = df_equipements['id_equipement'].tolist()
+    fin = df_suivi['date'].iloc[-1]
+    un_an = fin - pd.Timedelta(days=365)
+
+    id_frequent = df_suivi['id_equipement'].value_counts().index[0]
+    obs_equipement = df_observations[df_observations['id_equipement'] == id_frequent]
+
+    # Liste importée : moitié du référentiel, quelques départements changés, nouveaux ID
+    df_import = pd.concat([
+        df_equipements.sample(frac=0.5, random_state=0),
+        pd.DataFrame({
+            'id_equipement': [f"NOUVEAU-{i}" for i in range(300)],
+            'departement': departements[0],
+        }),
+    ], ignore_index=True)
+    df_import.loc[:50, 'departement'] = departements[-1]
+
+    ids_export = ids[:nb_equipements_export]
+
+    benchmarks = {
+        # Onglet Équipements
+        'filtre.equipements': lambda: filtrer_equipements(df_equipements, departements[:2]),
+
+        # Onglet Observations (tendances : un équipement, un point)
+        'filtre.tendances': lambda: filtrer_suivi(
+            df_suivi, equipements=[id_frequent], points=[POINTS_MESURE[0]]
+        ).tail(22),
+
+        # Onglet Téléchargements
+        'filtre.telechargements_observations': lambda: filtrer_observations(
+            df_observations, df_equipements,
+            departements=departements[:1], date_debut=un_an, date_fin=fin
+        ),
+        'filtre.telechargements_suivi': lambda: filtrer_suivi(
+            df_suivi, equipements=ids[:10], points=POINTS_MESURE[:2],
+            date_debut=un_an, date_fin=fin
+        ),
+
+        # Onglet Suppressions
+        'filtre.suppressions_dates': lambda: dates_disponibles(obs_equipement),
+
+        # Doublons et import
+        'doublons.hash_observations': lambda: hash_observations(df_observations),
+        'doublons.hash_suivi': lambda: hash_suivi(df_suivi),
+        'import.diff_equipements': lambda: calculer_diff_equipements(df_equipements, df_import),
+
+        # Exports Excel
+        'export.equipements': lambda: data_manager.exporter_equipements_excel(df_equipements),
+        'export.observations': lambda: data_manager.exporter_observations_excel(
+            filtrer_observations(
+                df_observations, df_equipements,
+                departements=departements[:1], date_debut=un_an, date_fin=fin
+            ),
+            df_equipements
+        ),
+        'export.suivi': lambda: data_manager.exporter_suivi_excel(
+            filtrer_suivi(df_suivi, equipements=ids_export),
+            df_equipements
+        ),
+    }
+
+    return {
+        nom: mesurer(fonction, repetitions=repetitions)
+        for nom, fonction in benchmarks.items()
+    }
@@ -0,0 +1,237 @@
+"""
+Scénarios de charge : sessions de techniciens simulées avec l'API de test de Streamlit
+
+Chaque session pilote les vraies fonctions ``render`` des onglets via
+``AppTest`` (widgets, formulaires, boutons) et chronomètre chaque rerun.
+Exécuté par ``python -m benchmarks.charge`` dans une copie temporaire du
+projet remplie avec le jeu synthétique.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import itertools
+import multiprocessing
+from streamlit.logger import set_log_level
+from streamlit.testing.v1 import AppTest
+from benchmarks.generateur import generer_jeu
+from benchmarks.stockage import preparer_stockage
+
+# Script minimal par onglet : la fonction render réelle, rien d'autre
+SCRIPT_ONGLET = "from ui import {onglet}\n{onglet}.render()\n"
+
+DELAI_RERUN = 120  # secondes
+
+
+# =============================================================================
+# SCÉNARIOS
+# =============================================================================
+
+def _choisir(rng, options):
+    """Option tirée au hasard (les listes vides lèvent une erreur explicite)."""
+    if not options:
+        raise LookupError("Aucune option disponible")
+    return rng.choice(list(options))
+
+
+def _bouton(at, libelle):
+    """Bouton (ou bouton de formulaire) d'après son libellé."""
+    for bouton in at.button:
+        if bouton.label == libelle:
+            return bouton
+    raise LookupError(f"Bouton introuvable : {libelle}")
+
+
+def enregistrer_observation(at, rng, numero):
+    """Onglet Observations : département, équipement, saisie et enregistrement."""
+    yield at.run
+    yield at.selectbox(key="dept_select_obs").select(
+        _choisir(rng, at.selectbox(key="dept_select_obs").options)
+    ).run
+    at.selectbox(key="form_equip").select(_choisir(rng, at.selectbox(key="form_equip").options))
+    at.text_area(key="form_obs").input(f"Observation de charge {numero} : vibration stable")
+    at.text_area(key="form_reco").input("Surveiller la tendance")
+    at.text_input(key="form_analyste").input(f"Session {os.getpid()}")
+    yield _bouton(at, "✅ Enregistrer").click().run
+
+
+def consulter_tendances(at, rng, numero):
+    """Onglet Observations : équipement, point de mesure, mode et variables du graphique."""
+    yield at.run
+    yield at.selectbox(key="id_equip_tendances").select(
+        _choisir(rng, at.selectbox(key="id_equip_tendances").options)
+    ).run
+    yield at.selectbox(key="point_mesure_tendances").select(
+        _choisir(rng, at.selectbox(key="point_mesure_tendances").options)
+    ).run
+    yield at.radio(key="mode_filtrage_tendances").set_value(
+        _choisir(rng, at.radio(key="mode_filtrage_tendances").options)
+    ).run
+    yield at.multiselect(key="variables_tendances").set_value(
+        ['twf_rms_g', 'crest_factor', 'twf_peak_to_peak_g']
+    ).run
+
+
+def exporter_rapport(at, rng, numero):
+    """Onglet Téléchargements : rapport d'observations d'un département (export Excel au rendu)."""
+    yield at.run
+    yield at.multiselect(key="dl_obs_dept").set_value(
+        [_choisir(rng, at.multiselect(key="dl_obs_dept").options)]
+    ).run
+    yield at.multiselect(key="dl_obs_dept").set_value([]).run
+
+
+def supprimer_observation(at, rng, numero):
+    """Onglet Suppressions : sélection d'une observation, demande puis confirmation."""
+    yield at.run
+    yield at.selectbox(key="dept_obs_suppr").select(
+        _choisir(rng, at.selectbox(key="dept_obs_suppr").options)
+    ).run
+    yield at.selectbox(key="suppr_obs_equip").select(
+        _choisir(rng, at.selectbox(key="suppr_obs_equip").options)
+    ).run
+    # Confirmation restée ouverte (scénario précédent interrompu) : on la reprend
+    if not at.session_state["confirm_obs_delete"]:
+        yield at.button(key="btn_suppr_obs_initial").click().run
+    yield at.button(key="btn_confirm_obs").click().run
+
+
+# Scénario : (onglet piloté, étapes)
+SCENARIOS = {
+    'enregistrer_observation': ('observations', enregistrer_observation),
+    'consulter_tendances': ('observations', consulter_tendances),
+    'exporter_rapport': ('telechargements', exporter_rapport),
+    'supprimer_observation': ('suppressions', supprimer_observation),
+}
+
+
+# =============================================================================
+# SESSIONS
+# =============================================================================
+
+def _erreur_affichee(at):
+    """Exception ou message d'erreur affiché par l'onglet, sinon None."""
+    if at.exception:
+        return at.exception[0].message
+    if at.error:
+        return at.error[0].value
+    return None
+
+
+def executer_scenario(at, rng, nom, numero):
+    """Joue un scénario et chronomètre chacun de ses reruns.
+
+    Returns:
+        Dictionnaire scenario, duree_ms, reruns_ms, erreur (None si réussi).
+    """
+    _, etapes = SCENARIOS[nom]
+    reruns_ms = []
+    erreur = None
+
+    try:
+        for rerun in etapes(at, rng, numero):
+            debut = time.perf_counter()
+            rerun(timeout=DELAI_RERUN)
+            reruns_ms.append((time.perf_counter() - debut) * 1000)
+
+            erreur = _erreur_affichee(at)
+            if erreur:
+                break
+    except (LookupError, ValueError, KeyError) as e:
+        erreur = f"{type(e).__name__}: {e}"
+
+    return {
+        'scenario': nom,
+        'duree_ms': sum(reruns_ms),
+        'reruns_ms': reruns_ms,
+        'erreur': erreur,
+    }
+
+
+def _initialiser_processus(coeur):
+    """Initialisation d'un processus de session : logs réduits, épinglage sur un cœur (Linux)."""
+    set_log_level("error")
+    if coeur is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {coeur})
+
+
+def simuler_session(numero, melange, duree_s, pause_s, echauffement, graine):
+    """Une session de technicien : scénarios tirés selon le mélange, pendant duree_s.
+
+    Chaque session garde un ``AppTest`` par onglet (état de session conservé
+    entre scénarios, comme un navigateur resté ouvert).
+
+    Returns:
+        Dictionnaire debut, fin (horloge murale) et executions (hors échauffement).
+    """
+    rng = random.Random(graine + numero)
+    noms = list(melange)
+    poids = [melange[nom] for nom in noms]
+    applications = {}
+    compteur = itertools.count()
+    executions = []
+
+    def jouer(nom):
+        onglet, _ = SCENARIOS[nom]
+        if onglet not in applications:
+            applications[onglet] = AppTest.from_string(
+                SCRIPT_ONGLET.format(onglet=onglet), default_timeout=DELAI_RERUN
+            )
+        return executer_scenario(applications[onglet], rng, nom, next(compteur))
+
+    # Échauffement : imports, premier chargement des tables, premiers rendus
+    for nom in noms:
+        for _ in range(echauffement):
+            jouer(nom)
+
+    debut = time.time()
+    while time.time() - debut < duree_s:
+        execution = jouer(rng.choices(noms, weights=poids)[0])
+        execution['fin'] = time.time()
+        executions.append(execution)
+
+        if pause_s:
+            # Temps de réflexion du technicien (loi exponentielle)
+            time.sleep(rng.expovariate(1 / pause_s))
+
+    return {'debut': debut, 'fin': time.time(), 'executions': executions}
+
+
+def executer(parametres):
+    """Remplit le stockage puis lance les sessions en parallèle (un processus chacune).
+
+    ``AppTest`` remplace des objets globaux de Streamlit le temps d'un rerun :
+    deux sessions ne peuvent pas tourner dans le même processus. Par défaut,
+    tous les processus sont épinglés sur un même cœur pour reproduire la
+    capacité de calcul d'un serveur Streamlit (un processus, un GIL).
+
+    Returns:
+        Liste des résultats de ``simuler_session``.
+    """
+    jeu = generer_jeu(**parametres['jeu'])
+    preparer_stockage(jeu, parametres['mesures_stockees'])
+
+    coeur = None
+    if parametres['un_coeur'] and hasattr(os, "sched_getaffinity"):
+        coeur = min(os.sched_getaffinity(0))
+
+    arguments = [
+        (numero, parametres['melange'], parametres['duree_s'], parametres['pause_s'],
+         parametres['echauffement'], parametres['graine'])
+        for numero in range(parametres['sessions'])
+    ]
+
+    contexte = multiprocessing.get_context("spawn")
+    with contexte.Pool(
+            processes=parametres['sessions'],
+            initializer=_initialiser_processus,
+            initargs=(coeur,)
+    ) as pool:
+        return pool.starmap(simuler_session, arguments)
+
+
+if __name__ == "__main__":
+    # Paramètres transmis par benchmarks.charge (JSON), résultats sur stdout
+    print(json.dumps(executer(json.loads(sys.argv[1]))))
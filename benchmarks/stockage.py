@@ -0,0 +1,103 @@
+"""
+Benchmarks du stockage : charger_*, sauvegarder_*, supprimer_equipement
+
+Exécuté par ``python -m benchmarks`` dans une copie temporaire du projet
+(sous-processus) : les fichiers de données réels ne sont jamais touchés.
+"""
+
+import os
+import sys
+import json
+import itertools
+from datetime import timedelta
+import pandas as pd
+from benchmarks.generateur import generer_jeu, POINTS_MESURE
+from benchmarks.mesure import mesurer
+from data import data_manager
+from data.import_equipements import FICHIER_EQUIPEMENTS
+from data.import_observations import FICHIER_OBSERVATIONS, COLONNES_OBSERVATIONS
+
+
+def preparer_stockage(jeu, nb_mesures_stockees):
+    """Remplit le stockage de la copie avec le jeu synthétique.
+
+    Référentiel et observations sont écrits directement aux emplacements
+    documentés ; les mesures de suivi passent par ``sauvegarder_suivi``
+    (emplacement non documenté), d'où un volume limité.
+    """
+    racine = os.path.abspath(os.getcwd())
+    if not os.path.abspath(FICHIER_EQUIPEMENTS).startswith(racine):
+        raise RuntimeError("Le stockage doit être dans la copie temporaire du projet")
+
+    data_manager.initialiser_fichiers()
+
+    jeu['equipements'].to_excel(FICHIER_EQUIPEMENTS, index=False)
+
+    if os.path.exists(FICHIER_OBSERVATIONS):
+        colonnes = list(pd.read_csv(FICHIER_OBSERVATIONS, nrows=0).columns)
+    else:
+        colonnes = COLONNES_OBSERVATIONS
+
+    df_obs = jeu['observations']
+    df_obs.assign(date=df_obs['date'].dt.strftime('%Y-%m-%d')).reindex(
+        columns=colonnes
+    ).to_csv(FICHIER_OBSERVATIONS, index=False)
+
+    for ligne in jeu['suivi'].head(nb_mesures_stockees).itertuples(index=False):
+        data_manager.sauvegarder_suivi(
+            ligne.id_equipement, ligne.point_mesure, ligne.date.date(),
+            ligne.vitesse_rpm, ligne.twf_rms_g, ligne.crest_factor,
+            ligne.twf_peak_to_peak_g
+        )
+
+
+def executer(jeu, repetitions=5, nb_mesures_stockees=2000):
+    """Mesure les fonctions de stockage de data_manager.
+
+    Returns:
+        Dictionnaire {nom du benchmark: statistiques de durée}.
+    """
+    preparer_stockage(jeu, nb_mesures_stockees)
+
+    ids = jeu['equipements']['id_equipement'].tolist()
+    compteur = itertools.count()
+    a_supprimer = iter(ids)
+    departement = jeu['equipements']['departement'].iloc[0]
+    aujourd_hui = pd.Timestamp.today().date()
+
+    benchmarks = {
+        'stockage.charger_equipements': data_manager.charger_equipements,
+        'stockage.charger_observations': data_manager.charger_observations,
+        'stockage.charger_suivi': data_manager.charger_suivi,
+        'stockage.sauvegarder_equipement': lambda: data_manager.sauvegarder_equipement(
+            f"BENCH-{next(compteur)}", departement
+        ),
+        'stockage.sauvegarder_observation': lambda: data_manager.sauvegarder_observation(
+            ids[0], aujourd_hui, f"Observation de benchmark {next(compteur)}",
+            "", "", "Benchmark", None
+        ),
+        'stockage.sauvegarder_suivi': lambda: data_manager.sauvegarder_suivi(
+            ids[0], POINTS_MESURE[next(compteur) % len(POINTS_MESURE)],
+            aujourd_hui - timedelta(days=next(compteur)), 1500.0, 0.8, 3.2, 5.1
+        ),
+        'stockage.supprimer_equipement': lambda: data_manager.supprimer_equipement(
+            next(a_supprimer)
+        ),
+    }
+
+    return {
+        nom: mesurer(fonction, repetitions=repetitions)
+        for nom, fonction in benchmarks.items()
+    }
+
+
+if __name__ == "__main__":
+    # Paramètres transmis par benchmarks.__main__ (JSON), résultats sur stdout
+    parametres = json.loads(sys.argv[1])
+    jeu = generer_jeu(**parametres['jeu'])
+    resultats = executer(
+        jeu,
+        repetitions=parametres['repetitions'],
+        nb_mesures_stockees=parametres['mesures_stockees']
+    )
+    print(json.dumps(resultats))
@@ -0,0 +1,284 @@
+"""
+Agrégats hebdomadaires et mensuels des mesures de suivi (tendances longues)
+
+Pour chaque série (équipement, point de mesure) et chaque période, les
+agrégats conservent par variable : minimum, maximum, somme, somme des carrés,
+nombre de valeurs et dernière valeur. Moyenne et écart-type s'en déduisent,
+et deux agrégats d'une même période se combinent sans relire les mesures.
+
+Les niveaux sont construits une fois par processus à partir de l'instantané
+de suivi (et des archives du stockage partitionné), puis complétés à chaque
+enregistrement (seules les séries touchées sont recalculées). Une
+suppression, un remplacement ou une écriture d'un autre processus les
+invalide : reconstruction au prochain accès.
+"""
+
+import threading
+import numpy as np
+import pandas as pd
+from outils import metriques
+from data import cache
+
+VARIABLES = ['vitesse_rpm', 'twf_rms_g', 'crest_factor', 'twf_peak_to_peak_g']
+
+NIVEAU_BRUT = "brut"
+NIVEAU_SEMAINE = "semaine"
+NIVEAU_MOIS = "mois"
+
+# Période pandas de chaque niveau agrégé
+PERIODES = {
+    NIVEAU_SEMAINE: 'W-SUN',
+    NIVEAU_MOIS: 'M',
+}
+
+# Choix du niveau selon la durée affichée (jours) : au-delà du seuil, niveau suivant
+SEUIL_BRUT_JOURS = 180
+SEUIL_SEMAINE_JOURS = 3 * 365
+
+_verrou = threading.Lock()
+_niveaux = {NIVEAU_SEMAINE: None, NIVEAU_MOIS: None}
+
+
+def _colonne(variable, statistique):
+    return f"{variable}_{statistique}"
+
+
+def _agreger(df, niveau):
+    """Agrégats partiels d'un ensemble de mesures.
+
+    Args:
+        df: Mesures (id_equipement, point_mesure, date, variables).
+        niveau: NIVEAU_SEMAINE ou NIVEAU_MOIS.
+
+    Returns:
+        DataFrame indexé par (id_equipement, point_mesure, periode) ; periode
+        est la date de début de la période. Colonne ``date_derniere`` : date
+        de la dernière mesure de la période.
+    """
+    dates = pd.to_datetime(df['date'], errors='coerce')
+    valides = dates.notna().to_numpy()
+
+    mesures = pd.DataFrame({
+        'id_equipement': df['id_equipement'].astype(str).to_numpy()[valides],
+        'point_mesure': df['point_mesure'].astype(str).to_numpy()[valides],
+        'periode': dates[valides].dt.to_period(PERIODES[niveau]).dt.start_time.to_numpy(),
+        'date': dates[valides].to_numpy(),
+    })
+    for variable in VARIABLES:
+        valeurs = pd.to_numeric(df[variable], errors='coerce').to_numpy(dtype=float)[valides]
+        mesures[variable] = valeurs
+        mesures[f"{variable}_carre"] = valeurs ** 2
+
+    # Tri par date : 'last' donne la dernière valeur connue de la période
+    groupes = mesures.sort_values('date', kind='stable').groupby(
+        ['id_equipement', 'point_mesure', 'periode'], sort=True
+    )
+
+    colonnes = {'date_derniere': groupes['date'].max()}
+    for variable in VARIABLES:
+        colonnes[_colonne(variable, 'min')] = groupes[variable].min()
+        colonnes[_colonne(variable, 'max')] = groupes[variable].max()
+        colonnes[_colonne(variable, 'somme')] = groupes[variable].sum()
+        colonnes[_colonne(variable, 'somme_carres')] = groupes[f"{variable}_carre"].sum()
+        colonnes[_colonne(variable, 'nombre')] = groupes[variable].count()
+        colonnes[_colonne(variable, 'derniere')] = groupes[variable].last()
+
+    return pd.DataFrame(colonnes)
+
+
+def _combiner(ancien, nouveau):
+    """Combine deux agrégats d'une même série (index periode).
+
+    Returns:
+        DataFrame indexé par periode, trié.
+    """
+    tous = pd.concat([ancien, nouveau])
+    groupes = tous.groupby(level=0, sort=True)
+
+    colonnes = {'date_derniere': groupes['date_derniere'].max()}
+    # Dernière valeur : celle de l'agrégat dont la dernière mesure est la plus récente
+    recents = (
+        tous.reset_index().sort_values('date_derniere', kind='stable').groupby('periode').last()
+    )
+
+    for variable in VARIABLES:
+        colonnes[_colonne(variable, 'min')] = groupes[_colonne(variable, 'min')].min()
+        colonnes[_colonne(variable, 'max')] = groupes[_colonne(variable, 'max')].max()
+        for statistique in ('somme', 'somme_carres', 'nombre'):
+            colonne = _colonne(variable, statistique)
+            colonnes[colonne] = groupes[colonne].sum()
+        colonnes[_colonne(variable, 'derniere')] = recents[_colonne(variable, 'derniere')]
+
+    return pd.DataFrame(colonnes)
+
+
+def _construire(niveau):
+    """Agrégats d'un niveau à partir de l'instantané de suivi et des archives.
+
+    Returns:
+        Dictionnaire {(id_equipement, point_mesure): DataFrame indexé par periode}.
+    """
+    archives = cache.lire_archives('suivi', colonnes=['id_equipement', 'point_mesure'] + VARIABLES)
+    df = cache.obtenir('suivi')
+    if not archives.empty:
+        df = pd.concat([archives, df], ignore_index=True)
+    if df.empty:
+        return {}
+
+    agregats = _agreger(df, niveau)
+    return {
+        cle: serie.droplevel([0, 1])
+        for cle, serie in agregats.groupby(level=[0, 1], sort=False)
+    }
+
+
+def _niveau(niveau):
+    """Agrégats d'un niveau, construits au besoin (à appeler sous _verrou)."""
+    if _niveaux[niveau] is None:
+        with metriques.chronometre(f"agregats_{niveau}"):
+            _niveaux[niveau] = _construire(niveau)
+    return _niveaux[niveau]
+
+
+def choisir_niveau(date_debut, date_fin):
+    """Niveau adapté à la durée affichée : brut en vue rapprochée, agrégé sinon.
+
+    Args:
+        date_debut: Première date affichée.
+        date_fin: Dernière date affichée.
+
+    Returns:
+        NIVEAU_BRUT, NIVEAU_SEMAINE ou NIVEAU_MOIS.
+    """
+    duree = (pd.Timestamp(date_fin) - pd.Timestamp(date_debut)).days
+
+    if duree <= SEUIL_BRUT_JOURS:
+        return NIVEAU_BRUT
+    if duree <= SEUIL_SEMAINE_JOURS:
+        return NIVEAU_SEMAINE
+    return NIVEAU_MOIS
+
+
+def _selection(niveau, id_equipement, point_mesure, date_debut, date_fin):
+    """Agrégats d'une série limités aux périodes qui chevauchent [date_debut, date_fin].
+
+    Returns:
+        DataFrame indexé par periode, ou None si la série n'a aucune mesure.
+    """
+    with _verrou:
+        agregats = _niveau(niveau).get((str(id_equipement), str(point_mesure)))
+
+    # Lecture hors verrou : ajouter() remplace les agrégats d'une série, sans les modifier
+    if agregats is None:
+        return None
+
+    if date_debut is not None:
+        debut = pd.Timestamp(date_debut).to_period(PERIODES[niveau]).start_time
+        agregats = agregats[agregats.index >= debut]
+    if date_fin is not None:
+        agregats = agregats[agregats.index <= pd.Timestamp(date_fin)]
+    return agregats
+
+
+def serie(niveau, id_equipement, point_mesure, date_debut=None, date_fin=None):
+    """Agrégats d'une série sur une période.
+
+    Les périodes retenues sont celles qui chevauchent [date_debut, date_fin] ;
+    une période partiellement couverte est agrégée en entier.
+
+    Args:
+        niveau: NIVEAU_SEMAINE ou NIVEAU_MOIS.
+        id_equipement: ID de l'équipement.
+        point_mesure: Point de mesure.
+        date_debut: Première date incluse (None = pas de borne).
+        date_fin: Dernière date incluse (None = pas de borne).
+
+    Returns:
+        DataFrame avec une colonne periode et, par variable, les colonnes
+        <variable>_min, _max, _moyenne, _derniere et _nombre.
+    """
+    agregats = _selection(niveau, id_equipement, point_mesure, date_debut, date_fin)
+    if agregats is None:
+        return pd.DataFrame(columns=['periode'])
+
+    resultat = {'periode': agregats.index}
+    for variable in VARIABLES:
+        nombre = agregats[_colonne(variable, 'nombre')].to_numpy()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            moyenne = agregats[_colonne(variable, 'somme')].to_numpy() / nombre
+        resultat[_colonne(variable, 'min')] = agregats[_colonne(variable, 'min')].to_numpy()
+        resultat[_colonne(variable, 'max')] = agregats[_colonne(variable, 'max')].to_numpy()
+        resultat[_colonne(variable, 'moyenne')] = moyenne
+        derniere = _colonne(variable, 'derniere')
+        resultat[derniere] = agregats[derniere].to_numpy()
+        resultat[_colonne(variable, 'nombre')] = nombre
+
+    return pd.DataFrame(resultat).reset_index(drop=True)
+
+
+def statistiques(niveau, id_equipement, point_mesure, date_debut=None, date_fin=None):
+    """Minimum, maximum, moyenne et écart-type par variable, sans relire les mesures.
+
+    Returns:
+        Dictionnaire {variable: {'min', 'max', 'moyenne', 'ecart_type', 'nombre'}}.
+    """
+    selection = _selection(niveau, id_equipement, point_mesure, date_debut, date_fin)
+
+    resultat = {}
+    for variable in VARIABLES:
+        if selection is None:
+            resultat[variable] = {'min': np.nan, 'max': np.nan, 'moyenne': np.nan,
+                                  'ecart_type': np.nan, 'nombre': 0}
+            continue
+
+        nombre = int(selection[_colonne(variable, 'nombre')].sum())
+        somme = selection[_colonne(variable, 'somme')].sum()
+        somme_carres = selection[_colonne(variable, 'somme_carres')].sum()
+
+        moyenne = somme / nombre if nombre else np.nan
+        # Écart-type d'échantillon (comme pandas .std())
+        variance = (somme_carres - nombre * moyenne ** 2) / (nombre - 1) if nombre > 1 else np.nan
+
+        resultat[variable] = {
+            'min': selection[_colonne(variable, 'min')].min(),
+            'max': selection[_colonne(variable, 'max')].max(),
+            'moyenne': moyenne,
+            'ecart_type': np.sqrt(max(variance, 0)) if nombre > 1 else np.nan,
+            'nombre': nombre,
+        }
+
+    return resultat
+
+
+def ajouter(df):
+    """Complète les agrégats déjà construits après une écriture réussie.
+
+    Seules les séries touchées sont recombinées. Un niveau pas encore
+    construit n'est pas modifié : il le sera depuis l'instantané, qui
+    contiendra les nouvelles mesures.
+
+    Args:
+        df: Mesures écrites (colonnes de la table suivi).
+    """
+    if df is None or len(df) == 0:
+        return
+
+    with _verrou:
+        for niveau, series in _niveaux.items():
+            if series is None:
+                continue
+
+            nouveaux = _agreger(df, niveau)
+            for cle, partiel in nouveaux.groupby(level=[0, 1], sort=False):
+                partiel = partiel.droplevel([0, 1])
+                ancien = series.get(cle)
+                series[cle] = partiel if ancien is None else _combiner(ancien, partiel)
+
+    metriques.incrementer('agregats_mises_a_jour', len(df))
+
+
+def invalider():
+    """Invalide tous les niveaux ; reconstruits au prochain accès."""
+    with _verrou:
+        for niveau in _niveaux:
+            _niveaux[niveau] = None
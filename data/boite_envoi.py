@@ -0,0 +1,376 @@
+"""
+Boîte d'envoi locale - Saisies conservées sur disque avant envoi au stockage
+
+Avec un stockage distant et un réseau instable, une saisie ne doit jamais
+être perdue : elle est d'abord écrite dans une base SQLite locale (réponse
+immédiate au formulaire), puis un fil d'arrière-plan l'envoie au stockage
+par lots, avec reprises espacées en cas d'échec.
+
+Chaque envoi porte une clé d'idempotence : un envoi rejoué après une
+réponse perdue n'est pas enregistré deux fois. Un refus métier (doublon)
+n'est pas rejoué : l'envoi passe en conflit et reste visible jusqu'à ce
+qu'un utilisateur l'abandonne. Une saisie invalide (équipement inconnu...)
+ou un envoi encore en échec après ``TENTATIVES_MAX`` essais passe en échec,
+visible de la même façon.
+
+Plusieurs processus (workers) peuvent partager la boîte : chaque lot est
+réservé atomiquement (transaction ``BEGIN IMMEDIATE``) par un bail limité
+dans le temps ; un envoi réservé n'est pas repris par un autre processus
+tant que le bail court.
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+import pandas as pd
+from outils import metriques
+
+ACTIVE = os.environ.get("MAINTENANCE_BOITE_ENVOI") == "1"
+
+FICHIER_BOITE_ENVOI = os.environ.get(
+    "MAINTENANCE_BOITE_ENVOI_FICHIER",
+    os.path.join(os.path.dirname(__file__), "boite_envoi.sqlite")
+)
+
+INTERVALLE_ENVOI = 5  # secondes entre deux passages sans nouvelle saisie
+TAILLE_LOT = 50
+DELAI_REPRISE_MAX = 300  # secondes
+TENTATIVES_MAX = int(os.environ.get("MAINTENANCE_BOITE_ENVOI_TENTATIVES", "20"))
+DUREE_BAIL = 120  # secondes de réservation d'un lot par un processus
+DELAI_VERROU = 30  # secondes d'attente si un autre processus écrit
+
+STATUT_EN_ATTENTE = "en_attente"
+STATUT_CONFLIT = "conflit"
+STATUT_ECHOUE = "echoue"
+
+# Résultats d'expédition
+ENVOYE = "envoye"
+CONFLIT = "conflit"
+ECHEC = "echec"
+INVALIDE = "invalide"
+
+# Processus qui réserve les lots
+TRAVAILLEUR = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+_verrou = threading.Lock()
+_reveil = threading.Event()
+_connexion = None
+_fil = None
+_etat = {'erreur': None}  # dernière erreur du fil d'envoi (None = fonctionne)
+
+
+# =============================================================================
+# STOCKAGE LOCAL
+# =============================================================================
+
+def _connecter():
+    """Connexion SQLite partagée par le processus (à utiliser sous _verrou)."""
+    global _connexion
+
+    if _connexion is None:
+        _connexion = sqlite3.connect(FICHIER_BOITE_ENVOI, timeout=DELAI_VERROU, check_same_thread=False)
+        _connexion.execute("PRAGMA journal_mode=WAL")
+        _connexion.execute(
+            "CREATE TABLE IF NOT EXISTS envois ("
+            "id INTEGER PRIMARY KEY, "
+            "cle_idempotence TEXT UNIQUE NOT NULL, "
+            "table_nom TEXT NOT NULL, "
+            "charge TEXT NOT NULL, "
+            "cle_doublon TEXT, "
+            "statut TEXT NOT NULL, "
+            "tentatives INTEGER NOT NULL DEFAULT 0, "
+            "prochain_essai REAL NOT NULL, "
+            "message TEXT, "
+            "cree_le TEXT NOT NULL)"
+        )
+        _connexion.execute("CREATE INDEX IF NOT EXISTS envois_statut ON envois (statut, prochain_essai)")
+
+        # Réservation par un processus (boîtes créées avant les workers multiples)
+        colonnes = {ligne[1] for ligne in _connexion.execute("PRAGMA table_info(envois)")}
+        for colonne, definition in (('travailleur', 'TEXT'), ('bail', 'REAL')):
+            if colonne not in colonnes:
+                _connexion.execute(f"ALTER TABLE envois ADD COLUMN {colonne} {definition}")
+        _connexion.commit()
+
+    return _connexion
+
+
+def deposer(table, charge, cle_doublon=None):
+    """Écrit une saisie dans la boîte d'envoi (durable dès le retour).
+
+    Args:
+        table: 'observations' ou 'suivi'.
+        charge: Arguments d'enregistrement (sérialisables en JSON).
+        cle_doublon: Clé de l'index des doublons, pour détecter une seconde
+            saisie identique encore en attente.
+
+    Returns:
+        Clé d'idempotence de l'envoi.
+    """
+    cle = uuid.uuid4().hex
+
+    with _verrou:
+        connexion = _connecter()
+        connexion.execute(
+            "INSERT INTO envois (cle_idempotence, table_nom, charge, cle_doublon, statut, "
+            "prochain_essai, cree_le) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (cle, table, json.dumps(charge, default=str), None if cle_doublon is None else str(cle_doublon),
+             STATUT_EN_ATTENTE, time.time(), pd.Timestamp.now().isoformat(timespec='seconds'))
+        )
+        connexion.commit()
+
+    metriques.incrementer('boite_envoi_depots', table=table)
+    _reveil.set()
+    return cle
+
+
+def contient_doublon(table, cle_doublon):
+    """Vrai si une saisie de même clé de doublon attend déjà d'être envoyée."""
+    with _verrou:
+        return _connecter().execute(
+            "SELECT 1 FROM envois WHERE table_nom = ? AND cle_doublon = ? AND statut = ? LIMIT 1",
+            (table, str(cle_doublon), STATUT_EN_ATTENTE)
+        ).fetchone() is not None
+
+
+def longueur():
+    """Nombre d'envois en attente, en conflit et en échec.
+
+    Returns:
+        Dictionnaire {'en_attente': int, 'conflits': int, 'echecs': int}.
+    """
+    with _verrou:
+        comptes = dict(_connecter().execute(
+            "SELECT statut, COUNT(*) FROM envois GROUP BY statut"
+        ).fetchall())
+    return {
+        'en_attente': comptes.get(STATUT_EN_ATTENTE, 0),
+        'conflits': comptes.get(STATUT_CONFLIT, 0),
+        'echecs': comptes.get(STATUT_ECHOUE, 0),
+    }
+
+
+def lister(statut=None):
+    """Envois de la boîte (tous ou d'un statut), du plus ancien au plus récent.
+
+    Returns:
+        DataFrame id, table_nom, charge (dict), statut, tentatives, message, cree_le.
+    """
+    requete = "SELECT id, table_nom, charge, statut, tentatives, message, cree_le FROM envois"
+    parametres = ()
+    if statut:
+        requete += " WHERE statut = ?"
+        parametres = (statut,)
+
+    with _verrou:
+        lignes = _connecter().execute(requete + " ORDER BY id", parametres).fetchall()
+
+    df = pd.DataFrame(
+        lignes, columns=['id', 'table_nom', 'charge', 'statut', 'tentatives', 'message', 'cree_le']
+    )
+    df['charge'] = df['charge'].map(json.loads)
+    return df
+
+
+def abandonner(id_envoi):
+    """Retire un envoi de la boîte (conflit examiné et écarté).
+
+    Returns:
+        Tuple (succès, message).
+    """
+    with _verrou:
+        connexion = _connecter()
+        supprimes = connexion.execute("DELETE FROM envois WHERE id = ?", (id_envoi,)).rowcount
+        connexion.commit()
+
+    if not supprimes:
+        return False, "⚠️ Envoi introuvable"
+    return True, "✅ Envoi abandonné"
+
+
+def reessayer(id_envoi):
+    """Remet un envoi en conflit ou en échec dans la file d'attente (comme une nouvelle saisie).
+
+    Returns:
+        Tuple (succès, message).
+    """
+    with _verrou:
+        connexion = _connecter()
+        modifies = connexion.execute(
+            "UPDATE envois SET statut = ?, tentatives = 0, prochain_essai = ?, "
+            "travailleur = NULL, bail = NULL WHERE id = ?",
+            (STATUT_EN_ATTENTE, time.time(), id_envoi)
+        ).rowcount
+        connexion.commit()
+
+    if not modifies:
+        return False, "⚠️ Envoi introuvable"
+    _reveil.set()
+    return True, "✅ Envoi remis en file d'attente"
+
+
+# =============================================================================
+# ENVOI EN ARRIÈRE-PLAN
+# =============================================================================
+
+def _prochain_lot():
+    """Réserve les envois dus (en attente, délai de reprise écoulé, sans bail en cours).
+
+    Sélection et réservation dans une même transaction ``BEGIN IMMEDIATE`` :
+    deux processus ne réservent jamais le même envoi. Un envoi repris après
+    l'expiration de son bail (processus arrêté ou résultat non enregistré)
+    compte comme une reprise.
+
+    Returns:
+        Envois réservés, dans l'ordre de saisie.
+    """
+    maintenant = time.time()
+
+    with _verrou:
+        connexion = _connecter()
+        connexion.execute("BEGIN IMMEDIATE")
+        try:
+            lignes = connexion.execute(
+                "SELECT id, cle_idempotence, table_nom, charge, "
+                "tentatives + (bail IS NOT NULL) FROM envois "
+                "WHERE statut = ? AND prochain_essai <= ? AND (bail IS NULL OR bail < ?) "
+                "ORDER BY id LIMIT ?",
+                (STATUT_EN_ATTENTE, maintenant, maintenant, TAILLE_LOT)
+            ).fetchall()
+            connexion.executemany(
+                "UPDATE envois SET travailleur = ?, bail = ?, tentatives = ? WHERE id = ?",
+                [(TRAVAILLEUR, maintenant + DUREE_BAIL, ligne[4], ligne[0]) for ligne in lignes]
+            )
+            connexion.commit()
+        except sqlite3.Error:
+            connexion.rollback()
+            raise
+
+    return [
+        {
+            'id': id_envoi,
+            'cle_idempotence': cle,
+            'table': table,
+            'charge': json.loads(charge),
+            'tentatives': tentatives,
+        }
+        for id_envoi, cle, table, charge, tentatives in lignes
+    ]
+
+
+def _appliquer_resultats(resultats):
+    """Retire les envois réussis, met en conflit ou en échec, ou replanifie les autres.
+
+    Seuls les envois encore réservés par ce processus sont mis à jour (un
+    bail expiré a pu être repris ailleurs).
+    """
+    maintenant = time.time()
+
+    with _verrou:
+        connexion = _connecter()
+        try:
+            for envoi, resultat, message in resultats:
+                reserve = (envoi['id'], TRAVAILLEUR)
+                if resultat == ENVOYE:
+                    connexion.execute("DELETE FROM envois WHERE id = ? AND travailleur = ?", reserve)
+                elif resultat in (CONFLIT, INVALIDE) or envoi['tentatives'] + 1 >= TENTATIVES_MAX:
+                    statut = STATUT_CONFLIT if resultat == CONFLIT else STATUT_ECHOUE
+                    connexion.execute(
+                        "UPDATE envois SET statut = ?, message = ?, tentatives = tentatives + 1, "
+                        "travailleur = NULL, bail = NULL WHERE id = ? AND travailleur = ?",
+                        (statut, message, *reserve)
+                    )
+                else:
+                    # Reprise espacée : 2 s, 4 s, 8 s... plafonnée
+                    delai = min(2 ** (envoi['tentatives'] + 1), DELAI_REPRISE_MAX)
+                    connexion.execute(
+                        "UPDATE envois SET message = ?, tentatives = tentatives + 1, prochain_essai = ?, "
+                        "travailleur = NULL, bail = NULL WHERE id = ? AND travailleur = ?",
+                        (message, maintenant + delai, *reserve)
+                    )
+            connexion.commit()
+        except sqlite3.Error:
+            # Envois toujours réservés : repris à l'expiration du bail
+            connexion.rollback()
+            raise
+
+    for _, resultat, _ in resultats:
+        metriques.incrementer('boite_envoi_envois', resultat=resultat)
+
+
+def vider(expedier):
+    """Envoie un lot d'envois dus.
+
+    Args:
+        expedier: Fonction (liste d'envois) → liste de tuples
+            (envoi, ENVOYE | CONFLIT | ECHEC | INVALIDE, message).
+
+    Returns:
+        Nombre d'envois traités.
+    """
+    lot = _prochain_lot()
+    if not lot:
+        return 0
+
+    with metriques.chronometre("boite_envoi.lot"):
+        try:
+            resultats = expedier(lot)
+        except Exception as e:
+            resultats = [(envoi, ECHEC, f"❌ {str(e)}") for envoi in lot]
+
+    _appliquer_resultats(resultats)
+    return len(lot)
+
+
+def _boucle_envoi(expedier):
+    """Fil d'arrière-plan : vide la boîte à chaque saisie et périodiquement.
+
+    Une erreur (base locale verrouillée par un autre worker...) n'arrête pas
+    le fil : elle est comptée, signalée au panneau, et le passage suivant est
+    espacé (2 s, 4 s... plafonné).
+    """
+    erreurs = 0
+    while True:
+        _reveil.wait(min(2 ** erreurs, DELAI_REPRISE_MAX) if erreurs else INTERVALLE_ENVOI)
+        _reveil.clear()
+
+        try:
+            # Lots pleins : on enchaîne sans attendre
+            while vider(expedier) == TAILLE_LOT:
+                pass
+        except Exception as e:
+            erreurs += 1
+            _etat['erreur'] = str(e)
+            metriques.incrementer('boite_envoi_erreurs')
+            continue
+
+        erreurs = 0
+        _etat['erreur'] = None
+
+
+def erreur():
+    """Dernière erreur du fil d'envoi (None s'il fonctionne)."""
+    return _etat['erreur']
+
+
+def demarrer(expedier):
+    """Démarre (une seule fois par processus) l'envoi en arrière-plan.
+
+    Args:
+        expedier: Voir ``vider``.
+    """
+    global _fil
+
+    with _verrou:
+        if _fil is not None:
+            return
+        _fil = threading.Thread(
+            target=_boucle_envoi,
+            args=(expedier,),
+            name="boite-envoi",
+            daemon=True
+        )
+        _fil.start()
@@ -0,0 +1,295 @@
+"""
+Instantanés partagés des tables, communs à toutes les sessions
+
+Chaque table est chargée une seule fois par processus. Les sessions reçoivent
+des vues superficielles : grâce au Copy-on-Write de pandas, une modification
+locale copie uniquement la colonne touchée et ne peut jamais altérer
+l'instantané partagé.
+
+Les dates sont converties en datetime64 et triées une seule fois, au
+chargement : les lignes à date invalide sont écartées et signalées.
+
+Les tables indépendantes se chargent en parallèle (un fil par table) : avec
+un stockage distant, le temps d'attente est celui de la table la plus lente
+et non la somme des allers-retours.
+
+Les textes des observations sont rangés hors de l'instantané (``textes``).
+
+Avec le stockage partitionné, les instantanés ne contiennent que les
+partitions chaudes ; les archives sont lues à la demande (``lire_archives``)
+et ne sont jamais conservées.
+"""
+
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from outils import metriques
+from data.stockage import data_manager, PARTITIONNE
+from data import versions, textes
+
+# Copy-on-Write toujours actif à partir de pandas 3
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+CHARGEURS = {
+    'equipements': data_manager.charger_equipements,
+    'observations': data_manager.charger_observations,
+    'suivi': data_manager.charger_suivi,
+}
+
+# Colonne date de chaque table historisée
+COLONNES_DATE = {
+    'observations': 'date',
+    'suivi': 'date',
+}
+
+# Chargements en parallèle : une table par fil, au plus une fois à la fois
+_executeur = ThreadPoolExecutor(max_workers=len(CHARGEURS), thread_name_prefix="chargement")
+
+_verrou = threading.Lock()
+_instantanes = {}
+_dates_invalides = {}
+_en_cours = {}
+_generations = {}
+
+
+def _normaliser_dates(table, df):
+    """Convertit la colonne date, écarte les dates invalides et trie par date.
+
+    Returns:
+        Tuple (DataFrame normalisé, lignes à date invalide).
+    """
+    colonne = COLONNES_DATE.get(table)
+    if colonne is None or colonne not in df.columns:
+        return df, df.iloc[0:0]
+
+    dates = pd.to_datetime(df[colonne], errors='coerce')
+    invalides = dates.isna().to_numpy()
+
+    df = df.assign(**{colonne: dates})
+    rejetees = df[invalides]
+    df = df[~invalides].sort_values(colonne, kind='stable').reset_index(drop=True)
+
+    return df, rejetees
+
+
+def _charger(table, generation):
+    """Charge et normalise une table (fil de l'exécuteur), puis publie l'instantané.
+
+    L'instantané n'est publié que si la table n'a pas été invalidée entre-temps.
+
+    Returns:
+        Tuple (DataFrame normalisé, durée du chargement en secondes).
+    """
+    debut = time.perf_counter()
+    try:
+        df, rejetees = _normaliser_dates(table, CHARGEURS[table]())
+        if table == 'observations':
+            # Textes libres rangés hors de l'instantané, relus à la demande
+            df = textes.separer(df)
+        duree = time.perf_counter() - debut
+        metriques.enregistrer_duree(f"charger_{table}", duree)
+
+        with _verrou:
+            if _generations.get(table, 0) == generation:
+                _instantanes[table] = df
+                _dates_invalides[table] = rejetees
+        return df, duree
+    finally:
+        with _verrou:
+            if _generations.get(table, 0) == generation:
+                _en_cours.pop(table, None)
+
+
+def _lancer(table):
+    """Chargement d'une table : en cours, ou lancé maintenant (appelé sous verrou)."""
+    futur = _en_cours.get(table)
+    if futur is None:
+        metriques.incrementer('cache', table=table, resultat='miss')
+        futur = _executeur.submit(_charger, table, _generations.get(table, 0))
+        _en_cours[table] = futur
+    return futur
+
+
+def precharger(tables=None):
+    """Lance en parallèle le chargement des tables absentes, sans attendre.
+
+    Les onglets reçoivent ensuite chaque table dès qu'elle est prête : le
+    premier onglet s'affiche pendant que les tables plus lourdes se chargent
+    encore. Une fois tout chargé, deux durées sont enregistrées :
+    ``chargement_tables`` (du lancement à la dernière table) et
+    ``chargement_table_plus_lente`` ; leur écart mesure le gain du parallélisme
+    (en séquentiel, le total serait la somme des tables).
+
+    Args:
+        tables: Tables à charger (None = toutes).
+    """
+    debut = time.perf_counter()
+
+    with _verrou:
+        futurs = [
+            _lancer(table)
+            for table in (tables or CHARGEURS)
+            if table not in _instantanes
+        ]
+
+    if not futurs:
+        return
+
+    restants = [len(futurs)]
+    verrou_restants = threading.Lock()
+
+    def termine(_):
+        with verrou_restants:
+            restants[0] -= 1
+            if restants[0]:
+                return
+
+        durees = [f.result()[1] for f in futurs if f.exception() is None]
+        metriques.enregistrer_duree("chargement_tables", time.perf_counter() - debut)
+        if durees:
+            metriques.enregistrer_duree("chargement_table_plus_lente", max(durees))
+
+    for futur in futurs:
+        futur.add_done_callback(termine)
+
+
+def obtenir(table):
+    """Retourne une vue en lecture seule de l'instantané partagé d'une table.
+
+    Si la table est en cours de chargement (``precharger`` ou autre session),
+    attend ce chargement plutôt que d'en lancer un second.
+
+    Args:
+        table: 'equipements', 'observations' ou 'suivi'.
+
+    Returns:
+        DataFrame partageant ses données avec l'instantané (aucune copie).
+    """
+    with _verrou:
+        df = _instantanes.get(table)
+        if df is not None:
+            metriques.incrementer('cache', table=table, resultat='hit')
+            return df.copy(deep=False)
+        futur = _lancer(table)
+
+    df, _ = futur.result()
+    return df.copy(deep=False)
+
+
+def invalider(table=None, publier=True):
+    """Invalide l'instantané d'une table (ou de toutes) après une écriture.
+
+    Un chargement en cours n'est pas annulé mais ne sera pas publié.
+
+    Args:
+        table: Table à invalider (None = toutes).
+        publier: Signaler l'écriture aux autres processus (``versions``) ;
+            False quand l'invalidation fait suite à un signal reçu.
+    """
+    noms = [table] if table else list(CHARGEURS)
+
+    with _verrou:
+        for nom in noms:
+            _instantanes.pop(nom, None)
+            _dates_invalides.pop(nom, None)
+            _en_cours.pop(nom, None)
+            _generations[nom] = _generations.get(nom, 0) + 1
+
+    if publier:
+        versions.publier(noms)
+
+
+def generation(table):
+    """Numéro d'invalidation d'une table : change à chaque écriture ou signal reçu.
+
+    Permet aux index dérivés d'un instantané (recherche) de savoir s'ils
+    sont à reconstruire.
+    """
+    with _verrou:
+        return _generations.get(table, 0)
+
+
+def etendue_archives(table):
+    """(première date, dernière date) des lignes archivées d'une table, None sans archive."""
+    if not PARTITIONNE:
+        return None
+    etendue = data_manager.etendue_archives(table)
+    return None if etendue is None else tuple(pd.Timestamp(d) for d in etendue)
+
+
+def lire_archives(table, colonnes=None, date_debut=None):
+    """Lignes archivées d'une table (stockage partitionné), dates typées et triées.
+
+    Args:
+        table: 'observations' ou 'suivi'.
+        colonnes: Colonnes lues (None = toutes) ; 'date' est toujours lue.
+        date_debut: Première date utile (None = toutes les archives).
+
+    Returns:
+        DataFrame (vide si le stockage n'a pas d'archives).
+    """
+    if etendue_archives(table) is None:
+        return pd.DataFrame(columns=colonnes or [])
+
+    if colonnes is not None and 'date' not in colonnes:
+        colonnes = list(colonnes) + ['date']
+
+    with metriques.chronometre(f"archives_{table}"):
+        df = data_manager.charger_archives(table, colonnes=colonnes, date_debut=date_debut)
+    df, _ = _normaliser_dates(table, df)
+    return df
+
+
+def dates_invalides(table):
+    """Lignes écartées au chargement d'une table pour date invalide."""
+    obtenir(table)
+    with _verrou:
+        return _dates_invalides.get(table, pd.DataFrame()).copy(deep=False)
+
+
+def taille_objet(objet):
+    """Estime la mémoire occupée par un objet (DataFrame compris), en octets."""
+    if isinstance(objet, pd.DataFrame):
+        return int(objet.memory_usage(deep=True).sum())
+    if isinstance(objet, pd.Series):
+        return int(objet.memory_usage(deep=True))
+    if isinstance(objet, dict):
+        return sys.getsizeof(objet) + sum(taille_objet(v) for v in objet.values())
+    if isinstance(objet, (list, tuple, set)):
+        return sys.getsizeof(objet) + sum(taille_objet(v) for v in objet)
+    return sys.getsizeof(objet)
+
+
+def rapport_memoire(etat_session=None):
+    """Mémoire des instantanés partagés et surcoût propre à une session.
+
+    Args:
+        etat_session: Mapping de l'état de session (``st.session_state``).
+
+    Returns:
+        DataFrame : une ligne par table partagée (lignes, octets), plus une
+        ligne 'session' pour l'état propre à la session si fourni.
+    """
+    with _verrou:
+        lignes = [
+            {
+                'table': nom,
+                'lignes': len(df),
+                'octets': taille_objet(df),
+                'partage': True,
+            }
+            for nom, df in _instantanes.items()
+        ]
+
+    if etat_session is not None:
+        lignes.append({
+            'table': 'session',
+            'lignes': len(etat_session),
+            'octets': sum(taille_objet(v) for v in dict(etat_session).values()),
+            'partage': False,
+        })
+
+    return pd.DataFrame(lignes, columns=['table', 'lignes', 'octets', 'partage'])
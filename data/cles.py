@@ -0,0 +1,83 @@
+"""
+Clés naturelles hachées des observations et des mesures de suivi
+
+Partagées par l'index des doublons, le stockage des textes d'observation et
+le contrôle de version des corrections (``version_observations``).
+"""
+
+import pandas as pd
+
+
+def hash_observations(df):
+    """Hash vectorisé de la clé naturelle (équipement, date, texte observation).
+
+    Args:
+        df: DataFrame avec les colonnes id_equipement, date et observation.
+
+    Returns:
+        Tableau numpy uint64, un hash par ligne.
+    """
+    cles = pd.DataFrame({
+        'id_equipement': df['id_equipement'].astype(str).str.strip(),
+        'date': pd.to_datetime(df['date'], errors='coerce').dt.strftime('%Y-%m-%d'),
+        'observation': df['observation'].fillna('').astype(str).str.strip().str.lower(),
+    })
+    return pd.util.hash_pandas_object(cles, index=False).to_numpy()
+
+
+def version_observations(df):
+    """Version optimiste d'observations : hash vectorisé du contenu complet de chaque ligne.
+
+    Une correction envoie la version lue ; si un autre analyste a modifié la
+    ligne entre-temps, son contenu (donc sa version) a changé.
+
+    Args:
+        df: DataFrame avec les colonnes d'une observation.
+
+    Returns:
+        Tableau numpy uint64, un hash par ligne.
+    """
+    contenu = pd.DataFrame({
+        'id_equipement': df['id_equipement'].astype(str),
+        'date': pd.to_datetime(df['date'], errors='coerce').dt.strftime('%Y-%m-%d'),
+        **{
+            colonne: df[colonne].fillna('').astype(str)
+            for colonne in ['observation', 'recommandation', 'travaux', 'analyste', 'importance']
+        },
+    })
+    return pd.util.hash_pandas_object(contenu, index=False).to_numpy()
+
+
+def hash_suivi(df):
+    """Hash vectorisé de la clé naturelle (équipement, point de mesure, date).
+
+    Args:
+        df: DataFrame avec les colonnes id_equipement, point_mesure et date.
+
+    Returns:
+        Tableau numpy uint64, un hash par ligne.
+    """
+    cles = pd.DataFrame({
+        'id_equipement': df['id_equipement'].astype(str).str.strip(),
+        'point_mesure': df['point_mesure'].astype(str).str.strip(),
+        'date': pd.to_datetime(df['date'], errors='coerce').dt.strftime('%Y-%m-%d'),
+    })
+    return pd.util.hash_pandas_object(cles, index=False).to_numpy()
+
+
+def cle_observation(id_equipement, date, observation):
+    """Hash de la clé naturelle d'une observation unique."""
+    return int(hash_observations(pd.DataFrame({
+        'id_equipement': [id_equipement],
+        'date': [date],
+        'observation': [observation],
+    }))[0])
+
+
+def cle_suivi(id_equipement, point_mesure, date):
+    """Hash de la clé naturelle d'une mesure de suivi unique."""
+    return int(hash_suivi(pd.DataFrame({
+        'id_equipement': [id_equipement],
+        'point_mesure': [point_mesure],
+        'date': [date],
+    }))[0])
@@ -0,0 +1,110 @@
+"""
+Comparaison de séries de mesures sur une grille de dates commune
+
+Les mesures de chaque série (équipement, point de mesure) tombent à des
+dates irrégulières et différentes d'une série à l'autre. Pour les
+superposer, chaque série est rééchantillonnée sur une même grille
+(interpolation linéaire vectorisée, ``numpy.interp``), sans extrapolation
+hors de ses propres mesures.
+
+Les positions de chaque série dans l'instantané de suivi (trié par date)
+sont indexées une fois, puis réutilisées jusqu'à la prochaine écriture : une
+comparaison ne relit que les lignes des séries demandées.
+"""
+
+import math
+import threading
+import numpy as np
+import pandas as pd
+from outils import metriques
+from data import cache
+
+POINTS_GRILLE_MAX = 1000  # dates de la grille commune (pas arrondi au jour)
+SERIES_MAX = 24
+
+_verrou = threading.Lock()
+_index = {'generation': None, 'lignes': None, 'series': None}
+
+
+def _positions(df):
+    """Positions (chronologiques) des lignes de chaque série d'une table triée par date."""
+    return df.groupby(['id_equipement', 'point_mesure'], sort=False).indices
+
+
+def _series_instantane():
+    """Instantané de suivi et index de ses séries (reconstruit après une écriture)."""
+    df = cache.obtenir('suivi')
+
+    with _verrou:
+        generation = cache.generation('suivi')
+        if _index['generation'] != generation or _index['lignes'] != len(df):
+            _index.update({'generation': generation, 'lignes': len(df), 'series': _positions(df)})
+        return df, _index['series']
+
+
+def libelle(id_equipement, point_mesure):
+    """Nom d'une série dans la légende et les colonnes."""
+    return f"{id_equipement} · {point_mesure}"
+
+
+def grille(date_debut, date_fin, points_max=POINTS_GRILLE_MAX):
+    """Dates de la grille commune : pas d'un jour ou plus, au plus ``points_max`` dates."""
+    debut, fin = pd.Timestamp(date_debut).normalize(), pd.Timestamp(date_fin).normalize()
+    pas = max(1, math.ceil(((fin - debut).days + 1) / points_max))
+    return pd.date_range(debut, fin, freq=f"{pas}D")
+
+
+def comparer(series, variable, date_debut, date_fin, df_suivi=None, points_max=POINTS_GRILLE_MAX):
+    """Séries rééchantillonnées sur une grille de dates commune.
+
+    Args:
+        series: Couples (id_equipement, point_mesure).
+        variable: Colonne de mesure comparée.
+        date_debut: Première date de la grille.
+        date_fin: Dernière date de la grille.
+        df_suivi: Mesures (triées par date) si elles ne sont pas celles de
+            l'instantané, par exemple avec les archives ; None = instantané
+            et son index de séries.
+        points_max: Nombre maximal de dates de la grille.
+
+    Returns:
+        Tuple (valeurs, mesures) : DataFrame indexé par les dates de la
+        grille, une colonne par série (vide hors des mesures de la série) ;
+        nombre de mesures réelles de chaque série sur la période.
+    """
+    if df_suivi is None:
+        df_suivi, index_series = _series_instantane()
+    else:
+        index_series = _positions(df_suivi)
+
+    dates_grille = grille(date_debut, date_fin, points_max)
+    x_grille = dates_grille.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+    debut = dates_grille[0]
+    lendemain = pd.Timestamp(date_fin).normalize() + pd.Timedelta(days=1)
+
+    dates = df_suivi['date'].to_numpy(dtype='datetime64[ns]')
+    valeurs = df_suivi[variable].to_numpy(dtype=float)
+
+    colonnes, mesures = {}, {}
+    with metriques.chronometre("comparaison_series"):
+        for id_equipement, point_mesure in series:
+            nom = libelle(id_equipement, point_mesure)
+            positions = index_series.get((id_equipement, point_mesure), np.empty(0, dtype=np.intp))
+
+            # Période, plus une mesure de part et d'autre pour interpoler jusqu'aux bords
+            dates_serie = dates[positions]
+            gauche = max(0, np.searchsorted(dates_serie, debut.to_datetime64(), side='left') - 1)
+            droite = np.searchsorted(dates_serie, lendemain.to_datetime64(), side='left')
+            retenues = positions[gauche:droite + 1]
+
+            x, y = dates[retenues].astype(np.int64), valeurs[retenues]
+            connues = ~np.isnan(y)
+            x, y = x[connues], y[connues]
+            mesures[nom] = int(((x >= debut.value) & (x < lendemain.value)).sum())
+
+            if len(x) == 0:
+                colonnes[nom] = np.full(len(x_grille), np.nan)
+            else:
+                colonnes[nom] = np.interp(x_grille, x, y, left=np.nan, right=np.nan)
+
+    return pd.DataFrame(colonnes, index=pd.Index(dates_grille, name='date')), mesures
@@ -0,0 +1,27 @@
+"""
+Valeurs acceptées des formulaires de l'onglet Observations
+
+Définies une seule fois, sans dépendance : partagées par les formulaires,
+la validation de l'ingestion en lot, le tableau de bord et le générateur
+des benchmarks.
+"""
+
+# Points du formulaire « Saisie des mesures de suivi »
+POINTS_MESURE = [
+    "M-COA",
+    "M-CA",
+    "Entrée Réducteur",
+    "Sortie Réducteur",
+    "P-CA",
+    "P-COA"
+]
+
+# Niveaux du formulaire « Nouvelle observation » (optionnel : une importance
+# vide est enregistrée comme non renseignée, None)
+NIVEAUX_IMPORTANCE = [
+    "Très important",
+    "Important",
+    "Moins important",
+    "Pas de collecte mais important",
+    "Collecte réalisée"
+]
@@ -0,0 +1,289 @@
+"""
+Cube d'analyse pré-agrégé pour le tableau de bord
+
+Deux petits cubes, indexés par leurs dimensions :
+
+- observations : nombre d'observations par département × mois × importance
+  × analyste ;
+- suivi : couverture des mesures par département × mois × point de mesure
+  (nombre de mesures et nombre d'équipements mesurés au moins une fois).
+
+Un graphique du tableau de bord se calcule à partir de quelques centaines de
+cellules (``trancher``, ``agreger``, ``couverture``) au lieu de regrouper
+tout l'historique à chaque affichage.
+
+Comme les agrégats de suivi, les cubes sont construits une fois par
+processus (instantané et archives), puis complétés à chaque enregistrement.
+Une suppression, une correction, une écriture d'un autre processus ou un
+changement du référentiel (département d'un équipement) les invalide :
+reconstruction au prochain accès.
+"""
+
+import threading
+import numpy as np
+import pandas as pd
+from outils import metriques
+from data import cache
+
+NON_RENSEIGNE = "(non renseigné)"
+
+DIMENSIONS = {
+    'observations': ['departement', 'mois', 'importance', 'analyste'],
+    'suivi': ['departement', 'mois', 'point_mesure'],
+}
+MESURES = {
+    'observations': ['observations'],
+    'suivi': ['mesures', 'equipements'],
+}
+
+_verrou = threading.Lock()
+_cubes = {'observations': None, 'suivi': None}
+_etat = {'generation_equipements': None, 'series_mois': None}
+
+
+def _libelles(df, colonne):
+    """Valeurs textuelles d'une dimension ; vide ou absente = NON_RENSEIGNE."""
+    if colonne not in df.columns:
+        return pd.Series(NON_RENSEIGNE, index=df.index)
+    valeurs = df[colonne].fillna('').astype(str).str.strip()
+    return valeurs.mask(valeurs == '', NON_RENSEIGNE)
+
+
+def _departements():
+    """Département de chaque équipement du référentiel."""
+    df = cache.obtenir('equipements')
+    return pd.Series(df['departement'].to_numpy(), index=df['id_equipement'].astype(str).to_numpy())
+
+
+def _base(df, departements):
+    """Département et mois de chaque ligne à date valide.
+
+    Returns:
+        Tuple (masque des lignes valides, DataFrame departement / mois de ces lignes).
+    """
+    dates = pd.to_datetime(df['date'], errors='coerce')
+    valides = dates.notna().to_numpy()
+    departement = df['id_equipement'].astype(str).map(departements)
+
+    return valides, pd.DataFrame({
+        'departement': departement.fillna(NON_RENSEIGNE).to_numpy()[valides],
+        'mois': dates[valides].dt.to_period('M').dt.start_time.to_numpy(),
+    })
+
+
+def _cellules_observations(df, departements):
+    """Cellules (nombre d'observations) d'un ensemble d'observations."""
+    valides, cellules = _base(df, departements)
+    cellules['importance'] = _libelles(df, 'importance').to_numpy()[valides]
+    cellules['analyste'] = _libelles(df, 'analyste').to_numpy()[valides]
+
+    return cellules.groupby(DIMENSIONS['observations'], sort=True).size().to_frame('observations')
+
+
+def _cellules_suivi(df, departements, series_mois):
+    """Cellules (mesures, équipements mesurés) d'un ensemble de mesures.
+
+    Args:
+        df: Mesures (id_equipement, point_mesure, date).
+        departements: Département de chaque équipement.
+        series_mois: Hash des (équipement, point, mois) déjà comptés ; complété
+            par les nouveaux, pour ne compter un équipement qu'une fois par cellule.
+    """
+    valides, cellules = _base(df, departements)
+    cellules['point_mesure'] = df['point_mesure'].astype(str).to_numpy()[valides]
+
+    cles = pd.util.hash_pandas_object(pd.DataFrame({
+        'id_equipement': df['id_equipement'].astype(str).to_numpy()[valides],
+        'point_mesure': cellules['point_mesure'],
+        'mois': cellules['mois'],
+    }), index=False).to_numpy()
+    deja_vu = np.fromiter((int(c) in series_mois for c in cles), dtype=bool, count=len(cles))
+    nouvelle = ~deja_vu & ~pd.Series(cles).duplicated().to_numpy()
+    series_mois.update(int(c) for c in cles[nouvelle])
+
+    cellules['nouvelle'] = nouvelle
+    return cellules.groupby(DIMENSIONS['suivi'], sort=True).agg(
+        mesures=('nouvelle', 'size'),
+        equipements=('nouvelle', 'sum'),
+    ).astype('int64')
+
+
+def _construire(table, departements):
+    """Cube d'une table à partir de l'instantané et des archives (à appeler sous _verrou)."""
+    colonnes = (['id_equipement', 'importance', 'analyste'] if table == 'observations'
+                else ['id_equipement', 'point_mesure'])
+
+    archives = cache.lire_archives(table, colonnes=colonnes)
+    df = cache.obtenir(table)[colonnes + ['date']]
+    if not archives.empty:
+        df = pd.concat([archives, df], ignore_index=True)
+
+    if table == 'observations':
+        return _cellules_observations(df, departements)
+
+    _etat['series_mois'] = set()
+    return _cellules_suivi(df, departements, _etat['series_mois'])
+
+
+def _verifier_referentiel():
+    """Cubes invalidés si le référentiel a changé (à appeler sous _verrou)."""
+    generation = cache.generation('equipements')
+    if _etat['generation_equipements'] != generation:
+        _etat['generation_equipements'] = generation
+        for table in _cubes:
+            _cubes[table] = None
+        return False
+    return True
+
+
+def _cube(table):
+    """Cube d'une table ('observations' ou 'suivi'), construit au besoin."""
+    with _verrou:
+        _verifier_referentiel()
+        if _cubes[table] is None:
+            with metriques.chronometre(f"cube_{table}"):
+                _cubes[table] = _construire(table, _departements())
+        return _cubes[table]
+
+
+def _filtrer(cube, filtres):
+    """Cellules retenues par les filtres (valeur ou liste par dimension, bornes de mois)."""
+    masque = np.ones(len(cube), dtype=bool)
+
+    for dimension, valeurs in filtres.items():
+        if valeurs is None:
+            continue
+        if dimension in ('debut', 'fin'):
+            mois = cube.index.get_level_values('mois')
+            borne = pd.Timestamp(valeurs).to_period('M').start_time
+            masque &= (mois >= borne) if dimension == 'debut' else (mois <= borne)
+            continue
+        if dimension not in cube.index.names:
+            raise ValueError(f"Dimension inconnue : {dimension}")
+        if np.isscalar(valeurs):
+            valeurs = [valeurs]
+        masque &= cube.index.get_level_values(dimension).isin(list(valeurs))
+
+    return cube[masque]
+
+
+def trancher(table, **filtres):
+    """Cellules du cube retenues par les filtres (« slice »).
+
+    Args:
+        table: 'observations' ou 'suivi'.
+        **filtres: Par dimension, une valeur ou une liste de valeurs
+            (departement, importance, analyste, point_mesure, mois) ;
+            ``debut`` et ``fin`` bornent les mois (dates incluses dans le
+            premier et le dernier mois retenus). None = pas de filtre.
+
+    Returns:
+        DataFrame avec une colonne par dimension et par mesure.
+    """
+    return _filtrer(_cube(table), filtres).reset_index()
+
+
+def agreger(table, par, **filtres):
+    """Totaux du cube regroupés selon quelques dimensions (« dice » / « roll-up »).
+
+    Args:
+        table: 'observations' ou 'suivi'.
+        par: Dimensions conservées (liste vide = total général).
+        **filtres: Voir ``trancher``.
+
+    Returns:
+        DataFrame avec une colonne par dimension de ``par`` et par mesure.
+        Pour le suivi, ``equipements`` est une somme d'équipements-mois
+        lorsque plusieurs mois sont regroupés.
+    """
+    cellules = _filtrer(_cube(table), filtres)
+    par = list(par)
+
+    if not par:
+        return cellules.sum().to_frame().T.astype('int64')
+    return cellules.groupby(level=par, sort=True).sum().reset_index()
+
+
+def couverture(par=('departement',), **filtres):
+    """Couverture des mesures par point de mesure.
+
+    Args:
+        par: Dimensions regroupées avec le point de mesure ('departement',
+            'mois').
+        **filtres: Voir ``trancher``.
+
+    Returns:
+        DataFrame par (``par``, point_mesure) : mesures, équipements-mois
+        mesurés et taux = équipements-mois mesurés / (équipements du
+        département × mois de la période).
+    """
+    par = [dimension for dimension in par if dimension != 'point_mesure']
+    cellules = _filtrer(_cube('suivi'), filtres)
+    resultat = agreger('suivi', par + ['point_mesure'], **filtres)
+
+    # Parc d'équipements du département (ou de tout le référentiel)
+    parc = cache.obtenir('equipements')['departement'].value_counts()
+    if 'departement' in par:
+        equipements = resultat['departement'].map(parc).fillna(0).to_numpy()
+    else:
+        retenus = filtres.get('departement')
+        if retenus is not None:
+            parc = parc[parc.index.isin([retenus] if np.isscalar(retenus) else list(retenus))]
+        equipements = np.full(len(resultat), parc.sum())
+
+    # Mois de la période : bornes demandées, sinon étendue du cube
+    if 'mois' in par or cellules.empty:
+        nombre_mois = 1
+    else:
+        mois = cellules.index.get_level_values('mois')
+        debut = pd.Timestamp(filtres.get('debut') or mois.min()).to_period('M')
+        fin = pd.Timestamp(filtres.get('fin') or mois.max()).to_period('M')
+        nombre_mois = max(1, (fin - debut).n + 1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        resultat['taux'] = resultat['equipements'].to_numpy() / (equipements * nombre_mois)
+    resultat.loc[equipements == 0, 'taux'] = np.nan
+    return resultat
+
+
+def valeurs(table, dimension):
+    """Valeurs présentes d'une dimension (listes de filtres du tableau de bord)."""
+    return _cube(table).index.get_level_values(dimension).unique().sort_values().tolist()
+
+
+def ajouter(table, df):
+    """Complète le cube déjà construit d'une table après une écriture réussie.
+
+    Un cube pas encore construit n'est pas modifié : il le sera depuis
+    l'instantané, qui contiendra les nouvelles lignes.
+
+    Args:
+        table: 'observations' ou 'suivi'.
+        df: Lignes écrites (colonnes de la table).
+    """
+    if df is None or len(df) == 0:
+        return
+
+    with _verrou:
+        if not _verifier_referentiel() or _cubes[table] is None:
+            return
+
+        departements = _departements()
+        if table == 'observations':
+            partiel = _cellules_observations(df, departements)
+        else:
+            partiel = _cellules_suivi(df, departements, _etat['series_mois'])
+
+        # Nouveau cube (les lecteurs gardent l'ancien, jamais modifié sur place)
+        cube = _cubes[table]
+        _cubes[table] = partiel if cube.empty else cube.add(partiel, fill_value=0).astype('int64')
+
+    metriques.incrementer('cube_mises_a_jour', len(df), table=table)
+
+
+def invalider(table=None):
+    """Invalide le cube d'une table (ou les deux) ; reconstruit au prochain accès."""
+    with _verrou:
+        for nom in ([table] if table else list(_cubes)):
+            if nom in _cubes:
+                _cubes[nom] = None
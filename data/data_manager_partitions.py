@@ -0,0 +1,957 @@
+"""
+Stockage partitionné par département (et par année) - Même API que data_manager
+
+Observations et mesures de suivi sont réparties en fichiers CSV, un par
+département et par année :
+
+    data/partitions/observations/<département>/<année>.csv
+    data/partitions/suivi/<département>/<année>.csv
+
+Un catalogue (``catalogue.json``) décrit chaque partition : département,
+année, nombre de lignes, première et dernière date. Il permet :
+- l'élagage : une lecture filtrée (départements, équipements, période) ne
+  lit que les partitions concernées ;
+- la lecture en parallèle des partitions retenues ;
+- des écritures locales : un enregistrement n'ajoute qu'une ligne à une
+  partition, une suppression ou une correction ne réécrit que les
+  partitions touchées, sous un verrou propre à chacune (fil et processus).
+
+Le référentiel reste ``data/equipements.xlsx`` ; le département d'une ligne
+est celui de son équipement au moment de l'écriture (un changement de
+département déplace les lignes de l'équipement).
+
+Au premier démarrage, l'historique existant (data_manager) est réparti dans
+les partitions ; les fichiers d'origine ne sont pas modifiés.
+
+Archives : ``archiver()`` convertit les partitions froides (dernière date
+plus ancienne que ``ANNEES_CHAUDES`` ans) en fichiers Parquet compressés
+(zstd, colonnes typées). Un chargement sans date de début ne lit que les
+partitions chaudes ; les archives ne sont lues que si la période demandée
+les atteint. Écritures et suppressions les modifient en place.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import tempfile
+import threading
+import unicodedata
+from contextlib import contextmanager, ExitStack
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from data import data_manager as fichiers
+from data.cles import version_observations
+
+try:
+    import fcntl
+except ImportError:  # Windows : verrous limités au processus
+    fcntl = None
+
+# Exports : mise en forme Excel indépendante du stockage
+from data.data_manager import (
+    exporter_equipements_excel,
+    exporter_observations_excel,
+    exporter_suivi_excel
+)
+
+DOSSIER_PARTITIONS = os.environ.get(
+    "MAINTENANCE_PARTITIONS_DOSSIER",
+    os.path.join(os.path.dirname(__file__), "partitions")
+)
+PAR_ANNEE = os.environ.get("MAINTENANCE_PARTITIONS_ANNEE", "1") == "1"
+
+FICHIER_CATALOGUE = os.path.join(DOSSIER_PARTITIONS, "catalogue.json")
+FICHIER_EQUIPEMENTS = os.path.join(os.path.dirname(__file__), "equipements.xlsx")
+
+# Partitions dont la dernière date est plus ancienne : archivées par archiver()
+ANNEES_CHAUDES = int(os.environ.get("MAINTENANCE_ARCHIVES_ANNEES", "3"))
+COMPRESSION_ARCHIVES = "zstd"
+
+LECTEURS_MAX = 8
+DEPARTEMENT_INCONNU = "(sans département)"
+
+COLONNES_EQUIPEMENTS = ['id_equipement', 'departement']
+COLONNES = {
+    'observations': [
+        'id_equipement', 'date', 'observation',
+        'recommandation', 'travaux', 'analyste', 'importance'
+    ],
+    'suivi': [
+        'id_equipement', 'point_mesure', 'date', 'vitesse_rpm',
+        'twf_rms_g', 'crest_factor', 'twf_peak_to_peak_g'
+    ],
+}
+
+_verrou = threading.Lock()
+_verrous = {}
+_verrou_referentiel = threading.Lock()
+_referentiel = {'signature': None, 'df': None}
+_executeur = ThreadPoolExecutor(max_workers=LECTEURS_MAX, thread_name_prefix="partition")
+_initialise = False
+
+
+# =============================================================================
+# VERROUS ET CATALOGUE
+# =============================================================================
+
+@contextmanager
+def _verrouiller(chemin):
+    """Verrou exclusif d'un fichier : entre fils du processus et entre processus."""
+    with _verrou:
+        verrou = _verrous.setdefault(chemin, threading.Lock())
+
+    with verrou:
+        if fcntl is None:
+            yield
+            return
+        with open(chemin + ".verrou", 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _ecrire_atomique(chemin, ecrire):
+    """Écrit un fichier via un fichier temporaire renommé (jamais de fichier tronqué)."""
+    # Extension conservée : les écrivains Excel la vérifient
+    descripteur, temporaire = tempfile.mkstemp(
+        dir=os.path.dirname(chemin), suffix=".tmp" + os.path.splitext(chemin)[1]
+    )
+    os.close(descripteur)
+    try:
+        ecrire(temporaire)
+        os.replace(temporaire, chemin)
+    except BaseException:
+        os.remove(temporaire)
+        raise
+
+
+def _lire_catalogue():
+    """Catalogue {table: {clé de partition: description}}."""
+    if not os.path.exists(FICHIER_CATALOGUE):
+        return {table: {} for table in COLONNES}
+    with open(FICHIER_CATALOGUE, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _ecrire_catalogue(catalogue):
+    """Écriture atomique du catalogue (à appeler sous son verrou)."""
+    def ecrire(chemin):
+        with open(chemin, 'w', encoding='utf-8') as f:
+            json.dump(catalogue, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+    _ecrire_atomique(FICHIER_CATALOGUE, ecrire)
+
+
+def catalogue(table=None):
+    """Description des partitions (toutes les tables, ou une seule).
+
+    Returns:
+        DataFrame table, partition, departement, annee, lignes, date_min,
+        date_max, archive.
+    """
+    lignes = [
+        {'table': nom, 'partition': cle, 'archive': False, **description}
+        for nom, partitions in _lire_catalogue().items()
+        if table is None or nom == table
+        for cle, description in partitions.items()
+    ]
+    return pd.DataFrame(
+        lignes,
+        columns=['table', 'partition', 'departement', 'annee', 'lignes', 'date_min', 'date_max', 'archive']
+    )
+
+
+def departements(table):
+    """Départements ayant au moins une partition pour une table."""
+    return sorted({d['departement'] for d in _lire_catalogue()[table].values()})
+
+
+def _nom_departement(departement):
+    """Nom de dossier stable et sûr pour un département (lisible + empreinte)."""
+    lisible = unicodedata.normalize('NFKD', departement).encode('ascii', 'ignore').decode()
+    lisible = re.sub(r'[^A-Za-z0-9]+', '_', lisible).strip('_')[:40] or "departement"
+    empreinte = hashlib.sha1(departement.encode('utf-8')).hexdigest()[:8]
+    return f"{lisible}-{empreinte}"
+
+
+def _cle_partition(departement, annee):
+    """Clé de catalogue (chemin relatif sans extension) d'une partition."""
+    return f"{_nom_departement(departement)}/{annee if PAR_ANNEE else 'tout'}"
+
+
+def _chemin(table, cle, archive=False):
+    """Fichier d'une partition : CSV, ou Parquet si elle est archivée."""
+    return os.path.join(DOSSIER_PARTITIONS, table, cle + (".parquet" if archive else ".csv"))
+
+
+# =============================================================================
+# RÉFÉRENTIEL
+# =============================================================================
+
+def charger_equipements(departements=None):
+    """Charge le référentiel équipements (relu seulement si le fichier a changé).
+
+    Args:
+        departements: Départements retenus (None = tous).
+
+    Returns:
+        DataFrame id_equipement, departement.
+    """
+    if not os.path.exists(FICHIER_EQUIPEMENTS):
+        return pd.DataFrame(columns=COLONNES_EQUIPEMENTS)
+
+    etat = os.stat(FICHIER_EQUIPEMENTS)
+    signature = (etat.st_mtime_ns, etat.st_size)
+
+    with _verrou_referentiel:
+        if _referentiel['signature'] != signature:
+            _referentiel['df'] = pd.read_excel(FICHIER_EQUIPEMENTS, dtype=str)[COLONNES_EQUIPEMENTS]
+            _referentiel['signature'] = signature
+        df = _referentiel['df']
+
+    if departements:
+        df = df[df['departement'].isin(departements)]
+    return df.copy()
+
+
+def _ecrire_referentiel(df):
+    """Réécrit le référentiel (à appeler sous son verrou)."""
+    _ecrire_atomique(
+        FICHIER_EQUIPEMENTS,
+        lambda chemin: df.sort_values(['departement', 'id_equipement']).to_excel(
+            chemin, index=False, engine='openpyxl'
+        )
+    )
+
+
+def _departements_de(ids):
+    """Département courant de chaque ID (DEPARTEMENT_INCONNU si absent du référentiel)."""
+    par_id = charger_equipements().drop_duplicates('id_equipement').set_index('id_equipement')['departement']
+    return pd.Series(ids, dtype=str).map(par_id).fillna(DEPARTEMENT_INCONNU).to_numpy()
+
+
+# =============================================================================
+# LECTURE (ÉLAGAGE ET PARALLÉLISME)
+# =============================================================================
+
+def _lire_partition(table, cle, archive=False, colonnes=None):
+    """Lit une partition (DataFrame vide si elle a disparu entre-temps).
+
+    Args:
+        colonnes: Colonnes lues (None = toutes) ; une archive ne décompresse
+            que celles-ci.
+    """
+    try:
+        if archive:
+            return pd.read_parquet(_chemin(table, cle, archive=True), columns=colonnes)
+        return pd.read_csv(_chemin(table, cle), dtype={'id_equipement': str}, usecols=colonnes)
+    except FileNotFoundError:
+        return pd.DataFrame(columns=colonnes or COLONNES[table])
+
+
+def _partitions_retenues(table, departements=None, date_debut=None, date_fin=None, archives=None):
+    """Partitions pouvant contenir des lignes retenues (catalogue).
+
+    Args:
+        archives: None = archives retenues seulement si date_debut les
+            atteint ; True = toujours ; False = jamais.
+
+    Returns:
+        Liste de (clé, archivée).
+    """
+    debut = None if date_debut is None else pd.Timestamp(date_debut).strftime('%Y-%m-%d')
+    fin = None if date_fin is None else pd.Timestamp(date_fin).strftime('%Y-%m-%d')
+    if archives is None:
+        archives = debut is not None
+
+    return [
+        (cle, description.get('archive', False))
+        for cle, description in sorted(_lire_catalogue()[table].items())
+        if (departements is None or description['departement'] in departements)
+        and (debut is None or description['date_max'] >= debut)
+        and (fin is None or description['date_min'] <= fin)
+        and (archives or not description.get('archive', False))
+    ]
+
+
+def _departements_lus(departements, equipements):
+    """Départements à lire d'après les filtres (None = tous)."""
+    lus = set(departements) if departements else None
+    if equipements:
+        des_equipements = set(_departements_de(list(equipements)))
+        lus = des_equipements if lus is None else lus & des_equipements
+    return lus
+
+
+def _lire(table, departements=None, date_debut=None, date_fin=None, archives=None, colonnes=None):
+    """Lit en parallèle les partitions retenues et les concatène."""
+    partitions = _partitions_retenues(table, departements, date_debut, date_fin, archives)
+    morceaux = [
+        df for df in _executeur.map(
+            lambda partition: _lire_partition(table, *partition, colonnes=colonnes), partitions
+        )
+        if not df.empty
+    ]
+
+    colonnes = colonnes or COLONNES[table]
+    if not morceaux:
+        return pd.DataFrame(columns=colonnes)
+    return pd.concat(morceaux, ignore_index=True).reindex(columns=colonnes)
+
+
+def _filtrer(df, colonne, valeurs):
+    """Filtre exact sur une colonne (aucun filtre si valeurs vide)."""
+    return df[df[colonne].isin(list(valeurs))] if valeurs else df
+
+
+def _filtrer_periode(df, date_debut, date_fin):
+    """Filtre exact sur la période (dates ISO, bornes incluses)."""
+    if date_debut is not None:
+        df = df[df['date'] >= pd.Timestamp(date_debut).strftime('%Y-%m-%d')]
+    if date_fin is not None:
+        df = df[df['date'] <= pd.Timestamp(date_fin).strftime('%Y-%m-%d')]
+    return df
+
+
+def charger_observations(departements=None, equipements=None, date_debut=None, date_fin=None):
+    """Charge les observations ; seules les partitions concernées sont lues.
+
+    Les archives ne sont lues que si date_debut les atteint.
+
+    Args:
+        departements: Départements retenus (None = tous).
+        equipements: Équipements retenus (None = tous) ; limitent aussi les
+            départements lus.
+        date_debut: Première date incluse.
+        date_fin: Dernière date incluse.
+
+    Returns:
+        DataFrame des colonnes d'observation.
+    """
+    df = _lire('observations', _departements_lus(departements, equipements), date_debut, date_fin)
+    df = _filtrer(df, 'id_equipement', equipements)
+    return _filtrer_periode(df, date_debut, date_fin).reset_index(drop=True)
+
+
+def charger_suivi(equipements=None, points=None, date_debut=None, date_fin=None, departements=None):
+    """Charge les mesures de suivi ; seules les partitions concernées sont lues.
+
+    Les archives ne sont lues que si date_debut les atteint.
+
+    Args:
+        equipements: Équipements retenus (None = tous).
+        points: Points de mesure retenus (None = tous).
+        date_debut: Première date incluse.
+        date_fin: Dernière date incluse.
+        departements: Départements retenus (None = tous).
+
+    Returns:
+        DataFrame des colonnes de suivi.
+    """
+    df = _lire('suivi', _departements_lus(departements, equipements), date_debut, date_fin)
+    df = _filtrer(_filtrer(df, 'id_equipement', equipements), 'point_mesure', points)
+    return _filtrer_periode(df, date_debut, date_fin).reset_index(drop=True)
+
+
+# =============================================================================
+# ÉCRITURE (PAR PARTITION)
+# =============================================================================
+
+def _decrire(departement, annee, df, archive=False):
+    """Entrée de catalogue d'une partition d'après son contenu."""
+    return {
+        'departement': departement,
+        'annee': annee,
+        'lignes': len(df),
+        'date_min': df['date'].min(),
+        'date_max': df['date'].max(),
+        'archive': archive,
+    }
+
+
+def _ajouter(table, df, departements=None):
+    """Ajoute des lignes à leurs partitions (une écriture par partition touchée).
+
+    Args:
+        table: 'observations' ou 'suivi'.
+        df: Lignes (colonnes de la table ; dates quelconques).
+        departements: Département de chaque ligne (par défaut : référentiel).
+
+    Returns:
+        Liste des départements touchés.
+    """
+    df = df.reindex(columns=COLONNES[table]).assign(
+        date=pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d')
+    )
+    departements = _departements_de(df['id_equipement']) if departements is None else departements
+    annees = df['date'].str[:4].astype(int) if PAR_ANNEE else pd.Series(0, index=df.index)
+
+    groupes = {
+        _cle_partition(departement, int(annee)): (departement, int(annee), lignes)
+        for (departement, annee), lignes
+        in df.groupby([departements, annees.to_numpy()], sort=False)
+    }
+
+    descriptions = {}
+    with ExitStack() as verrous:
+        # Partitions verrouillées jusqu'à la mise à jour du catalogue (partition puis
+        # catalogue) ; ordre fixe : deux écritures simultanées ne s'interbloquent pas
+        for cle in sorted(groupes):
+            chemin = _chemin(table, cle)
+            os.makedirs(os.path.dirname(chemin), exist_ok=True)
+            verrous.enter_context(_verrouiller(chemin))
+
+        for cle, (departement, annee, lignes) in groupes.items():
+            chemin = _chemin(table, cle)
+            archive = os.path.exists(_chemin(table, cle, archive=True))
+            if archive:
+                # Partition archivée : réécrite avec les nouvelles lignes
+                _ecrire_archive(table, cle, pd.concat(
+                    [_lire_partition(table, cle, archive=True), lignes], ignore_index=True
+                ))
+            else:
+                nouveau = not os.path.exists(chemin) or os.path.getsize(chemin) == 0
+                lignes.to_csv(chemin, mode='a', header=nouveau, index=False)
+
+            descriptions[cle] = (departement, annee, lignes, archive)
+
+        with _verrouiller(FICHIER_CATALOGUE):
+            catalogue_courant = _lire_catalogue()
+            partitions = catalogue_courant.setdefault(table, {})
+            for cle, (departement, annee, lignes, archive) in descriptions.items():
+                ancienne = partitions.get(cle)
+                description = _decrire(departement, annee, lignes, archive)
+                if ancienne:
+                    description['lignes'] += ancienne['lignes']
+                    description['date_min'] = min(description['date_min'], ancienne['date_min'])
+                    description['date_max'] = max(description['date_max'], ancienne['date_max'])
+                partitions[cle] = description
+            _ecrire_catalogue(catalogue_courant)
+
+    return sorted({d for d, _, _, _ in descriptions.values()})
+
+
+def _reecrire(table, cles, garder):
+    """Réécrit des partitions en ne gardant que les lignes retenues.
+
+    Args:
+        table: 'observations' ou 'suivi'.
+        cles: Partitions à réécrire : (clé, archivée), voir _partitions_retenues.
+        garder: Fonction DataFrame → masque des lignes à conserver.
+
+    Returns:
+        Tuple (lignes retirées, DataFrame des lignes retirées).
+    """
+    retirees = []
+    descriptions = {}
+
+    with ExitStack() as verrous:
+        # Verrou commun aux deux formats : celui du fichier CSV. Partitions verrouillées
+        # jusqu'à la mise à jour du catalogue (partition puis catalogue), en ordre fixe
+        for cle in sorted({cle for cle, _ in cles}):
+            verrous.enter_context(_verrouiller(_chemin(table, cle)))
+
+        for cle, archive in cles:
+            df = _lire_partition(table, cle, archive)
+            masque = garder(df)
+            if masque.all():
+                continue
+
+            retirees.append(df[~masque])
+            reste = df[masque]
+            if reste.empty:
+                os.remove(_chemin(table, cle, archive))
+            elif archive:
+                _ecrire_archive(table, cle, reste)
+            else:
+                _ecrire_atomique(_chemin(table, cle), lambda c: reste.to_csv(c, index=False))
+            descriptions[cle] = (reste, archive)
+
+        if descriptions:
+            with _verrouiller(FICHIER_CATALOGUE):
+                catalogue_courant = _lire_catalogue()
+                partitions = catalogue_courant[table]
+                for cle, (reste, archive) in descriptions.items():
+                    if reste.empty:
+                        partitions.pop(cle, None)
+                    else:
+                        ancienne = partitions[cle]
+                        partitions[cle] = _decrire(
+                            ancienne['departement'], ancienne['annee'], reste, archive
+                        )
+                _ecrire_catalogue(catalogue_courant)
+
+    if not retirees:
+        return 0, pd.DataFrame(columns=COLONNES[table])
+    retirees = pd.concat(retirees, ignore_index=True)
+    return len(retirees), retirees
+
+
+def _cles_equipement(table, id_equipement, departement=None, date=None):
+    """Partitions pouvant contenir les lignes d'un équipement (à une date), archives comprises."""
+    departement = departement or _departements_de([id_equipement])[0]
+    return _partitions_retenues(table, [departement], date, date, archives=True)
+
+
+def sauvegarder_equipement(id_equipement, departement):
+    """Ajoute un équipement au référentiel.
+
+    Returns:
+        Tuple (succès, message).
+    """
+    try:
+        with _verrouiller(FICHIER_EQUIPEMENTS):
+            df = charger_equipements()
+            if (df['id_equipement'] == id_equipement).any():
+                return False, f"⚠️ L'équipement {id_equipement} existe déjà"
+            _ecrire_referentiel(pd.concat(
+                [df, pd.DataFrame([{'id_equipement': id_equipement, 'departement': departement}])],
+                ignore_index=True
+            ))
+        return True, f"✅ Équipement {id_equipement} ajouté ({departement})"
+    except Exception as e:
+        return False, f"❌ Erreur lors de l'enregistrement : {str(e)}"
+
+
+def sauvegarder_equipements_lot(df_equipements):
+    """Ajoute ou met à jour des équipements ; un changement de département
+    déplace les observations et mesures de l'équipement vers ses nouvelles
+    partitions.
+
+    Returns:
+        Tuple (succès, message).
+    """
+    try:
+        df_equipements = df_equipements[COLONNES_EQUIPEMENTS].astype(str)
+
+        with _verrouiller(FICHIER_EQUIPEMENTS):
+            actuel = charger_equipements()
+            anciens = actuel.drop_duplicates('id_equipement').set_index('id_equipement')['departement']
+            nouveaux = df_equipements.drop_duplicates('id_equipement', keep='last')
+
+            deplaces = nouveaux[
+                nouveaux['id_equipement'].isin(anciens.index)
+                & (nouveaux['id_equipement'].map(anciens) != nouveaux['departement'])
+            ]
+
+            _ecrire_referentiel(pd.concat(
+                [actuel[~actuel['id_equipement'].isin(nouveaux['id_equipement'])], nouveaux],
+                ignore_index=True
+            ))
+
+        # Lignes des équipements déplacés : retirées des anciennes partitions, réécrites
+        if not deplaces.empty:
+            ids = set(deplaces['id_equipement'])
+            for table in COLONNES:
+                cles = _partitions_retenues(table, set(anciens[list(ids)]), archives=True)
+                _, lignes = _reecrire(table, cles, lambda df: ~df['id_equipement'].isin(ids))
+                if not lignes.empty:
+                    _ajouter(table, lignes)
+
+        return True, f"✅ {len(df_equipements)} équipement(s) enregistré(s)"
+    except Exception as e:
+        return False, f"❌ Erreur lors de l'enregistrement : {str(e)}"
+
+
+def sauvegarder_observation(id_equipement, date, observation, recommandation,
+                            travaux, analyste, importance=None):
+    """Enregistre une observation (ajout d'une ligne à sa partition).
+
+    Returns:
+        Tuple (succès, message).
+    """
+    try:
+        _ajouter('observations', pd.DataFrame([{
+            'id_equipement': id_equipement,
+            'date': date,
+            'observation': observation,
+            'recommandation': recommandation,
+            'travaux': travaux,
+            'analyste': analyste,
+            'importance': importance,
+        }]))
+        return True, f"✅ Observation enregistrée pour {id_equipement}"
+    except Exception as e:
+        return False, f"❌ Erreur lors de l'enregistrement : {str(e)}"
+
+
+def sauvegarder_suivi(id_equipement, point_mesure, date, vitesse_rpm,
+                      twf_rms_g, crest_factor, twf_peak_to_peak_g):
+    """Enregistre une mesure de suivi (ajout d'une ligne à sa partition).
+
+    Returns:
+        Tuple (succès, message).
+    """
+    try:
+        _ajouter('suivi', pd.DataFrame([{
+            'id_equipement': id_equipement,
+            'point_mesure': point_mesure,
+            'date': date,
+            'vitesse_rpm': vitesse_rpm,
+            'twf_rms_g': twf_rms_g,
+            'crest_factor': crest_factor,
+            'twf_peak_to_peak_g': twf_peak_to_peak_g,
+        }]))
+        return True, f"✅ Mesure enregistrée pour {id_equipement} ({point_mesure})"
+    except Exception as e:
+        return False, f"❌ Erreur lors de l'enregistrement : {str(e)}"
+
+
+def sauvegarder_observations_lot(df_observations):
+    """Ajoute des observations (une écriture par partition touchée).
+
+    Returns:
+        Tuple (succès, message).
+    """
+    try:
+        _ajouter('observations', df_observations)
+        return True, f"✅ {len(df_observations)} observation(s) enregistrée(s)"
+    except Exception as e:
+        return False, f"❌ Erreur lors de l'enregistrement : {str(e)}"
+
+
+def sauvegarder_suivi_lot(df_suivi):
+    """Ajoute des mesures de suivi (une écriture par partition touchée).
+
+    Returns:
+        Tuple (succès, message).
+    """
+    try:
+        _ajouter('suivi', df_suivi)
+        return True, f"✅ {len(df_suivi)} mesure(s) enregistrée(s)"
+    except Exception as e:
+        return False, f"❌ Erreur lors de l'enregistrement : {str(e)}"
+
+
+# =============================================================================
+# MODIFICATION (RÉÉCRITURE DES SEULES PARTITIONS TOUCHÉES)
+# =============================================================================
+
+def modifier_observations(avant, apres):
+    """Corrige des observations en une écriture par partition touchée.
+
+    Contrôle de version optimiste : chaque ligne est retrouvée par la version
+    de son contenu lu (``cles.version_observations``). Si l'une d'elles a été
+    modifiée ou supprimée entre-temps, rien n'est écrit. Les partitions
+    touchées restent verrouillées de la vérification à l'écriture.
+
+    Args:
+        avant: Lignes telles que lues (colonnes d'une observation).
+        apres: Nouvelles valeurs, même index ; équipement et date inchangés.
+
+    Returns:
+        Tuple (succès, message).
+    """
+    colonnes = COLONNES['observations']
+    modifiables = [c for c in colonnes if c not in ('id_equipement', 'date')]
+
+    try:
+        avant = avant.reindex(columns=colonnes)
+        apres = apres.reindex(columns=colonnes).loc[avant.index]
+        jours = pd.to_datetime(avant['date']).dt.strftime('%Y-%m-%d')
+
+        if (
+            (apres['id_equipement'] != avant['id_equipement']).any()
+            or (pd.to_datetime(apres['date']).dt.strftime('%Y-%m-%d') != jours).any()
+        ):
+            return False, "⚠️ L'équipement et la date d'une observation ne se corrigent pas (supprimer puis ressaisir)"
+
+        departements = _departements_de(avant['id_equipement'])
+        annees = jours.str[:4].astype(int) if PAR_ANNEE else pd.Series(0, index=avant.index)
+        cles = pd.Series(
+            [_cle_partition(d, int(a)) for d, a in zip(departements, annees)], index=avant.index
+        )
+        versions = pd.Series(version_observations(avant), index=avant.index)
+
+        with ExitStack() as verrous:
+            # Ordre fixe : deux corrections simultanées ne s'interbloquent pas
+            for cle in sorted(set(cles)):
+                verrous.enter_context(_verrouiller(_chemin('observations', cle)))
+
+            corrigees = {}
+            conflits = 0
+            for cle, lignes in cles.groupby(cles, sort=False):
+                archive = os.path.exists(_chemin('observations', cle, archive=True))
+                df = _lire_partition('observations', cle, archive)
+                versions_partition = version_observations(df)
+
+                # Lignes identiques : chacune retrouvée une seule fois
+                positions = []
+                for version in versions[lignes.index]:
+                    libres = [p for p in np.flatnonzero(versions_partition == version) if p not in positions]
+                    if libres:
+                        positions.append(libres[0])
+                if len(positions) < len(lignes):
+                    conflits += len(lignes) - len(positions)
+                    continue
+
+                df = df.astype({c: object for c in modifiables})
+                df.iloc[positions, [colonnes.index(c) for c in modifiables]] = (
+                    apres.loc[lignes.index, modifiables].to_numpy()
+                )
+                corrigees[cle] = (df, archive)
+
+            if conflits:
+                return False, (
+                    f"⚠️ {conflits} observation(s) modifiée(s) ou supprimée(s) entre-temps : "
+                    f"aucune correction enregistrée, rechargez puis recommencez"
+                )
+
+            for cle, (df, archive) in corrigees.items():
+                if archive:
+                    _ecrire_archive('observations', cle, df)
+                else:
+                    _ecrire_atomique(_chemin('observations', cle), lambda c, df=df: df.to_csv(c, index=False))
+
+        return True, f"✅ {len(avant)} observation(s) corrigée(s)"
+    except Exception as e:
+        return False, f"❌ Erreur lors de la modification : {str(e)}"
+
+
+# =============================================================================
+# SUPPRESSION (RÉÉCRITURE DES SEULES PARTITIONS TOUCHÉES)
+# =============================================================================
+
+def supprimer_observation(id_equipement, date):
+    """Supprime les observations d'un équipement à une date.
+
+    Returns:
+        Tuple (succès, message).
+    """
+    try:
+        jour = pd.Timestamp(date).strftime('%Y-%m-%d')
+        nombre, _ = _reecrire(
+            'observations',
+            _cles_equipement('observations', id_equipement, date=jour),
+            lambda df: ~((df['id_equipement'] == id_equipement) & (df['date'] == jour))
+        )
+        if nombre == 0:
+            return False, f"⚠️ Aucune observation pour {id_equipement} le {jour}"
+        return True, f"✅ {nombre} observation(s) supprimée(s)"
+    except Exception as e:
+        return False, f"❌ Erreur lors de la suppression : {str(e)}"
+
+
+def supprimer_suivi(id_equipement, point_mesure, date):
+    """Supprime les mesures d'un équipement, d'un point et d'une date.
+
+    Returns:
+        Tuple (succès, message).
+    """
+    try:
+        jour = pd.Timestamp(date).strftime('%Y-%m-%d')
+        nombre, _ = _reecrire(
+            'suivi',
+            _cles_equipement('suivi', id_equipement, date=jour),
+            lambda df: ~(
+                (df['id_equipement'] == id_equipement)
+                & (df['point_mesure'] == point_mesure)
+                & (df['date'] == jour)
+            )
+        )
+        if nombre == 0:
+            return False, f"⚠️ Aucune mesure pour {id_equipement} ({point_mesure}) le {jour}"
+        return True, f"✅ {nombre} mesure(s) supprimée(s)"
+    except Exception as e:
+        return False, f"❌ Erreur lors de la suppression : {str(e)}"
+
+
+def supprimer_equipement(id_equipement):
+    """Supprime un équipement et ses lignes dans les partitions de son département.
+
+    Returns:
+        Tuple (succès, message).
+    """
+    try:
+        departement = _departements_de([id_equipement])[0]
+
+        with _verrouiller(FICHIER_EQUIPEMENTS):
+            df = charger_equipements()
+            if not (df['id_equipement'] == id_equipement).any():
+                return False, f"⚠️ Équipement {id_equipement} introuvable"
+            _ecrire_referentiel(df[df['id_equipement'] != id_equipement])
+
+        for table in COLONNES:
+            _reecrire(
+                table,
+                _cles_equipement(table, id_equipement, departement),
+                lambda lignes: lignes['id_equipement'] != id_equipement
+            )
+
+        return True, f"✅ Équipement {id_equipement} supprimé (observations et mesures incluses)"
+    except Exception as e:
+        return False, f"❌ Erreur lors de la suppression : {str(e)}"
+
+
+# =============================================================================
+# ARCHIVES (PARTITIONS FROIDES COMPRESSÉES)
+# =============================================================================
+
+def _ecrire_archive(table, cle, df):
+    """Écrit une partition archivée : Parquet compressé, colonnes typées
+    (à appeler sous le verrou de la partition)."""
+    df = df.reindex(columns=COLONNES[table])
+    typees = {
+        colonne: (
+            pd.to_numeric(df[colonne], errors='coerce')
+            if table == 'suivi' and colonne in COLONNES['suivi'][3:]
+            else df[colonne].where(df[colonne].isna(), df[colonne].astype(str))
+        )
+        for colonne in COLONNES[table]
+    }
+    _ecrire_atomique(
+        _chemin(table, cle, archive=True),
+        lambda chemin: pd.DataFrame(typees).to_parquet(
+            chemin, index=False, compression=COMPRESSION_ARCHIVES
+        )
+    )
+
+
+def _duree_chargement(table):
+    """Durée (s) de lecture des partitions chaudes d'une table."""
+    debut = time.perf_counter()
+    _lire(table)
+    return time.perf_counter() - debut
+
+
+def archiver(annees=ANNEES_CHAUDES):
+    """Archive les partitions froides : dernière date plus ancienne que ``annees`` ans.
+
+    Chaque partition froide est convertie en Parquet compressé puis son CSV
+    est supprimé ; le catalogue la marque archivée.
+
+    Args:
+        annees: Ancienneté (années) au-delà de laquelle une partition est froide.
+
+    Returns:
+        Tuple (succès, message, rapport) ; rapport : liste de dictionnaires
+        par table (partitions, lignes, octets_avant, octets_apres,
+        chargement_avant_s, chargement_apres_s).
+    """
+    limite = (pd.Timestamp.today().normalize() - pd.DateOffset(years=annees)).strftime('%Y-%m-%d')
+    rapport = []
+
+    try:
+        for table in COLONNES:
+            froides = [
+                cle for cle, description in sorted(_lire_catalogue()[table].items())
+                if not description.get('archive', False) and description['date_max'] < limite
+            ]
+            ligne = {
+                'table': table, 'partitions': 0, 'lignes': 0,
+                'octets_avant': 0, 'octets_apres': 0,
+                'chargement_avant_s': _duree_chargement(table) if froides else 0.0,
+            }
+
+            for cle in froides:
+                chemin = _chemin(table, cle)
+                with _verrouiller(chemin):
+                    if not os.path.exists(chemin):
+                        continue
+                    df = _lire_partition(table, cle)
+                    ligne['octets_avant'] += os.path.getsize(chemin)
+                    _ecrire_archive(table, cle, df)
+                    ligne['octets_apres'] += os.path.getsize(_chemin(table, cle, archive=True))
+
+                    with _verrouiller(FICHIER_CATALOGUE):
+                        catalogue_courant = _lire_catalogue()
+                        catalogue_courant[table][cle]['archive'] = True
+                        _ecrire_catalogue(catalogue_courant)
+                    os.remove(chemin)
+
+                ligne['partitions'] += 1
+                ligne['lignes'] += len(df)
+
+            ligne['chargement_apres_s'] = _duree_chargement(table) if froides else 0.0
+            rapport.append(ligne)
+    except Exception as e:
+        return False, f"❌ Erreur lors de l'archivage : {str(e)}", rapport
+
+    partitions = sum(ligne['partitions'] for ligne in rapport)
+    if partitions == 0:
+        return True, f"ℹ️ Aucune partition antérieure au {limite} à archiver", rapport
+
+    economie = sum(ligne['octets_avant'] - ligne['octets_apres'] for ligne in rapport)
+    return True, (
+        f"✅ {partitions} partition(s) archivée(s), "
+        f"{economie / 1024 / 1024:.1f} Mo économisés"
+    ), rapport
+
+
+def charger_archives(table, colonnes=None, date_debut=None, date_fin=None):
+    """Lignes archivées d'une table (seules les colonnes demandées sont décompressées).
+
+    Args:
+        table: 'observations' ou 'suivi'.
+        colonnes: Colonnes lues (None = toutes).
+        date_debut: Première date incluse.
+        date_fin: Dernière date incluse.
+
+    Returns:
+        DataFrame des lignes archivées.
+    """
+    partitions = [
+        (cle, archive)
+        for cle, archive in _partitions_retenues(table, None, date_debut, date_fin, archives=True)
+        if archive
+    ]
+    morceaux = [
+        df for df in _executeur.map(
+            lambda partition: _lire_partition(table, *partition, colonnes=colonnes), partitions
+        )
+        if not df.empty
+    ]
+
+    colonnes = colonnes or COLONNES[table]
+    if not morceaux:
+        return pd.DataFrame(columns=colonnes)
+    df = pd.concat(morceaux, ignore_index=True)
+    if 'date' in df.columns:
+        df = _filtrer_periode(df, date_debut, date_fin)
+    return df.reset_index(drop=True)
+
+
+def etendue_archives(table):
+    """(première date, dernière date) des archives d'une table, None sans archive."""
+    archivees = [d for d in _lire_catalogue()[table].values() if d.get('archive', False)]
+    if not archivees:
+        return None
+    return min(d['date_min'] for d in archivees), max(d['date_max'] for d in archivees)
+
+
+# =============================================================================
+# INITIALISATION (RÉPARTITION DE L'HISTORIQUE EXISTANT)
+# =============================================================================
+
+def initialiser_fichiers():
+    """Crée le stockage partitionné ; au premier démarrage, y répartit
+    l'historique du stockage fichiers (une fois par processus)."""
+    global _initialise
+
+    if _initialise:
+        return
+
+    fichiers.initialiser_fichiers()
+    os.makedirs(DOSSIER_PARTITIONS, exist_ok=True)
+
+    # Un seul processus répartit l'historique ; les autres attendent la fin
+    with _verrouiller(os.path.join(DOSSIER_PARTITIONS, "migration")):
+        if not os.path.exists(FICHIER_CATALOGUE):
+            for table, chargeur in (('observations', fichiers.charger_observations),
+                                    ('suivi', fichiers.charger_suivi)):
+                df = chargeur()
+                dates = pd.to_datetime(df['date'], errors='coerce')
+                if dates.notna().any():
+                    # Lignes à date illisible : laissées dans l'historique d'origine
+                    _ajouter(table, df[dates.notna()])
+
+            with _verrouiller(FICHIER_CATALOGUE):
+                if not os.path.exists(FICHIER_CATALOGUE):
+                    _ecrire_catalogue({table: {} for table in COLONNES})
+
+    _initialise = True
@@ -0,0 +1,528 @@
+"""
+Couche d'accès données Supabase - Même API que data_manager
+
+Les tables sont lues et écrites via l'API REST de Supabase (PostgREST) :
+- une seule connexion HTTP réutilisée par le processus (pool keep-alive)
+- lecture par pages en pagination par clé (« keyset »), sans OFFSET
+- filtres appliqués côté serveur (départements, équipements, période)
+- insertions groupées par lots, une requête par lot
+- suppression d'un équipement en une requête : observations et mesures
+  suivent par ON DELETE CASCADE (voir schema_supabase.sql)
+- corrections d'observations en une transaction (fonction SQL), avec
+  contrôle de version optimiste
+
+Configuration :
+- ``SUPABASE_URL`` et ``SUPABASE_KEY`` : projet Supabase
+- ``SUPABASE_REST_URL`` : URL PostgREST directe (ex. instance locale de test),
+  prioritaire sur ``SUPABASE_URL``
+"""
+
+import os
+import threading
+import httpx
+import pandas as pd
+from postgrest import SyncPostgrestClient, CountMethod, ReturnMethod
+from postgrest.exceptions import APIError
+
+# Exports : mise en forme Excel indépendante du stockage
+from data.data_manager import (
+    exporter_equipements_excel,
+    exporter_observations_excel,
+    exporter_suivi_excel
+)
+
+SUPABASE_URL = os.environ.get("SUPABASE_URL", "")
+SUPABASE_KEY = os.environ.get("SUPABASE_KEY", "")
+SUPABASE_REST_URL = os.environ.get("SUPABASE_REST_URL", "")
+
+# Supabase limite une réponse à 1000 lignes par défaut
+TAILLE_PAGE = 1000
+TAILLE_LOT_INSERTION = 500
+CONNEXIONS_MAX = 10
+DELAI_REQUETE = 30  # secondes
+
+COLONNES_EQUIPEMENTS = ['id_equipement', 'departement']
+
+COLONNES_OBSERVATIONS = [
+    'id_equipement', 'date', 'observation',
+    'recommandation', 'travaux', 'analyste', 'importance'
+]
+
+COLONNES_SUIVI = [
+    'id_equipement', 'point_mesure', 'date', 'vitesse_rpm',
+    'twf_rms_g', 'crest_factor', 'twf_peak_to_peak_g'
+]
+
+# Violation de contrainte d'unicité (PostgreSQL)
+CODE_DOUBLON = "23505"
+# Exception levée par maintenance_modifier_observations (ligne modifiée entre-temps)
+CODE_CONFLIT = "P0001"
+
+_verrou = threading.Lock()
+_client = None
+_initialise = False
+
+
+# =============================================================================
+# CONNEXION
+# =============================================================================
+
+def client():
+    """Client PostgREST partagé par le processus (connexions réutilisées).
+
+    Returns:
+        SyncPostgrestClient.
+    """
+    global _client
+
+    with _verrou:
+        if _client is None:
+            url = SUPABASE_REST_URL or f"{SUPABASE_URL.rstrip('/')}/rest/v1"
+            if url == "/rest/v1":
+                raise RuntimeError("SUPABASE_URL (ou SUPABASE_REST_URL) n'est pas défini")
+
+            entetes = {'Accept': 'application/json', 'Content-Type': 'application/json'}
+            if SUPABASE_KEY:
+                entetes['apikey'] = SUPABASE_KEY
+                entetes['Authorization'] = f"Bearer {SUPABASE_KEY}"
+
+            _client = SyncPostgrestClient(
+                url,
+                headers=entetes,
+                http_client=httpx.Client(
+                    headers=entetes,
+                    timeout=DELAI_REQUETE,
+                    limits=httpx.Limits(
+                        max_connections=CONNEXIONS_MAX,
+                        max_keepalive_connections=CONNEXIONS_MAX
+                    )
+                )
+            )
+
+        return _client
+
+
+def initialiser_fichiers():
+    """Vérifie que les tables Supabase sont accessibles (une fois par processus)."""
+    global _initialise
+
+    if _initialise:
+        return
+    for table, cle in (('equipements', 'id_equipement'), ('observations', 'id'), ('suivi', 'id')):
+        try:
+            client().table(table).select(cle).limit(1).execute()
+        except (APIError, httpx.HTTPError) as e:
+            raise RuntimeError(
+                f"Table Supabase '{table}' inaccessible ({getattr(e, 'message', str(e))}) : "
+                f"appliquez data/schema_supabase.sql"
+            ) from e
+    _initialise = True
+
+
+# =============================================================================
+# LECTURE
+# =============================================================================
+
+def _date_iso(valeur):
+    """Date (date, datetime, Timestamp ou texte) au format AAAA-MM-JJ."""
+    return pd.Timestamp(valeur).strftime('%Y-%m-%d')
+
+
+def lire_pages(table, colonnes, cle, filtres=(), selection=None, taille_page=TAILLE_PAGE):
+    """Lit une table par pages successives, en pagination par clé.
+
+    Chaque page reprend après la dernière clé lue (``cle > derniere``) au lieu
+    d'un OFFSET : le coût d'une page reste constant quelle que soit sa
+    position dans la table.
+
+    Args:
+        table: Nom de la table.
+        colonnes: Colonnes retournées.
+        cle: Colonne unique et indexée servant à la pagination.
+        filtres: Filtres serveur, tuples (méthode, colonne, valeur), ex.
+            ('in_', 'id_equipement', ['A', 'B']) ou ('gte', 'date', '2024-01-01').
+        selection: Sélection PostgREST (défaut : colonnes + clé).
+        taille_page: Lignes par page.
+
+    Returns:
+        DataFrame des colonnes demandées.
+    """
+    if selection is None:
+        selection = ','.join(dict.fromkeys([cle, *colonnes]))
+
+    lignes = []
+    derniere = None
+
+    while True:
+        requete = client().table(table).select(selection)
+        for methode, colonne, valeur in filtres:
+            requete = getattr(requete, methode)(colonne, valeur)
+        if derniere is not None:
+            requete = requete.gt(cle, derniere)
+
+        page = requete.order(cle).limit(taille_page).execute().data
+        lignes.extend(page)
+
+        if len(page) < taille_page:
+            break
+        derniere = page[-1][cle]
+
+    return pd.DataFrame(lignes, columns=colonnes)
+
+
+def horizon():
+    """Horizon de visibilité : plus ancienne transaction encore ouverte côté serveur.
+
+    Toute écriture d'une transaction d'identifiant inférieur est validée et
+    visible (voir maintenance_horizon dans schema_supabase.sql).
+
+    Returns:
+        Identifiant de transaction (entier).
+    """
+    return int(client().rpc('maintenance_horizon', {}).execute().data)
+
+
+def _filtres_periode(date_debut, date_fin):
+    """Filtres serveur d'une période (bornes incluses)."""
+    filtres = []
+    if date_debut is not None:
+        filtres.append(('gte', 'date', _date_iso(date_debut)))
+    if date_fin is not None:
+        filtres.append(('lte', 'date', _date_iso(date_fin)))
+    return filtres
+
+
+def charger_equipements(departements=None):
+    """Charge le référentiel équipements.
+
+    Args:
+        departements: Départements retenus (None = tous), filtrés côté serveur.
+
+    Returns:
+        DataFrame id_equipement, departement.
+    """
+    filtres = [('in_', 'departement', list(departements))] if departements else []
+    return lire_pages('equipements', COLONNES_EQUIPEMENTS, 'id_equipement', filtres)
+
+
+def charger_observations(departements=None, equipements=None, date_debut=None, date_fin=None):
+    """Charge l'historique des observations, filtré côté serveur.
+
+    Le filtre par département passe par la jointure sur ``equipements``
+    (ressource imbriquée ``!inner``) : seules les lignes retenues transitent.
+
+    Args:
+        departements: Départements retenus (None = tous).
+        equipements: Équipements retenus (None = tous).
+        date_debut: Première date incluse.
+        date_fin: Dernière date incluse.
+
+    Returns:
+        DataFrame des colonnes d'observation.
+    """
+    filtres = _filtres_periode(date_debut, date_fin)
+    selection = None
+
+    if equipements:
+        filtres.append(('in_', 'id_equipement', list(equipements)))
+
+    if departements:
+        selection = ','.join(['id', *COLONNES_OBSERVATIONS, 'equipements!inner(departement)'])
+        filtres.append(('in_', 'equipements.departement', list(departements)))
+
+    return lire_pages('observations', COLONNES_OBSERVATIONS, 'id', filtres, selection)
+
+
+def charger_suivi(equipements=None, points=None, date_debut=None, date_fin=None):
+    """Charge les mesures de suivi, filtrées côté serveur.
+
+    Args:
+        equipements: Équipements retenus (None = tous).
+        points: Points de mesure retenus (None = tous).
+        date_debut: Première date incluse.
+        date_fin: Dernière date incluse.
+
+    Returns:
+        DataFrame des colonnes de suivi.
+    """
+    filtres = _filtres_periode(date_debut, date_fin)
+
+    if equipements:
+        filtres.append(('in_', 'id_equipement', list(equipements)))
+    if points:
+        filtres.append(('in_', 'point_mesure', list(points)))
+
+    return lire_pages('suivi', COLONNES_SUIVI, 'id', filtres)
+
+
+# =============================================================================
+# ÉCRITURE
+# =============================================================================
+
+def _enregistrements(df, colonnes):
+    """DataFrame → liste de dictionnaires JSON (NaN → null, dates ISO)."""
+    df = df.reindex(columns=colonnes)
+    if 'date' in colonnes:
+        df = df.assign(date=pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d'))
+    return df.astype(object).where(df.notna(), None).to_dict(orient='records')
+
+
+def _inserer_par_lots(table, enregistrements, taille_lot=TAILLE_LOT_INSERTION, conflit=None):
+    """Insère des lignes par lots (une requête par lot, sans retour des lignes).
+
+    Args:
+        table: Nom de la table.
+        enregistrements: Liste de dictionnaires.
+        taille_lot: Lignes par requête.
+        conflit: Colonne d'unicité pour un upsert (None = insertion simple).
+    """
+    for debut in range(0, len(enregistrements), taille_lot):
+        lot = enregistrements[debut:debut + taille_lot]
+        requete = client().table(table)
+        if conflit:
+            requete = requete.upsert(lot, on_conflict=conflit, returning=ReturnMethod.minimal)
+        else:
+            requete = requete.insert(lot, returning=ReturnMethod.minimal)
+        requete.execute()
+
+
+def sauvegarder_equipement(id_equipement, departement):
+    """Ajoute un équipement au référentiel.
+
+    Returns:
+        Tuple (succès, message).
+    """
+    try:
+        client().table('equipements').insert(
+            {'id_equipement': id_equipement, 'departement': departement},
+            returning=ReturnMethod.minimal
+        ).execute()
+        return True, f"✅ Équipement {id_equipement} ajouté ({departement})"
+    except APIError as e:
+        if e.code == CODE_DOUBLON:
+            return False, f"⚠️ L'équipement {id_equipement} existe déjà"
+        return False, f"❌ Erreur lors de l'enregistrement : {e.message}"
+    except Exception as e:
+        return False, f"❌ Erreur lors de l'enregistrement : {str(e)}"
+
+
+def _inserer_une(table, ligne, cle_idempotence=None):
+    """INSERT d'une ligne ; avec une clé d'idempotence, un envoi rejoué est ignoré."""
+    if cle_idempotence is None:
+        client().table(table).insert(ligne, returning=ReturnMethod.minimal).execute()
+        return
+    client().table(table).upsert(
+        {**ligne, 'cle_idempotence': cle_idempotence},
+        on_conflict='cle_idempotence',
+        ignore_duplicates=True,
+        returning=ReturnMethod.minimal
+    ).execute()
+
+
+def sauvegarder_observation(id_equipement, date, observation, recommandation,
+                            travaux, analyste, importance=None, cle_idempotence=None):
+    """Enregistre une observation.
+
+    Args:
+        cle_idempotence: Clé d'un envoi de la boîte d'envoi (rejeu sans effet).
+
+    Returns:
+        Tuple (succès, message).
+    """
+    try:
+        _inserer_une('observations', {
+            'id_equipement': id_equipement,
+            'date': _date_iso(date),
+            'observation': observation,
+            'recommandation': recommandation,
+            'travaux': travaux,
+            'analyste': analyste,
+            'importance': importance,
+        }, cle_idempotence)
+        return True, f"✅ Observation enregistrée pour {id_equipement}"
+    except APIError as e:
+        return False, f"❌ Erreur lors de l'enregistrement : {e.message}"
+    except Exception as e:
+        return False, f"❌ Erreur lors de l'enregistrement : {str(e)}"
+
+
+def sauvegarder_suivi(id_equipement, point_mesure, date, vitesse_rpm,
+                      twf_rms_g, crest_factor, twf_peak_to_peak_g, cle_idempotence=None):
+    """Enregistre une mesure de suivi.
+
+    Args:
+        cle_idempotence: Clé d'un envoi de la boîte d'envoi (rejeu sans effet).
+
+    Returns:
+        Tuple (succès, message).
+    """
+    try:
+        _inserer_une('suivi', {
+            'id_equipement': id_equipement,
+            'point_mesure': point_mesure,
+            'date': _date_iso(date),
+            'vitesse_rpm': vitesse_rpm,
+            'twf_rms_g': twf_rms_g,
+            'crest_factor': crest_factor,
+            'twf_peak_to_peak_g': twf_peak_to_peak_g,
+        }, cle_idempotence)
+        return True, f"✅ Mesure enregistrée pour {id_equipement} ({point_mesure})"
+    except APIError as e:
+        return False, f"❌ Erreur lors de l'enregistrement : {e.message}"
+    except Exception as e:
+        return False, f"❌ Erreur lors de l'enregistrement : {str(e)}"
+
+
+def sauvegarder_equipements_lot(df_equipements):
+    """Ajoute ou met à jour des équipements par lots (upsert sur l'ID).
+
+    Returns:
+        Tuple (succès, message).
+    """
+    try:
+        _inserer_par_lots(
+            'equipements',
+            _enregistrements(df_equipements, COLONNES_EQUIPEMENTS),
+            conflit='id_equipement'
+        )
+        return True, f"✅ {len(df_equipements)} équipement(s) enregistré(s)"
+    except APIError as e:
+        return False, f"❌ Erreur lors de l'enregistrement : {e.message}"
+    except Exception as e:
+        return False, f"❌ Erreur lors de l'enregistrement : {str(e)}"
+
+
+def sauvegarder_observations_lot(df_observations):
+    """Insère des observations par lots.
+
+    Returns:
+        Tuple (succès, message).
+    """
+    try:
+        _inserer_par_lots('observations', _enregistrements(df_observations, COLONNES_OBSERVATIONS))
+        return True, f"✅ {len(df_observations)} observation(s) enregistrée(s)"
+    except APIError as e:
+        return False, f"❌ Erreur lors de l'enregistrement : {e.message}"
+    except Exception as e:
+        return False, f"❌ Erreur lors de l'enregistrement : {str(e)}"
+
+
+def sauvegarder_suivi_lot(df_suivi):
+    """Insère des mesures de suivi par lots.
+
+    Returns:
+        Tuple (succès, message).
+    """
+    try:
+        _inserer_par_lots('suivi', _enregistrements(df_suivi, COLONNES_SUIVI))
+        return True, f"✅ {len(df_suivi)} mesure(s) enregistrée(s)"
+    except APIError as e:
+        return False, f"❌ Erreur lors de l'enregistrement : {e.message}"
+    except Exception as e:
+        return False, f"❌ Erreur lors de l'enregistrement : {str(e)}"
+
+
+# =============================================================================
+# MODIFICATION
+# =============================================================================
+
+def modifier_observations(avant, apres):
+    """Corrige des observations en une requête (une transaction côté serveur).
+
+    Contrôle de version optimiste : chaque ligne est retrouvée par son
+    contenu lu ; si l'une d'elles a été modifiée ou supprimée entre-temps,
+    la transaction est annulée (voir maintenance_modifier_observations).
+
+    Args:
+        avant: Lignes telles que lues (colonnes d'une observation).
+        apres: Nouvelles valeurs, même index ; équipement et date inchangés.
+
+    Returns:
+        Tuple (succès, message).
+    """
+    modifications = [
+        {'avant': ligne_avant, 'apres': ligne_apres}
+        for ligne_avant, ligne_apres in zip(
+            _enregistrements(avant, COLONNES_OBSERVATIONS),
+            _enregistrements(apres.loc[avant.index], COLONNES_OBSERVATIONS)
+        )
+    ]
+
+    try:
+        nombre = client().rpc(
+            'maintenance_modifier_observations', {'modifications': modifications}
+        ).execute().data
+        return True, f"✅ {nombre} observation(s) corrigée(s)"
+    except APIError as e:
+        if e.code == CODE_CONFLIT:
+            return False, (
+                "⚠️ Observation(s) modifiée(s) ou supprimée(s) entre-temps : "
+                "aucune correction enregistrée, rechargez puis recommencez"
+            )
+        return False, f"❌ Erreur lors de la modification : {e.message}"
+    except Exception as e:
+        return False, f"❌ Erreur lors de la modification : {str(e)}"
+
+
+# =============================================================================
+# SUPPRESSION
+# =============================================================================
+
+def _supprimer(table, **criteres):
+    """DELETE filtré ; retourne le nombre de lignes supprimées."""
+    requete = client().table(table).delete(count=CountMethod.exact, returning=ReturnMethod.minimal)
+    for colonne, valeur in criteres.items():
+        requete = requete.eq(colonne, valeur)
+    return requete.execute().count or 0
+
+
+def supprimer_observation(id_equipement, date):
+    """Supprime les observations d'un équipement à une date.
+
+    Returns:
+        Tuple (succès, message).
+    """
+    try:
+        nombre = _supprimer('observations', id_equipement=id_equipement, date=_date_iso(date))
+        if nombre == 0:
+            return False, f"⚠️ Aucune observation pour {id_equipement} le {_date_iso(date)}"
+        return True, f"✅ {nombre} observation(s) supprimée(s)"
+    except APIError as e:
+        return False, f"❌ Erreur lors de la suppression : {e.message}"
+    except Exception as e:
+        return False, f"❌ Erreur lors de la suppression : {str(e)}"
+
+
+def supprimer_suivi(id_equipement, point_mesure, date):
+    """Supprime les mesures d'un équipement, d'un point et d'une date.
+
+    Returns:
+        Tuple (succès, message).
+    """
+    try:
+        nombre = _supprimer(
+            'suivi', id_equipement=id_equipement, point_mesure=point_mesure, date=_date_iso(date)
+        )
+        if nombre == 0:
+            return False, f"⚠️ Aucune mesure pour {id_equipement} ({point_mesure}) le {_date_iso(date)}"
+        return True, f"✅ {nombre} mesure(s) supprimée(s)"
+    except APIError as e:
+        return False, f"❌ Erreur lors de la suppression : {e.message}"
+    except Exception as e:
+        return False, f"❌ Erreur lors de la suppression : {str(e)}"
+
+
+def supprimer_equipement(id_equipement):
+    """Supprime un équipement, ses observations et ses mesures en une requête.
+
+    Returns:
+        Tuple (succès, message).
+    """
+    try:
+        if _supprimer('equipements', id_equipement=id_equipement) == 0:
+            return False, f"⚠️ Équipement {id_equipement} introuvable"
+        return True, f"✅ Équipement {id_equipement} supprimé (observations et mesures incluses)"
+    except APIError as e:
+        return False, f"❌ Erreur lors de la suppression : {e.message}"
+    except Exception as e:
+        return False, f"❌ Erreur lors de la suppression : {str(e)}"
@@ -0,0 +1,707 @@
+"""
+Point d'accès aux données pour l'interface
+
+Enveloppe les fonctions de data_manager avec les règles transverses :
+instantanés partagés entre sessions, détection des doublons à
+l'enregistrement et, si elle est active, boîte d'envoi locale pour les
+saisies d'observations et de mesures.
+"""
+
+import io
+import os
+import tempfile
+import functools
+import numpy as np
+import pandas as pd
+from outils import metriques
+from data import cache
+from data.stockage import data_manager, STOCKAGE, STOCKAGE_SUPABASE, STOCKAGE_FICHIERS
+from data import doublons
+from data import agregats
+from data import cube
+from data import textes
+from data import rapprochement
+from data import boite_envoi
+from data import ingestion
+from data.import_observations import FICHIER_OBSERVATIONS
+
+
+# =============================================================================
+# EXPORTS (INSTRUMENTÉS)
+# =============================================================================
+
+def _taille_fichier(fichier):
+    """Taille en octets d'un export (bytes ou BytesIO)."""
+    if hasattr(fichier, 'getbuffer'):
+        return fichier.getbuffer().nbytes
+    return len(fichier) if fichier is not None else 0
+
+
+def _exporter_instrumente(fonction):
+    """Mesure la durée d'un export Excel et compte les octets produits."""
+    @functools.wraps(fonction)
+    def enveloppe(*args, **kwargs):
+        with metriques.chronometre(fonction.__name__):
+            fichier = fonction(*args, **kwargs)
+        metriques.incrementer('octets_exportes', _taille_fichier(fichier), export=fonction.__name__)
+        return fichier
+
+    return enveloppe
+
+
+exporter_equipements_excel = _exporter_instrumente(data_manager.exporter_equipements_excel)
+exporter_suivi_excel = _exporter_instrumente(data_manager.exporter_suivi_excel)
+
+
+FEUILLE_MESURES_PROCHES = "Mesures proches"
+
+
+def _ajouter_feuille(fichier, nom, df):
+    """Ajoute une feuille à un classeur exporté (bytes ou BytesIO, même type en retour)."""
+    tampon = io.BytesIO(fichier.getvalue() if hasattr(fichier, 'getvalue') else fichier)
+
+    with pd.ExcelWriter(tampon, engine='openpyxl', mode='a') as writer:
+        df.to_excel(writer, sheet_name=nom, index=False)
+        feuille = writer.sheets[nom]
+        feuille.freeze_panes = 'A2'
+        for colonne in feuille.iter_cols(max_row=200):
+            largeur = max(len(str(cellule.value or '')) for cellule in colonne[:200])
+            feuille.column_dimensions[colonne[0].column_letter].width = min(largeur + 2, 40)
+
+    tampon.seek(0)
+    return tampon if hasattr(fichier, 'getvalue') else tampon.getvalue()
+
+
+@_exporter_instrumente
+def exporter_observations_excel(df_observations, df_equipements, df_suivi=None, ecart_max_jours=None):
+    """Export des observations ; textes relus pour les seules lignes exportées.
+
+    Args:
+        df_suivi: Mesures de suivi ; si fourni, ajoute la feuille « Mesures
+            proches » (``rapprochement.mesures_proches``).
+        ecart_max_jours: Écart maximal observation / mesure de cette feuille.
+    """
+    fichier = data_manager.exporter_observations_excel(textes.completer(df_observations), df_equipements)
+    if df_suivi is None:
+        return fichier
+
+    proches = rapprochement.mesures_proches(df_observations, df_suivi, ecart_max_jours)
+    return _ajouter_feuille(fichier, FEUILLE_MESURES_PROCHES, proches.assign(
+        date=proches['date'].dt.date,
+        date_mesure=proches['date_mesure'].dt.date
+    ).rename(columns=rapprochement.LIBELLES))
+
+
+# =============================================================================
+# LECTURE (INSTANTANÉS PARTAGÉS)
+# =============================================================================
+
+def charger_equipements():
+    """Référentiel équipements (vue sur l'instantané partagé, sans copie)."""
+    return cache.obtenir('equipements')
+
+
+def _avec_archives(table, df, date_debut):
+    """Ajoute à un instantané les lignes archivées si date_debut les atteint."""
+    if date_debut is None:
+        return df
+
+    etendue = cache.etendue_archives(table)
+    if etendue is None or pd.Timestamp(date_debut) > etendue[1]:
+        return df
+
+    archives = cache.lire_archives(table, date_debut=date_debut)
+    if table == 'observations':
+        archives = textes.separer(archives)
+    return pd.concat([archives, df], ignore_index=True).sort_values(
+        'date', kind='stable'
+    ).reset_index(drop=True)
+
+
+def charger_observations(date_debut=None):
+    """Historique des observations (vue sur l'instantané partagé, sans copie).
+
+    Args:
+        date_debut: Première date utile ; si elle atteint les archives du
+            stockage partitionné, les lignes archivées sont ajoutées (copie).
+    """
+    return _avec_archives('observations', cache.obtenir('observations'), date_debut)
+
+
+def charger_suivi(date_debut=None):
+    """Mesures de suivi (vue sur l'instantané partagé, sans copie).
+
+    Args:
+        date_debut: Voir ``charger_observations``.
+    """
+    return _avec_archives('suivi', cache.obtenir('suivi'), date_debut)
+
+
+def etendue_dates(table):
+    """(première date, dernière date) d'une table, archives comprises ; None si vide.
+
+    Args:
+        table: 'observations' ou 'suivi'.
+    """
+    df = cache.obtenir(table)
+    dates = [] if df.empty else [df['date'].iloc[0], df['date'].iloc[-1]]
+    dates.extend(cache.etendue_archives(table) or [])
+    return (min(dates), max(dates)) if dates else None
+
+
+def dates_invalides(table):
+    """Lignes écartées au chargement ('observations' ou 'suivi') pour date invalide."""
+    return cache.dates_invalides(table)
+
+
+def invalider_table(table):
+    """Invalide instantané, index, agrégats et cube d'une table modifiée hors de ce processus."""
+    cache.invalider(table, publier=False)
+    doublons.invalider(table)
+    cube.invalider(table)
+    if table == 'suivi':
+        agregats.invalider()
+
+
+@metriques.instrumenter()
+def sauvegarder_equipement(id_equipement, departement):
+    """Ajoute un équipement au référentiel et invalide l'instantané."""
+    resultat = data_manager.sauvegarder_equipement(id_equipement, departement)
+    cache.invalider('equipements')
+    return resultat
+
+
+# =============================================================================
+# ENREGISTREMENT AVEC DÉTECTION DES DOUBLONS
+# =============================================================================
+
+def _idempotence(cle_idempotence):
+    """Clé d'idempotence transmise au stockage (Supabase la garantit côté serveur)."""
+    if cle_idempotence and STOCKAGE == STOCKAGE_SUPABASE:
+        return {'cle_idempotence': cle_idempotence}
+    return {}
+
+
+def _enregistrer_observation(id_equipement, date, observation, recommandation,
+                             travaux, analyste, importance=None, politique=None,
+                             cle_idempotence=None, reprise=False):
+    """Enregistre une observation en consultant l'index des doublons.
+
+    Args:
+        id_equipement: ID de l'équipement.
+        date: Date de l'observation.
+        observation: Texte de l'observation.
+        recommandation: Recommandation.
+        travaux: Travaux effectués & notes.
+        analyste: Nom de l'analyste.
+        importance: Niveau d'importance (optionnel).
+        politique: 'rejeter', 'remplacer' ou 'conserver' ; par défaut
+            ``doublons.POLITIQUE_DOUBLONS``.
+        cle_idempotence: Clé d'un envoi de la boîte d'envoi.
+        reprise: Envoi déjà tenté : un doublon signifie que la tentative
+            précédente a abouti malgré l'échec apparent.
+
+    Returns:
+        Tuple (succès, message).
+    """
+    try:
+        politique = doublons.verifier_politique(politique)
+    except ValueError as e:
+        return False, f"❌ {str(e)}"
+
+    cle = doublons.cle_observation(id_equipement, date, observation)
+
+    if doublons.contient('observations', cle):
+        if reprise:
+            return True, f"✅ Observation déjà enregistrée pour {id_equipement} (envoi précédent)"
+
+        if politique == doublons.POLITIQUE_REJETER:
+            return False, (
+                f"⚠️ Observation déjà enregistrée pour {id_equipement} "
+                f"le {date} (doublon ignoré)"
+            )
+
+        if politique == doublons.POLITIQUE_REMPLACER:
+            return _remplacer_observation(
+                cle, id_equipement, date, observation, recommandation, travaux, analyste, importance
+            )
+
+    success, message = data_manager.sauvegarder_observation(
+        id_equipement, date, observation, recommandation,
+        travaux, analyste, importance, **_idempotence(cle_idempotence)
+    )
+
+    if success:
+        cache.invalider('observations')
+        doublons.ajouter('observations', cle)
+        cube.ajouter('observations', pd.DataFrame({
+            'id_equipement': [id_equipement],
+            'date': [date],
+            'importance': [importance],
+            'analyste': [analyste],
+        }))
+
+    return success, message
+
+
+def _remplacer_observation(cle, id_equipement, date, observation, recommandation,
+                           travaux, analyste, importance):
+    """Réécrit la seule observation de même clé (équipement, date, texte).
+
+    Les autres observations de l'équipement le même jour sont conservées :
+    la ligne existante est corrigée (``modifier_observations``), pas supprimée.
+
+    Returns:
+        Tuple (succès, message).
+    """
+    nouvelles = {
+        'observation': observation,
+        'recommandation': recommandation,
+        'travaux': travaux,
+        'analyste': analyste,
+        'importance': importance,
+    }
+    if not CORRECTIONS_DISPONIBLES:
+        return _remplacer_observation_fichier(cle, id_equipement, date, nouvelles)
+
+    df = charger_observations(date_debut=date)
+    cles = df['cle'].to_numpy() if 'cle' in df.columns else doublons.hash_observations(df)
+    existante = df[cles == np.uint64(cle)].head(1)
+    if existante.empty:
+        return False, f"⚠️ Observation à remplacer introuvable pour {id_equipement} le {date}"
+
+    avant = textes.completer(existante)
+    success, message = modifier_observations(avant, avant.assign(**nouvelles))
+    if not success:
+        return False, message
+    return True, f"✅ Observation remplacée pour {id_equipement} le {date}"
+
+
+def _remplacer_observation_fichier(cle, id_equipement, date, nouvelles):
+    """Stockage fichiers : réécrit l'historique CSV, la ligne de même clé recevant les nouvelles valeurs.
+
+    Toutes les autres lignes sont réécrites telles quelles (lues en texte) ;
+    écriture atomique via un fichier temporaire renommé.
+
+    Returns:
+        Tuple (succès, message).
+    """
+    instantane = cache.obtenir('observations')
+
+    try:
+        df = pd.read_csv(FICHIER_OBSERVATIONS, dtype=str, keep_default_na=False)
+        positions = np.flatnonzero(doublons.hash_observations(df) == np.uint64(cle))
+        if len(positions) == 0:
+            return False, f"⚠️ Observation à remplacer introuvable pour {id_equipement} le {date}"
+
+        for colonne, valeur in nouvelles.items():
+            if colonne not in df.columns:
+                df[colonne] = ''
+            df.iloc[positions[0], df.columns.get_loc(colonne)] = '' if valeur is None else str(valeur)
+
+        descripteur, temporaire = tempfile.mkstemp(
+            dir=os.path.dirname(FICHIER_OBSERVATIONS), suffix=".tmp.csv"
+        )
+        os.close(descripteur)
+        try:
+            df.to_csv(temporaire, index=False)
+            os.replace(temporaire, FICHIER_OBSERVATIONS)
+        except BaseException:
+            os.remove(temporaire)
+            raise
+    except Exception as e:
+        return False, f"❌ Erreur lors du remplacement : {str(e)}"
+
+    cache.invalider('observations')
+    doublons.invalider('observations')
+    cube.invalider('observations')
+
+    # Texte remplacé : oublié s'il n'est plus référencé
+    if 'cle' in instantane.columns and 'id_texte' in instantane.columns:
+        remplacee = instantane.loc[instantane['cle'].to_numpy() == np.uint64(cle), 'id_texte'].head(1)
+        textes.oublier(_textes_orphelins(instantane, remplacee), references=textes.identifiants(
+            pd.DataFrame([{'id_equipement': id_equipement, 'date': date, **nouvelles}])
+        ))
+
+    return True, f"✅ Observation remplacée pour {id_equipement} le {date}"
+
+
+def _enregistrer_suivi(id_equipement, point_mesure, date, vitesse_rpm, twf_rms_g,
+                       crest_factor, twf_peak_to_peak_g, politique=None,
+                       cle_idempotence=None, reprise=False):
+    """Enregistre une mesure de suivi en consultant l'index des doublons.
+
+    Args:
+        id_equipement: ID de l'équipement.
+        point_mesure: Point de mesure.
+        date: Date de la mesure.
+        vitesse_rpm: Vitesse (RPM).
+        twf_rms_g: TWF RMS (g).
+        crest_factor: Crest factor.
+        twf_peak_to_peak_g: TWF Peak to Peak (g).
+        politique: 'rejeter', 'remplacer' ou 'conserver' ; par défaut
+            ``doublons.POLITIQUE_DOUBLONS``.
+        cle_idempotence: Clé d'un envoi de la boîte d'envoi.
+        reprise: Envoi déjà tenté (voir ``_enregistrer_observation``).
+
+    Returns:
+        Tuple (succès, message).
+    """
+    try:
+        politique = doublons.verifier_politique(politique)
+    except ValueError as e:
+        return False, f"❌ {str(e)}"
+
+    cle = doublons.cle_suivi(id_equipement, point_mesure, date)
+
+    if doublons.contient('suivi', cle):
+        if reprise:
+            return True, f"✅ Mesure déjà enregistrée pour {id_equipement} - {point_mesure} (envoi précédent)"
+
+        if politique == doublons.POLITIQUE_REJETER:
+            return False, (
+                f"⚠️ Mesure déjà enregistrée pour {id_equipement} - "
+                f"{point_mesure} le {date} (doublon ignoré)"
+            )
+
+        if politique == doublons.POLITIQUE_REMPLACER:
+            success, message = data_manager.supprimer_suivi(id_equipement, point_mesure, date)
+            cache.invalider('suivi')
+            doublons.invalider('suivi')
+            agregats.invalider()
+            cube.invalider('suivi')
+            if not success:
+                return False, message
+
+    success, message = data_manager.sauvegarder_suivi(
+        id_equipement, point_mesure, date, vitesse_rpm,
+        twf_rms_g, crest_factor, twf_peak_to_peak_g, **_idempotence(cle_idempotence)
+    )
+
+    if success:
+        cache.invalider('suivi')
+        doublons.ajouter('suivi', cle)
+        mesure = pd.DataFrame({
+            'id_equipement': [id_equipement],
+            'point_mesure': [point_mesure],
+            'date': [date],
+            'vitesse_rpm': [vitesse_rpm],
+            'twf_rms_g': [twf_rms_g],
+            'crest_factor': [crest_factor],
+            'twf_peak_to_peak_g': [twf_peak_to_peak_g],
+        })
+        agregats.ajouter(mesure)
+        cube.ajouter('suivi', mesure)
+
+    return success, message
+
+
+@metriques.instrumenter()
+def sauvegarder_observation(id_equipement, date, observation, recommandation,
+                            travaux, analyste, importance=None, politique=None):
+    """Enregistre une observation (directement, ou via la boîte d'envoi si active).
+
+    Avec la boîte d'envoi, la saisie est écrite sur disque localement et la
+    réponse est immédiate ; l'enregistrement réel a lieu en arrière-plan.
+    Les doublons évidents (déjà en base ou déjà en attente) sont refusés
+    dès la saisie avec la politique 'rejeter'.
+
+    Returns:
+        Tuple (succès, message).
+    """
+    if not boite_envoi.ACTIVE:
+        return _enregistrer_observation(
+            id_equipement, date, observation, recommandation,
+            travaux, analyste, importance, politique
+        )
+
+    try:
+        politique = doublons.verifier_politique(politique)
+    except ValueError as e:
+        return False, f"❌ {str(e)}"
+
+    cle = doublons.cle_observation(id_equipement, date, observation)
+
+    if politique == doublons.POLITIQUE_REJETER and (
+            doublons.contient('observations', cle)
+            or boite_envoi.contient_doublon('observations', cle)
+    ):
+        return False, (
+            f"⚠️ Observation déjà enregistrée pour {id_equipement} "
+            f"le {date} (doublon ignoré)"
+        )
+
+    boite_envoi.deposer('observations', {
+        'id_equipement': id_equipement,
+        'date': pd.Timestamp(date).strftime('%Y-%m-%d'),
+        'observation': observation,
+        'recommandation': recommandation,
+        'travaux': travaux,
+        'analyste': analyste,
+        'importance': importance,
+        'politique': politique,
+    }, cle_doublon=cle)
+
+    return True, f"📤 Observation enregistrée pour {id_equipement} (envoi en cours)"
+
+
+@metriques.instrumenter()
+def sauvegarder_suivi(id_equipement, point_mesure, date, vitesse_rpm, twf_rms_g,
+                      crest_factor, twf_peak_to_peak_g, politique=None):
+    """Enregistre une mesure de suivi (directement, ou via la boîte d'envoi si active).
+
+    Returns:
+        Tuple (succès, message).
+    """
+    if not boite_envoi.ACTIVE:
+        return _enregistrer_suivi(
+            id_equipement, point_mesure, date, vitesse_rpm,
+            twf_rms_g, crest_factor, twf_peak_to_peak_g, politique
+        )
+
+    try:
+        politique = doublons.verifier_politique(politique)
+    except ValueError as e:
+        return False, f"❌ {str(e)}"
+
+    cle = doublons.cle_suivi(id_equipement, point_mesure, date)
+
+    if politique == doublons.POLITIQUE_REJETER and (
+            doublons.contient('suivi', cle)
+            or boite_envoi.contient_doublon('suivi', cle)
+    ):
+        return False, (
+            f"⚠️ Mesure déjà enregistrée pour {id_equipement} - "
+            f"{point_mesure} le {date} (doublon ignoré)"
+        )
+
+    boite_envoi.deposer('suivi', {
+        'id_equipement': id_equipement,
+        'point_mesure': point_mesure,
+        'date': pd.Timestamp(date).strftime('%Y-%m-%d'),
+        'vitesse_rpm': vitesse_rpm,
+        'twf_rms_g': twf_rms_g,
+        'crest_factor': crest_factor,
+        'twf_peak_to_peak_g': twf_peak_to_peak_g,
+        'politique': politique,
+    }, cle_doublon=cle)
+
+    return True, f"📤 Mesure enregistrée pour {id_equipement} - {point_mesure} (envoi en cours)"
+
+
+def _expedier_un(envoi):
+    """Enregistre un envoi seul (politique 'remplacer' ou 'conserver').
+
+    Returns:
+        Tuple (envoi, résultat, message).
+    """
+    enregistreurs = {
+        'observations': _enregistrer_observation,
+        'suivi': _enregistrer_suivi,
+    }
+
+    try:
+        charge = dict(envoi['charge'], date=pd.Timestamp(envoi['charge']['date']).date())
+    except (KeyError, TypeError, ValueError) as e:
+        return envoi, boite_envoi.INVALIDE, f"❌ Saisie invalide : {str(e)}"
+
+    try:
+        success, message = enregistreurs[envoi['table']](
+            **charge,
+            cle_idempotence=envoi['cle_idempotence'],
+            reprise=envoi['tentatives'] > 0
+        )
+    except Exception as e:
+        return envoi, boite_envoi.ECHEC, f"❌ {str(e)}"
+
+    if success:
+        return envoi, boite_envoi.ENVOYE, message
+    if message.startswith("⚠️"):
+        return envoi, boite_envoi.CONFLIT, message
+    return envoi, boite_envoi.ECHEC, message
+
+
+def _expedier_lot(table, envois):
+    """Enregistre les envois d'une table en une écriture groupée (``ingestion``).
+
+    Mêmes règles de validation que l'ingestion en lot ; une ligne invalide
+    passe en échec, un doublon en conflit (ou envoyé s'il s'agit d'une
+    reprise : la tentative précédente a abouti malgré l'échec apparent).
+
+    Returns:
+        Liste de tuples (envoi, résultat, message).
+    """
+    lot = pd.DataFrame([envoi['charge'] for envoi in envois]).drop(columns='politique', errors='ignore')
+
+    try:
+        success, message, rapport = ingestion.ingerer(table, lot)
+    except Exception as e:
+        return [(envoi, boite_envoi.ECHEC, f"❌ {str(e)}") for envoi in envois]
+
+    # Échec d'écriture (et non simple refus de toutes les lignes) : tout est à reprendre
+    if not success and not message.startswith("⚠️"):
+        return [(envoi, boite_envoi.ECHEC, message) for envoi in envois]
+
+    rejets = {rejet['ligne']: rejet['raison'] for rejet in rapport['rejets']}
+    libelle = "Observation" if table == 'observations' else "Mesure"
+    resultats = []
+
+    for position, envoi in enumerate(envois):
+        raison = rejets.get(position)
+        charge = envoi['charge']
+        if raison is None:
+            resultats.append((
+                envoi, boite_envoi.ENVOYE, f"✅ {libelle} enregistrée pour {charge['id_equipement']}"
+            ))
+        elif raison == "doublon" and envoi['tentatives'] > 0:
+            resultats.append((envoi, boite_envoi.ENVOYE, f"✅ {libelle} déjà enregistrée (envoi précédent)"))
+        elif raison == "doublon":
+            resultats.append((envoi, boite_envoi.CONFLIT, (
+                f"⚠️ {libelle} déjà enregistrée pour {charge['id_equipement']} "
+                f"le {charge['date']} (doublon ignoré)"
+            )))
+        else:
+            resultats.append((envoi, boite_envoi.INVALIDE, f"❌ Saisie invalide : {raison}"))
+
+    return resultats
+
+
+def expedier_envois(envois):
+    """Enregistre un lot de la boîte d'envoi (appelé par son fil d'arrière-plan).
+
+    Les envois de politique 'rejeter' (par défaut) sont écrits en une
+    opération par table ; les autres politiques, qui remplacent ou
+    conservent un doublon, un par un. Un refus métier (⚠️ : doublon...) met
+    l'envoi en conflit, une saisie invalide en échec ; une erreur technique
+    (❌, réseau) le replanifie.
+
+    Returns:
+        Liste de tuples (envoi, résultat, message) pour ``boite_envoi``.
+    """
+    resultats = []
+    groupes = {}
+
+    for envoi in envois:
+        politique = envoi['charge'].get('politique') or doublons.POLITIQUE_DOUBLONS
+        if envoi['table'] in ('observations', 'suivi') and politique == doublons.POLITIQUE_REJETER:
+            groupes.setdefault(envoi['table'], []).append(envoi)
+        else:
+            resultats.append(_expedier_un(envoi))
+
+    for table, groupe in groupes.items():
+        with metriques.chronometre(f"boite_envoi_lot_{table}"):
+            resultats.extend(_expedier_lot(table, groupe))
+
+    return resultats
+
+
+# =============================================================================
+# CORRECTIONS
+# =============================================================================
+
+# Le stockage fichiers réécrit tout l'historique à chaque écriture : pas de correction en place
+CORRECTIONS_DISPONIBLES = STOCKAGE != STOCKAGE_FICHIERS
+
+
+def _textes_orphelins(df, retirees):
+    """Textes des lignes retirées qu'aucune autre ligne de l'instantané ne partage.
+
+    Args:
+        df: Instantané des observations avant l'écriture.
+        retirees: ``id_texte`` des lignes retirées (un par ligne).
+
+    Returns:
+        Liste d'identifiants à oublier.
+    """
+    if 'id_texte' not in df.columns or len(retirees) == 0:
+        return []
+
+    retirees = pd.Series(retirees, dtype='int64').value_counts()
+    compte = df['id_texte'].value_counts().reindex(retirees.index, fill_value=0)
+    return retirees.index[compte.to_numpy() <= retirees.to_numpy()].tolist()
+
+
+@metriques.instrumenter()
+def modifier_observations(avant, apres):
+    """Corrige des observations (seules les lignes modifiées sont transmises).
+
+    Args:
+        avant: Lignes telles que lues (avec ou sans textes : ceux-ci sont
+            relus si besoin), index quelconque.
+        apres: Mêmes lignes, nouvelles valeurs (même index).
+
+    Returns:
+        Tuple (succès, message) ; échec sans écriture si une ligne a été
+        modifiée entre-temps par un autre analyste.
+    """
+    if avant.empty:
+        return True, "ℹ️ Aucune modification à enregistrer"
+    if not CORRECTIONS_DISPONIBLES:
+        return False, "ℹ️ Correction disponible avec le stockage partitionné ou Supabase"
+
+    df = cache.obtenir('observations')
+    avant = textes.completer(avant)
+
+    resultat = data_manager.modifier_observations(avant, apres)
+    cache.invalider('observations')
+    doublons.invalider('observations')
+    cube.invalider('observations')
+
+    if resultat[0]:
+        # Textes remplacés par la correction
+        ids_avant, ids_apres = textes.identifiants(avant), textes.identifiants(apres)
+        orphelins = _textes_orphelins(df, ids_avant[ids_avant != ids_apres])
+        textes.oublier(orphelins, references=ids_apres)
+    return resultat
+
+
+# =============================================================================
+# SUPPRESSIONS
+# =============================================================================
+
+@metriques.instrumenter()
+def supprimer_observation(id_equipement, date):
+    """Supprime une observation et invalide l'instantané, l'index et le cube."""
+    df = cache.obtenir('observations')
+    jour = pd.Timestamp(date).normalize()
+    retirees = df.loc[
+        (df['id_equipement'] == id_equipement) & (df['date'].dt.normalize() == jour), 'id_texte'
+    ] if 'id_texte' in df.columns else []
+
+    resultat = data_manager.supprimer_observation(id_equipement, date)
+    cache.invalider('observations')
+    doublons.invalider('observations')
+    cube.invalider('observations')
+
+    if resultat[0]:
+        textes.oublier(_textes_orphelins(df, retirees))
+    return resultat
+
+
+@metriques.instrumenter()
+def supprimer_suivi(id_equipement, point_mesure, date):
+    """Supprime une mesure de suivi et invalide l'instantané, l'index, les agrégats et le cube."""
+    resultat = data_manager.supprimer_suivi(id_equipement, point_mesure, date)
+    cache.invalider('suivi')
+    doublons.invalider('suivi')
+    agregats.invalider()
+    cube.invalider('suivi')
+    return resultat
+
+
+@metriques.instrumenter()
+def supprimer_equipement(id_equipement):
+    """Supprime un équipement (et son historique) et invalide instantanés et index."""
+    df = cache.obtenir('observations')
+    retirees = (df.loc[df['id_equipement'] == id_equipement, 'id_texte']
+                if 'id_texte' in df.columns else [])
+
+    resultat = data_manager.supprimer_equipement(id_equipement)
+    cache.invalider()
+    doublons.invalider()
+    agregats.invalider()
+    cube.invalider()
+
+    if resultat[0]:
+        textes.oublier(_textes_orphelins(df, retirees))
+    return resultat
@@ -0,0 +1,95 @@
+"""
+Index de hachage des clés naturelles pour la détection des doublons
+"""
+
+import os
+import threading
+import numpy as np
+from outils import metriques
+from data import cache
+from data.cles import hash_observations, hash_suivi, cle_observation, cle_suivi
+
+# Politiques applicables lorsqu'un enregistrement existe déjà
+POLITIQUE_REJETER = "rejeter"
+POLITIQUE_REMPLACER = "remplacer"
+POLITIQUE_CONSERVER = "conserver"
+
+POLITIQUES = (POLITIQUE_REJETER, POLITIQUE_REMPLACER, POLITIQUE_CONSERVER)
+
+POLITIQUE_DOUBLONS = os.environ.get("MAINTENANCE_POLITIQUE_DOUBLONS", POLITIQUE_REJETER)
+
+_verrou = threading.Lock()
+_index = {'observations': None, 'suivi': None}
+
+
+def _construire(table):
+    """Construit l'index d'une table à partir des données stockées (archives comprises)."""
+    fonction_hash = hash_observations if table == 'observations' else hash_suivi
+    colonnes = (['id_equipement', 'date', 'observation'] if table == 'observations'
+                else ['id_equipement', 'point_mesure', 'date'])
+
+    connus = set()
+    for df in (cache.obtenir(table), cache.lire_archives(table, colonnes=colonnes)):
+        if df.empty:
+            continue
+        # Instantané des observations : clé déjà calculée, textes hors instantané
+        cles = df['cle'].to_numpy() if 'cle' in df.columns else fonction_hash(df)
+        connus.update(cles.tolist())
+    return connus
+
+
+def index(table):
+    """Retourne l'index d'une table ('observations' ou 'suivi'), construit au besoin."""
+    with _verrou:
+        if _index[table] is None:
+            with metriques.chronometre(f"index_doublons_{table}"):
+                _index[table] = _construire(table)
+        return _index[table]
+
+
+def contient(table, cles):
+    """Teste la présence de clés dans l'index (O(1) par clé).
+
+    Args:
+        table: 'observations' ou 'suivi'.
+        cles: Hash unique (int) ou tableau de hash.
+
+    Returns:
+        Booléen pour un hash unique, tableau numpy de booléens sinon.
+    """
+    connus = index(table)
+
+    if np.isscalar(cles):
+        return int(cles) in connus
+
+    cles = np.asarray(cles)
+    return np.fromiter((int(c) in connus for c in cles), dtype=bool, count=len(cles))
+
+
+def ajouter(table, cles):
+    """Ajoute des clés à l'index après une écriture réussie."""
+    connus = index(table)
+
+    with _verrou:
+        if np.isscalar(cles):
+            connus.add(int(cles))
+        else:
+            connus.update(int(c) for c in cles)
+
+
+def invalider(table=None):
+    """Invalide l'index d'une table (ou de toutes) ; reconstruit au prochain accès."""
+    with _verrou:
+        for nom in ([table] if table else list(_index)):
+            _index[nom] = None
+
+
+def verifier_politique(politique):
+    """Retourne la politique effective, ou lève ValueError si elle est inconnue."""
+    politique = politique or POLITIQUE_DOUBLONS
+    if politique not in POLITIQUES:
+        raise ValueError(
+            f"Politique de doublons inconnue : '{politique}' "
+            f"(attendu : {', '.join(POLITIQUES)})"
+        )
+    return politique
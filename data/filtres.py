@@ -0,0 +1,106 @@
+"""
+Filtres des onglets - Pipelines de sélection partagés par l'interface et les benchmarks
+
+Les tables reçues sont celles de ``data.depot`` : dates typées et triées au
+chargement.
+"""
+
+import pandas as pd
+
+
+def filtrer_periode(df, date_debut=None, date_fin=None, colonne='date'):
+    """Restreint une table triée par date à une période (bornes incluses).
+
+    Recherche dichotomique sur la colonne date déjà typée : le résultat est une
+    tranche de la table, sans conversion ni comparaison ligne à ligne.
+
+    Args:
+        df: Table triée par date (``charger_observations``, ``charger_suivi``
+            ou tout sous-ensemble filtré de celles-ci).
+        date_debut: Première date incluse (None = pas de borne).
+        date_fin: Dernière date incluse (None = pas de borne).
+        colonne: Colonne date.
+
+    Returns:
+        DataFrame restreint à la période.
+    """
+    dates = df[colonne]
+    debut = 0 if date_debut is None else dates.searchsorted(pd.Timestamp(date_debut), side='left')
+    fin = len(df) if date_fin is None else dates.searchsorted(
+        pd.Timestamp(date_fin) + pd.Timedelta(days=1), side='left'
+    )
+    return df.iloc[debut:fin]
+
+
+def filtrer_equipements(df_equipements, departements=None):
+    """Onglet Équipements : filtre par département(s), tri département puis ID.
+
+    Args:
+        df_equipements: Référentiel équipements.
+        departements: Départements retenus (None ou vide = tous).
+
+    Returns:
+        DataFrame filtré et trié.
+    """
+    if departements:
+        df_equipements = df_equipements[df_equipements['departement'].isin(departements)]
+    return df_equipements.sort_values(['departement', 'id_equipement'])
+
+
+def filtrer_observations(df_observations, df_equipements, departements=None,
+                         equipements=None, date_debut=None, date_fin=None):
+    """Rapport d'observations : période, département(s) et équipement(s).
+
+    Args:
+        df_observations: Historique des observations (trié par date).
+        df_equipements: Référentiel, pour résoudre les départements.
+        departements: Départements retenus (None ou vide = tous).
+        equipements: Équipements retenus (None ou vide = tous).
+        date_debut: Première date incluse.
+        date_fin: Dernière date incluse.
+
+    Returns:
+        DataFrame filtré, toujours trié par date.
+    """
+    # Période d'abord : simple tranche de la table triée
+    df = filtrer_periode(df_observations, date_debut, date_fin)
+
+    if departements:
+        ids_dept = df_equipements.loc[
+            df_equipements['departement'].isin(departements), 'id_equipement'
+        ]
+        df = df[df['id_equipement'].isin(ids_dept)]
+
+    if equipements:
+        df = df[df['id_equipement'].isin(equipements)]
+
+    return df
+
+
+def filtrer_suivi(df_suivi, equipements=None, points=None, date_debut=None, date_fin=None):
+    """Mesures de suivi : équipement(s), point(s) de mesure et période.
+
+    Args:
+        df_suivi: Mesures de suivi (triées par date).
+        equipements: Équipements retenus (None ou vide = tous).
+        points: Points de mesure retenus (None ou vide = tous).
+        date_debut: Première date incluse.
+        date_fin: Dernière date incluse.
+
+    Returns:
+        DataFrame filtré, toujours trié par date.
+    """
+    df = filtrer_periode(df_suivi, date_debut, date_fin)
+
+    if equipements:
+        df = df[df['id_equipement'].isin(equipements)]
+
+    if points:
+        df = df[df['point_mesure'].isin(points)]
+
+    return df
+
+
+def dates_disponibles(df):
+    """Dates distinctes d'une table triée par date, de la plus récente à la plus ancienne."""
+    return list(df['date'].dt.date.unique()[::-1])
@@ -0,0 +1,156 @@
+"""
+Import en masse du référentiel équipements avec aperçu des différences
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from data import cache
+from data.stockage import STOCKAGE, STOCKAGE_FICHIERS, PARTITIONNE, data_manager
+
+# Emplacement documenté du référentiel (voir README - "Ajouter un équipement manuellement")
+FICHIER_EQUIPEMENTS = os.path.join(os.path.dirname(__file__), "equipements.xlsx")
+
+COLONNES_EQUIPEMENTS = ['id_equipement', 'departement']
+
+# Libellés tolérés dans les fichiers fournis par les sites
+ALIAS_COLONNES = {
+    'id': 'id_equipement',
+    'id equipement': 'id_equipement',
+    'id équipement': 'id_equipement',
+    'equipement': 'id_equipement',
+    'équipement': 'id_equipement',
+    'département': 'departement',
+    'departement': 'departement',
+}
+
+STATUT_NOUVEAU = "Nouveau"
+STATUT_DEPLACE = "Déplacé"
+STATUT_INCHANGE = "Inchangé"
+STATUT_DOUBLON = "Doublon"
+
+
+def lire_fichier_equipements(fichier):
+    """Lit une liste d'équipements (Excel ou CSV) et normalise ses colonnes.
+
+    Args:
+        fichier: Fichier téléversé (objet avec attribut ``name``) ou chemin.
+
+    Returns:
+        DataFrame avec les colonnes ``id_equipement`` et ``departement``,
+        valeurs nettoyées, lignes vides retirées.
+
+    Raises:
+        ValueError: Si les colonnes requises sont absentes.
+    """
+    nom = getattr(fichier, 'name', str(fichier)).lower()
+
+    if nom.endswith('.csv'):
+        df = pd.read_csv(fichier, dtype=str, sep=None, engine='python')
+    else:
+        df = pd.read_excel(fichier, dtype=str)
+
+    # Normalisation des en-têtes
+    colonnes = df.columns.astype(str).str.strip().str.lower().str.replace('_', ' ')
+    df.columns = [ALIAS_COLONNES.get(c, c.replace(' ', '_')) for c in colonnes]
+
+    manquantes = [c for c in COLONNES_EQUIPEMENTS if c not in df.columns]
+    if manquantes:
+        raise ValueError(f"Colonnes manquantes : {', '.join(manquantes)}")
+
+    df = df[COLONNES_EQUIPEMENTS].apply(lambda s: s.str.strip())
+    return df.replace('', np.nan).dropna().reset_index(drop=True)
+
+
+def calculer_diff_equipements(df_actuel, df_import):
+    """Compare une liste importée au référentiel actuel (calcul vectorisé).
+
+    Args:
+        df_actuel: Référentiel actuel (``charger_equipements``).
+        df_import: Liste importée (``lire_fichier_equipements``).
+
+    Returns:
+        DataFrame ``id_equipement``, ``departement``, ``departement_actuel``,
+        ``statut`` : Nouveau, Déplacé, Inchangé ou Doublon (même ID présent
+        plusieurs fois dans le fichier avec des départements différents).
+    """
+    # Les lignes strictement identiques ne comptent qu'une fois
+    df_import = df_import.drop_duplicates(COLONNES_EQUIPEMENTS)
+    en_conflit = df_import.duplicated('id_equipement', keep=False).to_numpy()
+
+    actuel = (
+        df_actuel[COLONNES_EQUIPEMENTS]
+        .drop_duplicates('id_equipement')
+        .rename(columns={'departement': 'departement_actuel'})
+    )
+    diff = df_import.merge(actuel, on='id_equipement', how='left')
+
+    absent = diff['departement_actuel'].isna().to_numpy()
+    identique = (diff['departement'] == diff['departement_actuel']).to_numpy()
+
+    diff['statut'] = np.select(
+        [en_conflit, absent, identique],
+        [STATUT_DOUBLON, STATUT_NOUVEAU, STATUT_INCHANGE],
+        default=STATUT_DEPLACE
+    )
+
+    return diff.sort_values(['statut', 'departement', 'id_equipement']).reset_index(drop=True)
+
+
+def appliquer_import_equipements(df_diff):
+    """Applique les ajouts et changements de département en une seule écriture.
+
+    Les lignes ``Doublon`` et ``Inchangé`` sont ignorées.
+
+    Args:
+        df_diff: Résultat de ``calculer_diff_equipements``.
+
+    Returns:
+        Tuple (succès, message).
+    """
+    try:
+        nouveaux = df_diff[df_diff['statut'] == STATUT_NOUVEAU]
+        deplaces = df_diff[df_diff['statut'] == STATUT_DEPLACE]
+
+        if nouveaux.empty and deplaces.empty:
+            return False, "⚠️ Aucune modification à appliquer"
+
+        if STOCKAGE != STOCKAGE_FICHIERS:
+            # Base ou partitions : upsert des seules lignes modifiées, par lots
+            success, message = data_manager.sauvegarder_equipements_lot(
+                pd.concat([nouveaux, deplaces])[COLONNES_EQUIPEMENTS]
+            )
+            if not success:
+                return False, message
+        else:
+            df_actuel = data_manager.charger_equipements()
+            if df_actuel.empty:
+                df_actuel = pd.DataFrame(columns=COLONNES_EQUIPEMENTS)
+
+            # Changements de département
+            nouveaux_depts = deplaces.set_index('id_equipement')['departement']
+            masque = df_actuel['id_equipement'].isin(nouveaux_depts.index)
+            df_actuel.loc[masque, 'departement'] = (
+                df_actuel.loc[masque, 'id_equipement'].map(nouveaux_depts)
+            )
+
+            df_final = pd.concat(
+                [df_actuel[COLONNES_EQUIPEMENTS], nouveaux[COLONNES_EQUIPEMENTS]],
+                ignore_index=True
+            ).sort_values(['departement', 'id_equipement'])
+
+            df_final.to_excel(FICHIER_EQUIPEMENTS, index=False)
+
+        cache.invalider('equipements')
+        if not deplaces.empty and PARTITIONNE:
+            # Partitions : lignes des équipements déplacés réécrites ailleurs
+            cache.invalider('observations')
+            cache.invalider('suivi')
+
+        return True, (
+            f"✅ Import appliqué : {len(nouveaux)} ajout(s), "
+            f"{len(deplaces)} changement(s) de département"
+        )
+
+    except Exception as e:
+        return False, f"❌ Erreur lors de l'import : {str(e)}"
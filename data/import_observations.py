@@ -0,0 +1,244 @@
+"""
+Import en masse des rapports d'observations Excel (format de l'export)
+"""
+
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from data import cache, doublons, cube
+from data.stockage import STOCKAGE, STOCKAGE_FICHIERS, data_manager
+
+# Emplacement documenté de l'historique (voir README - "Structure du projet")
+FICHIER_OBSERVATIONS = os.path.join(os.path.dirname(__file__), "observations.csv")
+
+COLONNES_OBSERVATIONS = [
+    'id_equipement', 'date', 'observation',
+    'recommandation', 'travaux', 'analyste', 'importance'
+]
+
+# En-têtes reconnus (export exporter_observations_excel et rapports historiques)
+ALIAS_ENTETES = {
+    'département': 'departement',
+    'departement': 'departement',
+    'id': 'id_equipement',
+    'id équipement': 'id_equipement',
+    'id equipement': 'id_equipement',
+    'id_equipement': 'id_equipement',
+    'équipement': 'id_equipement',
+    'date': 'date',
+    'observation': 'observation',
+    'observations': 'observation',
+    'recommandation': 'recommandation',
+    'recommandations': 'recommandation',
+    'travaux': 'travaux',
+    'travaux effectués & notes': 'travaux',
+    'travaux effectués': 'travaux',
+    'analyste': 'analyste',
+    'importance': 'importance',
+}
+
+TAILLE_LOT = 5000
+LIGNES_RECHERCHE_ENTETE = 20
+
+
+def _normaliser_entete(valeur):
+    """Retourne le nom de colonne interne correspondant à un en-tête Excel."""
+    if valeur is None:
+        return None
+    return ALIAS_ENTETES.get(str(valeur).strip().lower())
+
+
+def _lire_par_lots(chemin, taille_lot):
+    """Parcourt le classeur en mode streaming et produit des DataFrames par lot.
+
+    Toutes les feuilles sont lues ; l'en-tête est recherché dans les premières
+    lignes de chaque feuille (les rapports peuvent commencer par un titre).
+    """
+    classeur = load_workbook(chemin, read_only=True, data_only=True)
+
+    try:
+        for feuille in classeur.worksheets:
+            lignes = feuille.iter_rows(values_only=True)
+            colonnes = None
+
+            # Recherche de la ligne d'en-tête
+            for _, ligne in zip(range(LIGNES_RECHERCHE_ENTETE), lignes):
+                noms = [_normaliser_entete(v) for v in ligne]
+                if 'id_equipement' in noms and 'date' in noms and 'observation' in noms:
+                    colonnes = noms
+                    break
+
+            if colonnes is None:
+                continue
+
+            positions = [i for i, nom in enumerate(colonnes) if nom]
+            noms = [colonnes[i] for i in positions]
+
+            lot = []
+            for ligne in lignes:
+                lot.append([ligne[i] if i < len(ligne) else None for i in positions])
+                if len(lot) >= taille_lot:
+                    yield pd.DataFrame(lot, columns=noms)
+                    lot = []
+
+            if lot:
+                yield pd.DataFrame(lot, columns=noms)
+    finally:
+        classeur.close()
+
+
+def importer_observations_excel(fichier, simulation=False, taille_lot=TAILLE_LOT):
+    """Importe un rapport d'observations Excel en un seul lot.
+
+    Le classeur est lu en streaming (openpyxl en lecture seule) : seules les
+    lignes retenues sont conservées, dans un fichier temporaire, puis ajoutées
+    à l'historique en une écriture.
+
+    Args:
+        fichier: Chemin ou fichier téléversé (.xlsx).
+        simulation: Si True, analyse le fichier sans rien écrire.
+        taille_lot: Nombre de lignes traitées par lot.
+
+    Returns:
+        Tuple (succès, message, rapport) où rapport compte les lignes lues,
+        importées, en doublon, d'équipement inconnu, de date invalide et de
+        département différent du référentiel.
+    """
+    rapport = {
+        'lues': 0,
+        'importees': 0,
+        'doublons': 0,
+        'equipements_inconnus': 0,
+        'dates_invalides': 0,
+        'departements_differents': 0,
+    }
+
+    try:
+        # Référentiel : ID -> département
+        df_equipements = data_manager.charger_equipements()
+        departement_par_id = df_equipements.set_index('id_equipement')['departement']
+        departement_par_id = departement_par_id[~departement_par_id.index.duplicated()]
+
+        # Clés retenues dans ce fichier (l'index partagé couvre l'existant)
+        hashes_retenus = set()
+
+        # Colonnes de l'historique existant (ordre du fichier)
+        if STOCKAGE == STOCKAGE_FICHIERS and os.path.exists(FICHIER_OBSERVATIONS):
+            colonnes_fichier = list(pd.read_csv(FICHIER_OBSERVATIONS, nrows=0).columns)
+        else:
+            colonnes_fichier = COLONNES_OBSERVATIONS
+
+        with tempfile.NamedTemporaryFile(
+                'w+', suffix='.csv', encoding='utf-8', newline='', delete=False
+        ) as tampon:
+            chemin_tampon = tampon.name
+
+            for lot in _lire_par_lots(fichier, taille_lot):
+                lot = lot.dropna(how='all')
+                rapport['lues'] += len(lot)
+
+                lot['id_equipement'] = lot['id_equipement'].astype(str).str.strip()
+                lot['date'] = pd.to_datetime(
+                    lot['date'], errors='coerce', dayfirst=True, format='mixed'
+                )
+
+                # Dates invalides
+                date_ok = lot['date'].notna().to_numpy()
+                rapport['dates_invalides'] += int((~date_ok).sum())
+
+                # Équipements inconnus du référentiel
+                dept_ref = lot['id_equipement'].map(departement_par_id)
+                connu = dept_ref.notna().to_numpy()
+                rapport['equipements_inconnus'] += int((date_ok & ~connu).sum())
+
+                if 'departement' in lot.columns:
+                    different = (
+                        connu
+                        & lot['departement'].notna().to_numpy()
+                        & (lot['departement'].astype(str).str.strip() != dept_ref).to_numpy()
+                    )
+                    rapport['departements_differents'] += int((date_ok & different).sum())
+
+                lot = lot[date_ok & connu]
+                if lot.empty:
+                    continue
+
+                # Doublons : déjà en base ou déjà vus dans le fichier
+                hashes = doublons.hash_observations(lot)
+                deja_retenu = np.fromiter(
+                    (int(h) in hashes_retenus for h in hashes), dtype=bool, count=len(hashes)
+                )
+                doublon = (
+                    doublons.contient('observations', hashes)
+                    | deja_retenu
+                    | pd.Series(hashes).duplicated().to_numpy()
+                )
+                rapport['doublons'] += int(doublon.sum())
+
+                lot = lot[~doublon]
+                hashes_retenus.update(int(h) for h in hashes[~doublon])
+                rapport['importees'] += len(lot)
+
+                if not simulation and not lot.empty:
+                    lot = lot.assign(date=lot['date'].dt.strftime('%Y-%m-%d'))
+                    lot.reindex(columns=colonnes_fichier).to_csv(
+                        tampon, header=False, index=False
+                    )
+
+        try:
+            if simulation:
+                return True, f"🔎 {rapport['importees']} observation(s) à importer", rapport
+
+            if rapport['importees'] == 0:
+                return False, "⚠️ Aucune nouvelle observation à importer", rapport
+
+            if STOCKAGE != STOCKAGE_FICHIERS:
+                # Base ou partitions : insertions groupées, lot par lot depuis le tampon
+                for lot in pd.read_csv(
+                        chemin_tampon, header=None, names=colonnes_fichier,
+                        dtype=str, chunksize=taille_lot
+                ):
+                    success, message = data_manager.sauvegarder_observations_lot(lot)
+                    if not success:
+                        # Lots précédents déjà en base : instantané et index à reconstruire
+                        cache.invalider('observations')
+                        doublons.invalider('observations')
+                        cube.invalider('observations')
+                        return False, message, rapport
+
+                cache.invalider('observations')
+                doublons.ajouter('observations', hashes_retenus)
+                # Import en masse : cube reconstruit au prochain affichage du tableau de bord
+                cube.invalider('observations')
+
+                return True, f"✅ {rapport['importees']} observation(s) importée(s)", rapport
+
+            # Écriture unique dans l'historique
+            existe = os.path.exists(FICHIER_OBSERVATIONS)
+            fin_de_ligne = True
+            if existe and os.path.getsize(FICHIER_OBSERVATIONS) > 0:
+                with open(FICHIER_OBSERVATIONS, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    fin_de_ligne = f.read(1) == b'\n'
+
+            with open(FICHIER_OBSERVATIONS, 'a', encoding='utf-8', newline='') as sortie, \
+                    open(chemin_tampon, 'r', encoding='utf-8', newline='') as source:
+                if not existe:
+                    sortie.write(','.join(colonnes_fichier) + '\n')
+                elif not fin_de_ligne:
+                    sortie.write('\n')
+                shutil.copyfileobj(source, sortie)
+
+            cache.invalider('observations')
+            doublons.ajouter('observations', hashes_retenus)
+            cube.invalider('observations')
+
+            return True, f"✅ {rapport['importees']} observation(s) importée(s)", rapport
+        finally:
+            os.remove(chemin_tampon)
+
+    except Exception as e:
+        return False, f"❌ Erreur lors de l'import : {str(e)}", rapport
@@ -0,0 +1,363 @@
+"""
+Ingestion en lot des mesures de suivi et des observations (analyseurs, scripts)
+
+Un lot reçu (JSON ou CSV) est validé en une passe vectorisée, avec les mêmes
+règles que les formulaires de l'onglet Observations. Les lignes valides sont
+confiées à un fil d'écriture unique qui regroupe les lots arrivés en même
+temps et les écrit en une seule opération de stockage par table (« group
+commit ») : le coût fixe d'une écriture (réécriture de fichier, aller-retour
+réseau, invalidation des instantanés) est partagé entre tous les lots du
+groupe.
+"""
+
+import io
+import os
+import json
+import queue
+import threading
+from concurrent.futures import Future
+import numpy as np
+import pandas as pd
+from outils import metriques
+from data import cache, doublons, agregats, cube
+from data.stockage import STOCKAGE, STOCKAGE_FICHIERS, data_manager
+from data.import_observations import FICHIER_OBSERVATIONS, COLONNES_OBSERVATIONS
+from data.constantes import POINTS_MESURE, NIVEAUX_IMPORTANCE
+
+COLONNES_SUIVI = [
+    'id_equipement', 'point_mesure', 'date', 'vitesse_rpm',
+    'twf_rms_g', 'crest_factor', 'twf_peak_to_peak_g'
+]
+
+COLONNES = {
+    'observations': COLONNES_OBSERVATIONS,
+    'suivi': COLONNES_SUIVI,
+}
+
+# Colonnes obligatoires dans chaque lot (les autres peuvent être absentes)
+COLONNES_REQUISES = {
+    'observations': ['id_equipement', 'date', 'observation', 'analyste'],
+    'suivi': COLONNES_SUIVI,
+}
+
+# Bornes acceptées (formulaire « Saisie des mesures de suivi »)
+BORNES_MESURES = {
+    'vitesse_rpm': (0.0, 10000.0),
+    'twf_rms_g': (0.0, 100.0),
+    'crest_factor': (0.0, 100.0),
+    'twf_peak_to_peak_g': (0.0, 100.0),
+}
+
+# Regroupement : attente maximale des lots concurrents, taille maximale d'un groupe
+DELAI_REGROUPEMENT = float(os.environ.get("MAINTENANCE_INGESTION_REGROUPEMENT", "0.005"))
+LIGNES_GROUPE_MAX = 50000
+DELAI_REPONSE = 60  # secondes
+
+_verrou = threading.Lock()
+_file = queue.Queue()
+_fil = None
+
+
+# =============================================================================
+# LECTURE DES LOTS
+# =============================================================================
+
+def lire_json(corps):
+    """Lot JSON : un objet, une liste d'objets ou {"enregistrements": [...]}.
+
+    Raises:
+        ValueError: JSON invalide ou de forme inattendue.
+    """
+    donnees = json.loads(corps)
+    if isinstance(donnees, dict):
+        donnees = donnees.get('enregistrements', [donnees])
+    if not isinstance(donnees, list) or not all(isinstance(d, dict) for d in donnees):
+        raise ValueError("JSON attendu : un objet ou une liste d'objets")
+    return pd.DataFrame(donnees)
+
+
+def lire_csv(corps):
+    """Lot CSV avec ligne d'en-tête (noms de colonnes internes)."""
+    return pd.read_csv(io.BytesIO(corps), dtype=str, keep_default_na=False)
+
+
+# =============================================================================
+# VALIDATION VECTORISÉE
+# =============================================================================
+
+def _texte(df, colonne):
+    """Colonne texte nettoyée (absente ou nulle → chaîne vide)."""
+    if colonne not in df.columns:
+        return pd.Series('', index=df.index)
+    return df[colonne].fillna('').astype(str).str.strip()
+
+
+def valider(table, df, equipements_connus):
+    """Valide un lot complet sans boucle Python par ligne.
+
+    Args:
+        table: 'observations' ou 'suivi'.
+        df: Lot brut (colonnes internes).
+        equipements_connus: Index des ID du référentiel.
+
+    Returns:
+        Tuple (lignes valides normalisées, rejets) ; rejets est un DataFrame
+        ligne (position dans le lot), raison.
+
+    Raises:
+        ValueError: Table inconnue ou colonnes obligatoires absentes.
+    """
+    if table not in COLONNES:
+        raise ValueError(f"Table inconnue : '{table}' (attendu : {', '.join(COLONNES)})")
+
+    manquantes = [c for c in COLONNES_REQUISES[table] if c not in df.columns]
+    if manquantes:
+        raise ValueError(f"Colonnes obligatoires absentes : {', '.join(manquantes)}")
+
+    df = df.reset_index(drop=True)
+    propre = pd.DataFrame(index=df.index)
+    propre['id_equipement'] = _texte(df, 'id_equipement')
+    dates = pd.to_datetime(df['date'], errors='coerce', format='ISO8601')
+
+    # Première règle enfreinte par ligne (ordre de priorité)
+    regles = [
+        (propre['id_equipement'] == '', "id_equipement manquant"),
+        (~propre['id_equipement'].isin(equipements_connus), "équipement inconnu du référentiel"),
+        (dates.isna(), "date invalide (AAAA-MM-JJ attendu)"),
+    ]
+
+    if table == 'observations':
+        for colonne in ('observation', 'recommandation', 'travaux', 'analyste', 'importance'):
+            propre[colonne] = _texte(df, colonne)
+        regles += [
+            (propre['observation'] == '', "observation manquante"),
+            (propre['analyste'] == '', "analyste manquant"),
+            (
+                (propre['importance'] != '') & ~propre['importance'].isin(NIVEAUX_IMPORTANCE),
+                "importance inconnue"
+            ),
+        ]
+        propre['importance'] = propre['importance'].mask(propre['importance'] == '')
+    else:
+        propre['point_mesure'] = _texte(df, 'point_mesure')
+        regles.append((~propre['point_mesure'].isin(POINTS_MESURE), "point de mesure inconnu"))
+
+        for colonne, (minimum, maximum) in BORNES_MESURES.items():
+            valeurs = pd.to_numeric(df[colonne], errors='coerce')
+            propre[colonne] = valeurs
+            regles.append((
+                valeurs.isna() | (valeurs < minimum) | (valeurs > maximum),
+                f"{colonne} hors limites ({minimum:g} à {maximum:g})"
+            ))
+
+        regles.append((
+            (propre[list(BORNES_MESURES)] == 0).all(axis=1),
+            "au moins une mesure doit être différente de zéro"
+        ))
+
+    propre['date'] = dates.dt.strftime('%Y-%m-%d')
+
+    raison = np.full(len(df), '', dtype=object)
+    for condition, message in regles:
+        raison[condition.to_numpy(dtype=bool) & (raison == '')] = message
+
+    rejete = raison != ''
+    rejets = pd.DataFrame({'ligne': np.flatnonzero(rejete), 'raison': raison[rejete]})
+
+    return propre.loc[~rejete, COLONNES[table]], rejets
+
+
+# =============================================================================
+# ÉCRITURE GROUPÉE
+# =============================================================================
+
+def _ajouter_observations_fichier(df):
+    """Ajoute des observations à l'historique CSV en une écriture."""
+    existe = os.path.exists(FICHIER_OBSERVATIONS) and os.path.getsize(FICHIER_OBSERVATIONS) > 0
+
+    if existe:
+        colonnes = list(pd.read_csv(FICHIER_OBSERVATIONS, nrows=0).columns)
+        with open(FICHIER_OBSERVATIONS, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            fin_de_ligne = f.read(1) == b'\n'
+    else:
+        colonnes = COLONNES_OBSERVATIONS
+        fin_de_ligne = True
+
+    with open(FICHIER_OBSERVATIONS, 'a', encoding='utf-8', newline='') as sortie:
+        if not fin_de_ligne:
+            sortie.write('\n')
+        df.reindex(columns=colonnes).to_csv(sortie, header=not existe, index=False)
+
+    return True, f"✅ {len(df)} observation(s) enregistrée(s)"
+
+
+def _ecrire(table, df):
+    """Écrit les lignes d'un groupe en une opération de stockage.
+
+    Returns:
+        Tuple (succès, message).
+    """
+    if STOCKAGE != STOCKAGE_FICHIERS:
+        if table == 'observations':
+            return data_manager.sauvegarder_observations_lot(df)
+        return data_manager.sauvegarder_suivi_lot(df)
+
+    if table == 'observations':
+        return _ajouter_observations_fichier(df)
+
+    # Emplacement des mesures propre à data_manager : écriture ligne à ligne
+    for ligne in df.itertuples(index=False):
+        success, message = data_manager.sauvegarder_suivi(
+            ligne.id_equipement, ligne.point_mesure, pd.Timestamp(ligne.date).date(),
+            ligne.vitesse_rpm, ligne.twf_rms_g, ligne.crest_factor, ligne.twf_peak_to_peak_g
+        )
+        if not success:
+            return False, message
+    return True, f"✅ {len(df)} mesure(s) enregistrée(s)"
+
+
+def _traiter_groupe(table, demandes):
+    """Écarte les doublons (stockage et groupe), écrit le groupe, publie les résultats.
+
+    Args:
+        table: Table commune aux demandes.
+        demandes: Liste de (lignes valides, futur).
+    """
+    fonction_hash = doublons.hash_observations if table == 'observations' else doublons.hash_suivi
+    vus = set()
+    retenus = []
+    cles_retenues = []
+    doublons_par_demande = []
+
+    for lignes, _ in demandes:
+        hashes = fonction_hash(lignes) if len(lignes) else np.array([], dtype=np.uint64)
+        deja_vu = np.fromiter((int(h) in vus for h in hashes), dtype=bool, count=len(hashes))
+        doublon = (
+            doublons.contient(table, hashes)
+            | deja_vu
+            | pd.Series(hashes).duplicated().to_numpy()
+        )
+        vus.update(int(h) for h in hashes[~doublon])
+
+        retenus.append(lignes[~doublon])
+        cles_retenues.extend(int(h) for h in hashes[~doublon])
+        doublons_par_demande.append(lignes.index[doublon])
+
+    groupe = pd.concat(retenus, ignore_index=True)
+
+    if groupe.empty:
+        success, message = True, "ℹ️ Aucune nouvelle ligne"
+    else:
+        try:
+            with metriques.chronometre(f"ingestion_ecriture_{table}"):
+                success, message = _ecrire(table, groupe)
+        except Exception as e:
+            success, message = False, f"❌ Erreur lors de l'enregistrement : {str(e)}"
+
+        if success:
+            cache.invalider(table)
+            doublons.ajouter(table, cles_retenues)
+            cube.ajouter(table, groupe)
+            if table == 'suivi':
+                agregats.ajouter(groupe)
+        else:
+            # Écriture éventuellement partielle : instantané, index, agrégats et cube à reconstruire
+            cache.invalider(table)
+            doublons.invalider(table)
+            cube.invalider(table)
+            if table == 'suivi':
+                agregats.invalider()
+
+    metriques.incrementer('ingestion_groupes', table=table)
+    metriques.incrementer('ingestion_lignes', len(groupe) if success else 0, table=table)
+
+    for (_, futur), retenu, positions in zip(demandes, retenus, doublons_par_demande):
+        futur.set_result((success, message, len(retenu) if success else 0, positions))
+
+
+def _boucle_ecriture():
+    """Fil d'écriture : regroupe les lots en attente, une écriture par table."""
+    while True:
+        demandes = [_file.get()]
+        lignes = len(demandes[0][1])
+
+        # Laisse arriver les lots concurrents, sans dépasser la taille d'un groupe
+        try:
+            while lignes < LIGNES_GROUPE_MAX:
+                demande = _file.get(timeout=DELAI_REGROUPEMENT)
+                demandes.append(demande)
+                lignes += len(demande[1])
+        except queue.Empty:
+            pass
+
+        par_table = {}
+        for table, valides, futur in demandes:
+            par_table.setdefault(table, []).append((valides, futur))
+
+        for table, groupe in par_table.items():
+            try:
+                _traiter_groupe(table, groupe)
+            except Exception as e:
+                for _, futur in groupe:
+                    if not futur.done():
+                        futur.set_exception(e)
+
+
+def demarrer():
+    """Démarre (une seule fois par processus) le fil d'écriture groupée."""
+    global _fil
+
+    with _verrou:
+        if _fil is not None:
+            return
+        _fil = threading.Thread(target=_boucle_ecriture, name="ingestion", daemon=True)
+        _fil.start()
+
+
+def ingerer(table, df):
+    """Valide un lot, le confie au fil d'écriture groupée et attend le résultat.
+
+    Les doublons (déjà stockés, répétés dans le lot ou dans un lot concurrent)
+    sont rejetés, quelle que soit ``MAINTENANCE_POLITIQUE_DOUBLONS``.
+
+    Args:
+        table: 'observations' ou 'suivi'.
+        df: Lot brut (voir ``lire_json`` et ``lire_csv``).
+
+    Returns:
+        Tuple (succès, message, rapport) ; rapport compte les lignes reçues et
+        enregistrées et liste les rejets ({ligne, raison}).
+
+    Raises:
+        ValueError: Table inconnue ou colonnes obligatoires absentes.
+    """
+    demarrer()
+
+    with metriques.chronometre(f"ingestion_validation_{table}"):
+        equipements = cache.obtenir('equipements')['id_equipement'].astype(str).str.strip()
+        valides, rejets = valider(table, df, pd.Index(equipements.unique()))
+
+    rapport = {'recues': len(df), 'enregistrees': 0, 'rejets': []}
+    futur = Future()
+
+    if valides.empty:
+        success, message, enregistrees, positions = True, "ℹ️ Aucune ligne valide", 0, []
+    else:
+        _file.put((table, valides, futur))
+        success, message, enregistrees, positions = futur.result(timeout=DELAI_REPONSE)
+
+    rejets = pd.concat([
+        rejets,
+        pd.DataFrame({'ligne': list(positions), 'raison': "doublon"}),
+    ]).astype({'ligne': int}).sort_values('ligne', kind='stable')
+
+    rapport['enregistrees'] = enregistrees
+    rapport['rejets'] = rejets.to_dict(orient='records')
+    metriques.incrementer('ingestion_rejets', len(rejets), table=table)
+
+    if not success:
+        return False, message, rapport
+    if enregistrees == 0:
+        return False, "⚠️ Aucune ligne enregistrée", rapport
+    return True, f"✅ {enregistrees} ligne(s) enregistrée(s) sur {len(df)}", rapport
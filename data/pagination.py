@@ -0,0 +1,74 @@
+"""
+Pagination côté serveur des tableaux de l'interface
+
+Seule la page affichée est extraite de l'instantané et envoyée au
+navigateur. Pour chaque table et chaque tri, la permutation triée de
+l'instantané est calculée une fois (reconstruite quand l'instantané change,
+comme l'index de ``recherche``) : une page est une tranche de cette
+permutation, restreinte aux lignes retenues par le filtre. Le nombre total
+de lignes est le compte du masque, sans construire la table filtrée.
+"""
+
+import os
+import threading
+import numpy as np
+import pandas as pd
+from data import cache
+
+TAILLE_PAGE = int(os.environ.get("MAINTENANCE_TAILLE_PAGE", "50"))
+
+_verrou = threading.Lock()
+_ordres = {}  # (table, colonnes) -> (génération, nombre de lignes, permutation)
+
+
+def _ordre(table, colonnes, df):
+    """Permutation triant l'instantané selon ``colonnes`` (à appeler sous _verrou)."""
+    generation = cache.generation(table)
+    cle = (table, tuple(colonnes))
+    entree = _ordres.get(cle)
+    if entree is not None and entree[0] == generation and entree[1] == len(df):
+        return entree[2]
+
+    # Codes de tri entiers (valeurs manquantes en tête), dernière clé = clé principale
+    codes = [pd.factorize(df[colonne], sort=True)[0] for colonne in reversed(colonnes)]
+    permutation = np.lexsort(codes) if len(df) else np.empty(0, dtype=np.intp)
+
+    _ordres[cle] = (generation, len(df), permutation)
+    return permutation
+
+
+def page(table, colonnes, descendant=False, filtre=None, numero=1, taille=TAILLE_PAGE):
+    """Une page de l'instantané d'une table, triée et filtrée.
+
+    Args:
+        table: 'equipements', 'observations' ou 'suivi'.
+        colonnes: Colonnes de tri (la première est la clé principale).
+        descendant: Ordre décroissant.
+        filtre: Fonction recevant l'instantané et retournant le masque
+            booléen des lignes retenues (None = toutes).
+        numero: Numéro de page (à partir de 1), ramené dans les bornes.
+        taille: Lignes par page.
+
+    Returns:
+        Tuple (page, total, numero) : DataFrame de la page (au plus
+        ``taille`` lignes), nombre de lignes retenues et numéro de page
+        effectif.
+    """
+    df = cache.obtenir(table)
+
+    with _verrou:
+        permutation = _ordre(table, colonnes, df)
+
+    if filtre is not None:
+        masque = np.asarray(filtre(df), dtype=bool)
+        permutation = permutation[masque[permutation]]
+
+    total = len(permutation)
+    if descendant:
+        permutation = permutation[::-1]
+
+    pages = max(1, -(-total // taille))
+    numero = min(max(1, int(numero)), pages)
+    debut = (numero - 1) * taille
+
+    return df.iloc[permutation[debut:debut + taille]], total, numero
@@ -0,0 +1,121 @@
+"""
+Équipements récents et favoris de chaque analyste
+
+Stockés dans une petite base SQLite locale partagée par les workers ; un
+analyste est identifié par son nom (insensible à la casse et aux espaces).
+"""
+
+import os
+import time
+import sqlite3
+import threading
+
+FICHIER_PREFERENCES = os.environ.get(
+    "MAINTENANCE_PREFERENCES_FICHIER",
+    os.path.join(os.path.dirname(__file__), "preferences.sqlite")
+)
+
+RECENTS_MAX = 10
+DELAI_VERROU = 5  # secondes d'attente si un autre processus écrit
+
+_verrou = threading.Lock()
+_connexion = None
+
+
+def _connecter():
+    """Connexion SQLite du processus (à utiliser sous _verrou)."""
+    global _connexion
+
+    if _connexion is None:
+        _connexion = sqlite3.connect(
+            FICHIER_PREFERENCES, timeout=DELAI_VERROU,
+            isolation_level=None, check_same_thread=False
+        )
+        _connexion.execute("PRAGMA journal_mode=WAL")
+        _connexion.execute(
+            "CREATE TABLE IF NOT EXISTS recents ("
+            "analyste TEXT NOT NULL, id_equipement TEXT NOT NULL, utilise_le REAL NOT NULL, "
+            "PRIMARY KEY (analyste, id_equipement))"
+        )
+        _connexion.execute(
+            "CREATE TABLE IF NOT EXISTS favoris ("
+            "analyste TEXT NOT NULL, id_equipement TEXT NOT NULL, "
+            "PRIMARY KEY (analyste, id_equipement))"
+        )
+
+    return _connexion
+
+
+def _cle_analyste(analyste):
+    return (analyste or '').strip().lower()
+
+
+def recents(analyste, limite=RECENTS_MAX):
+    """Derniers équipements utilisés par un analyste (du plus récent au plus ancien)."""
+    cle = _cle_analyste(analyste)
+    if not cle:
+        return []
+
+    with _verrou:
+        return [ligne[0] for ligne in _connecter().execute(
+            "SELECT id_equipement FROM recents WHERE analyste = ? ORDER BY utilise_le DESC LIMIT ?",
+            (cle, limite)
+        )]
+
+
+def ajouter_recent(analyste, id_equipement):
+    """Note l'utilisation d'un équipement ; seuls les ``RECENTS_MAX`` derniers sont gardés."""
+    cle = _cle_analyste(analyste)
+    if not cle or not id_equipement:
+        return
+
+    with _verrou:
+        connexion = _connecter()
+        connexion.execute(
+            "INSERT INTO recents VALUES (?, ?, ?) ON CONFLICT (analyste, id_equipement) "
+            "DO UPDATE SET utilise_le = excluded.utilise_le",
+            (cle, str(id_equipement), time.time())
+        )
+        connexion.execute(
+            "DELETE FROM recents WHERE analyste = ? AND id_equipement NOT IN ("
+            "SELECT id_equipement FROM recents WHERE analyste = ? ORDER BY utilise_le DESC LIMIT ?)",
+            (cle, cle, RECENTS_MAX)
+        )
+
+
+def favoris(analyste):
+    """Équipements favoris d'un analyste (ordre alphabétique)."""
+    cle = _cle_analyste(analyste)
+    if not cle:
+        return []
+
+    with _verrou:
+        return [ligne[0] for ligne in _connecter().execute(
+            "SELECT id_equipement FROM favoris WHERE analyste = ? ORDER BY id_equipement", (cle,)
+        )]
+
+
+def definir_favoris(analyste, ids):
+    """Remplace la liste des favoris d'un analyste.
+
+    Returns:
+        Tuple (succès, message).
+    """
+    cle = _cle_analyste(analyste)
+    if not cle:
+        return False, "⚠️ Renseignez l'analyste pour enregistrer des favoris"
+
+    with _verrou:
+        connexion = _connecter()
+        connexion.execute("BEGIN IMMEDIATE")
+        try:
+            connexion.execute("DELETE FROM favoris WHERE analyste = ?", (cle,))
+            connexion.executemany(
+                "INSERT INTO favoris VALUES (?, ?)", [(cle, str(i)) for i in dict.fromkeys(ids)]
+            )
+            connexion.execute("COMMIT")
+        except sqlite3.Error as e:
+            connexion.execute("ROLLBACK")
+            return False, f"❌ Erreur lors de l'enregistrement des favoris : {str(e)}"
+
+    return True, f"✅ {len(ids)} favori(s) enregistré(s)"
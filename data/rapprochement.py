@@ -0,0 +1,102 @@
+"""
+Rapprochement des observations avec les mesures de suivi les plus proches
+
+Pour chaque observation et chaque point de mesure de son équipement, la
+mesure la plus proche dans le temps est retrouvée par une jointure « as-of »
+triée (``pandas.merge_asof`` par équipement et point) : aucune boucle
+Python, un seul passage sur les deux tables, y compris sur tout l'historique.
+La variation de RMS par rapport à la mesure précédente du même point aide à
+juger si une observation correspond à une hausse vibratoire.
+"""
+
+import pandas as pd
+from outils import metriques
+
+VARIABLES = ['vitesse_rpm', 'twf_rms_g', 'crest_factor', 'twf_peak_to_peak_g']
+
+DIRECTIONS = ('nearest', 'backward', 'forward')  # plus proche, avant, après l'observation
+
+COLONNES = [
+    'id_equipement', 'date', 'importance', 'analyste', 'point_mesure',
+    'date_mesure', 'ecart_jours', *VARIABLES, 'variation_twf_rms_g_pct'
+]
+
+# En-têtes de l'export et de la vue
+LIBELLES = {
+    'id_equipement': 'ID Équipement',
+    'date': 'Date observation',
+    'importance': 'Importance',
+    'analyste': 'Analyste',
+    'point_mesure': 'Point de mesure',
+    'date_mesure': 'Date mesure',
+    'ecart_jours': 'Écart (jours)',
+    'vitesse_rpm': 'Vitesse (RPM)',
+    'twf_rms_g': 'TWF RMS (g)',
+    'crest_factor': 'Crest Factor',
+    'twf_peak_to_peak_g': 'TWF Peak-to-Peak (g)',
+    'variation_twf_rms_g_pct': 'Variation RMS (%)',
+}
+
+
+def _mesures(df_suivi):
+    """Mesures triées par date, avec la variation de RMS depuis la mesure précédente du point."""
+    serie = df_suivi.sort_values(['id_equipement', 'point_mesure', 'date'], kind='stable')
+    precedente = serie.groupby(['id_equipement', 'point_mesure'], sort=False)['twf_rms_g'].shift()
+
+    return pd.DataFrame({
+        'id_equipement': serie['id_equipement'],
+        'point_mesure': serie['point_mesure'],
+        'date_mesure': serie['date'],
+        **{variable: serie[variable] for variable in VARIABLES},
+        'variation_twf_rms_g_pct': (serie['twf_rms_g'] - precedente) / precedente.where(precedente != 0) * 100,
+    }).sort_values('date_mesure', kind='stable')
+
+
+def mesures_proches(df_observations, df_suivi, ecart_max_jours=None, direction='nearest'):
+    """Mesure la plus proche de chaque observation, pour chaque point de son équipement.
+
+    Args:
+        df_observations: Observations (dates typées ; textes facultatifs).
+        df_suivi: Mesures de suivi (dates typées).
+        ecart_max_jours: Écart maximal entre observation et mesure (None =
+            sans limite) ; au-delà, les colonnes de mesure restent vides.
+        direction: 'nearest', 'backward' (mesure antérieure ou du jour) ou
+            'forward' (mesure postérieure ou du jour).
+
+    Returns:
+        DataFrame aux colonnes ``COLONNES`` : une ligne par observation et
+        point de mesure (une ligne sans mesure si l'équipement n'a aucun
+        suivi), trié par date d'observation puis équipement et point.
+    """
+    if direction not in DIRECTIONS:
+        raise ValueError(f"Direction inconnue : {direction} (attendu : {', '.join(DIRECTIONS)})")
+
+    with metriques.chronometre("rapprochement_mesures"):
+        observations = pd.DataFrame({
+            'id_equipement': df_observations['id_equipement'],
+            'date': df_observations['date'],
+            'importance': df_observations.get('importance'),
+            'analyste': df_observations.get('analyste'),
+        })
+
+        # Une ligne par observation et point mesuré sur son équipement
+        points = df_suivi[['id_equipement', 'point_mesure']].drop_duplicates()
+        gauche = observations.merge(points, on='id_equipement', how='left').sort_values('date', kind='stable')
+
+        avec_point = gauche['point_mesure'].notna()
+        proches = pd.merge_asof(
+            gauche[avec_point],
+            _mesures(df_suivi),
+            left_on='date',
+            right_on='date_mesure',
+            by=['id_equipement', 'point_mesure'],
+            direction=direction,
+            tolerance=None if ecart_max_jours is None else pd.Timedelta(days=ecart_max_jours),
+        )
+
+        resultat = pd.concat([proches, gauche[~avec_point]], ignore_index=True)
+        resultat['ecart_jours'] = (resultat['date_mesure'] - resultat['date']).dt.days
+
+    return resultat.reindex(columns=COLONNES).sort_values(
+        ['date', 'id_equipement', 'point_mesure'], kind='stable'
+    ).reset_index(drop=True)
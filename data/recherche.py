@@ -0,0 +1,135 @@
+"""
+Index de recherche des équipements pour les sélecteurs de l'interface
+
+Les sélecteurs n'envoient au navigateur que les ``RESULTATS_MAX`` meilleurs
+résultats de la saisie en cours, au lieu de la liste complète des ID :
+- préfixe : recherche dichotomique dans les ID triés (insensible à la casse) ;
+- sous-chaîne, puis correspondance approchée (difflib) pour compléter.
+
+L'index est reconstruit quand l'instantané du référentiel change.
+"""
+
+import difflib
+import threading
+import numpy as np
+from data import cache
+
+RESULTATS_MAX = 50
+LONGUEUR_APPROCHEE_MIN = 3  # caractères saisis avant la correspondance approchée
+SEUIL_APPROCHE = 0.6
+
+_verrou = threading.Lock()
+_index = {'generation': None, 'ids': None, 'minuscules': None, 'departements': None}
+
+
+def _construire():
+    """Index trié du référentiel (à appeler sous _verrou)."""
+    generation = cache.generation('equipements')
+    if _index['generation'] == generation and _index['ids'] is not None:
+        return _index
+
+    df = cache.obtenir('equipements')
+    ids = np.asarray(df['id_equipement'].astype(str), dtype=str)
+    minuscules = np.char.lower(ids)
+    ordre = np.argsort(minuscules, kind='stable')
+
+    _index.update({
+        'generation': generation,
+        'ids': ids[ordre],
+        'minuscules': minuscules[ordre],
+        'departements': np.asarray(df['departement'].astype(str), dtype=str)[ordre],
+    })
+    return _index
+
+
+def chercher(terme=None, departements=None, parmi=None, prioritaires=(), limite=RESULTATS_MAX):
+    """Meilleurs ID d'équipement pour une saisie.
+
+    Args:
+        terme: Saisie de l'utilisateur (vide = premiers ID, prioritaires en tête).
+        departements: Départements retenus (None ou vide = tous).
+        parmi: ID autorisés (par exemple équipements ayant des mesures) ;
+            None = tout le référentiel.
+        prioritaires: ID placés en tête à égalité de correspondance
+            (favoris, récents).
+        limite: Nombre maximal de résultats.
+
+    Returns:
+        Liste d'ID (au plus ``limite``) : préfixes, puis sous-chaînes, puis
+        correspondances approchées.
+    """
+    with _verrou:
+        index = _construire()
+    ids, minuscules = index['ids'], index['minuscules']
+    autorises = _autorises(index, departements, parmi)
+
+    terme = (terme or '').strip().lower()
+    prioritaires = list(dict.fromkeys(prioritaires))
+
+    if not terme:
+        candidats = ids[autorises]
+        tete = [p for p, present in zip(prioritaires, np.isin(prioritaires, candidats)) if present]
+        deja = set(tete)
+        reste = [i for i in candidats[:limite + len(tete)].tolist() if i not in deja]
+        return (tete + reste)[:limite]
+
+    # Préfixe : tranche contiguë des ID triés
+    debut = np.searchsorted(minuscules, terme, side='left')
+    fin = np.searchsorted(minuscules, terme + '\U0010ffff', side='left')
+    positions = np.arange(debut, fin)
+    resultats = ids[positions[autorises[positions]]].tolist()
+    resultats = _prioriser(resultats, prioritaires)
+
+    if len(resultats) < limite:
+        contient = autorises & (np.char.find(minuscules, terme) > 0)
+        resultats += _prioriser(ids[contient].tolist(), prioritaires)
+
+    if len(resultats) < limite and len(terme) >= LONGUEUR_APPROCHEE_MIN:
+        deja = set(resultats)
+        originaux = {
+            minuscule: original
+            for minuscule, original in zip(minuscules[autorises].tolist(), ids[autorises].tolist())
+            if original not in deja
+        }
+        proches = difflib.get_close_matches(
+            terme, list(originaux), n=limite - len(resultats), cutoff=SEUIL_APPROCHE
+        )
+        resultats += [originaux[p] for p in proches]
+
+    return resultats[:limite]
+
+
+def _autorises(index, departements, parmi):
+    """Masque des ID retenus par les filtres."""
+    autorises = np.ones(len(index['ids']), dtype=bool)
+    if departements:
+        autorises &= np.isin(index['departements'], list(departements))
+    if parmi is not None:
+        autorises &= np.isin(index['ids'], np.asarray(list(parmi), dtype=str))
+    return autorises
+
+
+def _prioriser(ids, prioritaires):
+    """Place en tête les ID prioritaires, sans changer l'ordre des autres."""
+    if not prioritaires:
+        return ids
+    rang = {p: i for i, p in enumerate(prioritaires)}
+    return sorted(ids, key=lambda i: rang.get(i, len(rang)))
+
+
+def retenus(ids, departements=None, parmi=None):
+    """ID (parmi ceux donnés) qui respectent les filtres, dans leur ordre."""
+    if not ids:
+        return []
+    with _verrou:
+        index = _construire()
+
+    autorises = set(index['ids'][_autorises(index, departements, parmi)].tolist())
+    return [i for i in ids if i in autorises]
+
+
+def compter(departements=None, parmi=None):
+    """Nombre d'ID correspondant aux filtres (sans les envoyer au navigateur)."""
+    with _verrou:
+        index = _construire()
+    return int(_autorises(index, departements, parmi).sum())
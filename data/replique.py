@@ -0,0 +1,413 @@
+"""
+Réplique locale (SQLite) des tables Supabase, synchronisée par deltas
+
+Même API que data_manager : ``charger_*`` lisent la réplique locale, les
+écritures partent vers Supabase puis la table touchée est resynchronisée
+aussitôt (chaque session relit ses propres écritures).
+
+Synchronisation : chaque ligne distante porte un numéro de version croissant
+et l'identifiant de la transaction qui l'a écrite, chaque suppression laisse
+une pierre tombale (voir schema_supabase.sql). Une version n'est visible
+qu'à la validation de sa transaction : le filigrane d'une table n'est donc
+pas une version mais un horizon de transaction. Une synchronisation relève
+l'horizon distant (plus ancienne transaction encore ouverte), puis ne
+télécharge que les lignes et pierres tombales écrites depuis l'horizon
+relevé à la synchronisation précédente. Un fil d'arrière-plan la relance
+toutes les quelques secondes pour suivre les écritures des autres postes,
+et compare toutes les clés avec Supabase toutes les heures
+(réconciliation : répare une réplique qui aurait divergé).
+"""
+
+import os
+import time
+import itertools
+import sqlite3
+import threading
+import pandas as pd
+from outils import metriques
+from data import data_manager_supabase as distant
+from data.data_manager_supabase import (
+    COLONNES_EQUIPEMENTS,
+    COLONNES_OBSERVATIONS,
+    COLONNES_SUIVI,
+    exporter_equipements_excel,
+    exporter_observations_excel,
+    exporter_suivi_excel
+)
+
+FICHIER_REPLIQUE = os.environ.get(
+    "MAINTENANCE_REPLIQUE_FICHIER",
+    os.path.join(os.path.dirname(__file__), "replique.sqlite")
+)
+INTERVALLE_SYNCHRONISATION = float(os.environ.get("MAINTENANCE_REPLIQUE_INTERVALLE", "5"))
+INTERVALLE_RECONCILIATION = float(os.environ.get("MAINTENANCE_REPLIQUE_RECONCILIATION", "3600"))
+
+# Clés par requête lors de la relecture des lignes divergentes (longueur d'URL)
+TAILLE_RELECTURE = 200
+
+# Table : (clé, colonnes de données)
+TABLES = {
+    'equipements': ('id_equipement', COLONNES_EQUIPEMENTS),
+    'observations': ('id', COLONNES_OBSERVATIONS),
+    'suivi': ('id', COLONNES_SUIVI),
+}
+
+_verrou = threading.Lock()
+# Une synchronisation (ou réconciliation) à la fois par table
+_verrous_tables = {table: threading.Lock() for table in TABLES}
+_connexion = None
+_fil = None
+_initialisee = False
+
+
+# =============================================================================
+# RÉPLIQUE LOCALE
+# =============================================================================
+
+def _connecter():
+    """Connexion SQLite partagée par le processus (à utiliser sous _verrou)."""
+    global _connexion
+
+    if _connexion is None:
+        _connexion = sqlite3.connect(FICHIER_REPLIQUE, check_same_thread=False)
+        _connexion.execute("PRAGMA journal_mode=WAL")
+        _connexion.execute("PRAGMA synchronous=NORMAL")
+
+        for table, (cle, colonnes) in TABLES.items():
+            type_cle = "INTEGER PRIMARY KEY" if cle == 'id' else "PRIMARY KEY"
+            definitions = [f"{cle} {type_cle}"] + [c for c in colonnes if c != cle] + ["version INTEGER"]
+            _connexion.execute(f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(definitions)})")
+
+        _connexion.execute(
+            "CREATE INDEX IF NOT EXISTS observations_equipement_date ON observations (id_equipement, date)"
+        )
+        _connexion.execute(
+            "CREATE INDEX IF NOT EXISTS suivi_equipement_point_date ON suivi (id_equipement, point_mesure, date)"
+        )
+        # Anciens filigranes en versions : remplacés par les horizons (resynchronisation complète)
+        _connexion.execute("DROP TABLE IF EXISTS filigranes")
+        _connexion.execute("CREATE TABLE IF NOT EXISTS horizons (table_nom PRIMARY KEY, horizon INTEGER)")
+        _connexion.commit()
+
+    return _connexion
+
+
+def _horizon(connexion, table):
+    """Horizon distant relevé avant la dernière synchronisation d'une table (0 = jamais)."""
+    ligne = connexion.execute("SELECT horizon FROM horizons WHERE table_nom = ?", (table,)).fetchone()
+    return ligne[0] if ligne else 0
+
+
+def _requetes(table, colonnes_locales):
+    """Requêtes SQLite d'application des deltas : {suppression: requête}."""
+    cle = TABLES[table][0]
+    affectations = ', '.join(f"{c} = excluded.{c}" for c in colonnes_locales if c != cle)
+    # Clé texte côté distant ; conversion selon le type de la clé locale
+    valeur = "CAST(? AS INTEGER)" if cle == 'id' else "?"
+    return {
+        # Ligne plus récente que la copie locale seulement
+        False: (
+            f"INSERT INTO {table} ({', '.join(colonnes_locales)}) "
+            f"VALUES ({', '.join('?' * len(colonnes_locales))}) "
+            f"ON CONFLICT ({cle}) DO UPDATE SET {affectations} "
+            f"WHERE excluded.version > {table}.version"
+        ),
+        # Pierre tombale : ne supprime pas une ligne recréée depuis (version supérieure)
+        True: f"DELETE FROM {table} WHERE {cle} = {valeur} AND version < ?",
+    }
+
+
+def _tuples(df):
+    """Lignes d'un DataFrame en tuples SQLite (NaN → NULL)."""
+    return df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+
+
+# =============================================================================
+# SYNCHRONISATION
+# =============================================================================
+
+def _synchroniser_table(table):
+    """Applique à la réplique les deltas distants d'une table.
+
+    L'horizon distant est relevé avant la lecture : toute transaction
+    antérieure est validée, ses lignes sont donc lues maintenant ; les
+    lignes des transactions postérieures (même de version inférieure à une
+    version déjà reçue) seront relues à la synchronisation suivante.
+
+    Returns:
+        Nombre de lignes locales modifiées (insérées, mises à jour ou supprimées).
+    """
+    cle, colonnes = TABLES[table]
+    colonnes_locales = list(dict.fromkeys([cle, *colonnes, 'version']))
+
+    with _verrous_tables[table]:
+        with _verrou:
+            precedent = _horizon(_connecter(), table)
+
+        # Deltas distants (hors verrou : allers-retours réseau)
+        horizon = distant.horizon()
+        lignes = distant.lire_pages(
+            table, colonnes_locales, 'version', [('gte', 'transaction_ecriture', precedent)]
+        )
+        tombes = distant.lire_pages(
+            'suppressions', ['version', 'cle'], 'version',
+            [('eq', 'table_nom', table), ('gte', 'transaction_ecriture', precedent)]
+        )
+
+        with _verrou:
+            connexion = _connecter()
+            avant = connexion.total_changes
+            requetes = _requetes(table, colonnes_locales)
+
+            # Écritures et suppressions appliquées dans l'ordre des versions (séquence commune)
+            operations = sorted(
+                [
+                    (int(v), False, ligne) for v, ligne in zip(lignes['version'], _tuples(lignes))
+                ] + [
+                    (int(v), True, (c, int(v))) for v, c in zip(tombes['version'], tombes['cle'])
+                ],
+                key=lambda operation: operation[0]
+            )
+            for suppression, groupe in itertools.groupby(operations, key=lambda operation: operation[1]):
+                connexion.executemany(requetes[suppression], (operation[2] for operation in groupe))
+
+            modifiees = connexion.total_changes - avant
+            connexion.execute("INSERT OR REPLACE INTO horizons VALUES (?, ?)", (table, horizon))
+            connexion.commit()
+
+    return modifiees
+
+
+def synchroniser(table=None):
+    """Synchronise une table (ou toutes) avec Supabase.
+
+    Returns:
+        Dictionnaire {table: lignes locales modifiées}.
+    """
+    return {nom: _synchroniser_table(nom) for nom in ([table] if table else TABLES)}
+
+
+def _reconcilier_table(table):
+    """Compare toutes les clés (et versions) de la réplique avec Supabase et répare les écarts.
+
+    Filet de sécurité des deltas : une ligne absente de Supabase est
+    supprimée, une ligne absente ou plus ancienne localement est relue.
+
+    Returns:
+        Nombre de lignes locales réparées.
+    """
+    cle, colonnes = TABLES[table]
+    colonnes_locales = list(dict.fromkeys([cle, *colonnes, 'version']))
+
+    with _verrous_tables[table]:
+        distantes = distant.lire_pages(table, [cle, 'version'], cle)
+        versions_distantes = dict(zip(distantes[cle].tolist(), distantes['version'].tolist()))
+        with _verrou:
+            versions_locales = dict(_connecter().execute(f"SELECT {cle}, version FROM {table}").fetchall())
+
+        en_trop = [c for c in versions_locales if c not in versions_distantes]
+        a_relire = [c for c, v in versions_distantes.items() if versions_locales.get(c, -1) < v]
+
+        # Lignes divergentes relues par paquets de clés (hors verrou : réseau)
+        relues = [
+            distant.lire_pages(
+                table, colonnes_locales, cle, [('in_', cle, a_relire[debut:debut + TAILLE_RELECTURE])]
+            )
+            for debut in range(0, len(a_relire), TAILLE_RELECTURE)
+        ]
+
+        with _verrou:
+            connexion = _connecter()
+            avant = connexion.total_changes
+            connexion.executemany(f"DELETE FROM {table} WHERE {cle} = ?", ((c,) for c in en_trop))
+            for lignes in relues:
+                connexion.executemany(_requetes(table, colonnes_locales)[False], _tuples(lignes))
+            reparees = connexion.total_changes - avant
+            connexion.commit()
+
+    return reparees
+
+
+def reconcilier(table=None):
+    """Réconcilie une table (ou toutes) avec Supabase, clé par clé.
+
+    Returns:
+        Dictionnaire {table: lignes locales réparées}.
+    """
+    return {nom: _reconcilier_table(nom) for nom in ([table] if table else TABLES)}
+
+
+def _boucle_synchronisation(sur_changement):
+    """Fil d'arrière-plan : synchronise périodiquement, signale les tables modifiées."""
+    derniere_reconciliation = time.monotonic()
+
+    while True:
+        time.sleep(INTERVALLE_SYNCHRONISATION)
+        try:
+            with metriques.chronometre("synchronisation_replique"):
+                changements = synchroniser()
+
+            if time.monotonic() - derniere_reconciliation >= INTERVALLE_RECONCILIATION:
+                with metriques.chronometre("reconciliation_replique"):
+                    reparees = reconcilier()
+                derniere_reconciliation = time.monotonic()
+                for table, nombre in reparees.items():
+                    if nombre:
+                        metriques.incrementer('replique_reparations', nombre, table=table)
+                        changements[table] += nombre
+        except Exception:
+            # Réseau indisponible : la réplique reste lisible, on réessaie
+            metriques.incrementer('replique_echecs')
+            continue
+
+        for table, modifiees in changements.items():
+            if modifiees:
+                metriques.incrementer('replique_lignes', modifiees, table=table)
+                sur_changement(table)
+
+
+def demarrer_synchronisation(sur_changement):
+    """Démarre (une seule fois par processus) la synchronisation en arrière-plan.
+
+    Args:
+        sur_changement: Fonction appelée avec le nom de chaque table modifiée
+            par un autre poste (invalidation des instantanés).
+    """
+    global _fil
+
+    with _verrou:
+        if _fil is not None:
+            return
+        _fil = threading.Thread(
+            target=_boucle_synchronisation,
+            args=(sur_changement,),
+            name="synchronisation-replique",
+            daemon=True
+        )
+        _fil.start()
+
+
+def initialiser_fichiers():
+    """Vérifie Supabase, crée la réplique si besoin et la met à jour (une fois par processus)."""
+    global _initialisee
+
+    if _initialisee:
+        return
+    distant.initialiser_fichiers()
+    synchroniser()
+    _initialisee = True
+
+
+# =============================================================================
+# LECTURE (LOCALE)
+# =============================================================================
+
+def _lire(requete, parametres, colonnes):
+    """Exécute une requête sur la réplique et retourne un DataFrame."""
+    with _verrou:
+        lignes = _connecter().execute(requete, parametres).fetchall()
+    return pd.DataFrame(lignes, columns=colonnes)
+
+
+def _conditions(filtres):
+    """Clause WHERE et paramètres : filtres (colonne, opérateur, valeur ou liste)."""
+    clauses = []
+    parametres = []
+    for colonne, operateur, valeur in filtres:
+        if operateur == 'IN':
+            clauses.append(f"{colonne} IN ({', '.join('?' * len(valeur))})")
+            parametres.extend(valeur)
+        else:
+            clauses.append(f"{colonne} {operateur} ?")
+            parametres.append(valeur)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), parametres
+
+
+def _filtres_periode(colonne, date_debut, date_fin):
+    """Filtres d'une période (dates ISO, bornes incluses)."""
+    filtres = []
+    if date_debut is not None:
+        filtres.append((colonne, '>=', pd.Timestamp(date_debut).strftime('%Y-%m-%d')))
+    if date_fin is not None:
+        filtres.append((colonne, '<=', pd.Timestamp(date_fin).strftime('%Y-%m-%d')))
+    return filtres
+
+
+def charger_equipements(departements=None):
+    """Charge le référentiel depuis la réplique locale."""
+    filtres = [('departement', 'IN', list(departements))] if departements else []
+    where, parametres = _conditions(filtres)
+    return _lire(
+        f"SELECT {', '.join(COLONNES_EQUIPEMENTS)} FROM equipements{where} ORDER BY id_equipement",
+        parametres, COLONNES_EQUIPEMENTS
+    )
+
+
+def charger_observations(departements=None, equipements=None, date_debut=None, date_fin=None):
+    """Charge les observations depuis la réplique locale (mêmes filtres que Supabase)."""
+    filtres = _filtres_periode('o.date', date_debut, date_fin)
+    if equipements:
+        filtres.append(('o.id_equipement', 'IN', list(equipements)))
+    if departements:
+        filtres.append(('e.departement', 'IN', list(departements)))
+
+    where, parametres = _conditions(filtres)
+    jointure = " JOIN equipements e ON e.id_equipement = o.id_equipement" if departements else ""
+
+    return _lire(
+        f"SELECT {', '.join('o.' + c for c in COLONNES_OBSERVATIONS)} "
+        f"FROM observations o{jointure}{where} ORDER BY o.id",
+        parametres, COLONNES_OBSERVATIONS
+    )
+
+
+def charger_suivi(equipements=None, points=None, date_debut=None, date_fin=None):
+    """Charge les mesures de suivi depuis la réplique locale (mêmes filtres que Supabase)."""
+    filtres = _filtres_periode('date', date_debut, date_fin)
+    if equipements:
+        filtres.append(('id_equipement', 'IN', list(equipements)))
+    if points:
+        filtres.append(('point_mesure', 'IN', list(points)))
+
+    where, parametres = _conditions(filtres)
+    return _lire(
+        f"SELECT {', '.join(COLONNES_SUIVI)} FROM suivi{where} ORDER BY id",
+        parametres, COLONNES_SUIVI
+    )
+
+
+# =============================================================================
+# ÉCRITURE (DISTANTE, PUIS RESYNCHRONISATION)
+# =============================================================================
+
+def _ecrire_puis_synchroniser(ecriture, *tables):
+    """Enveloppe une écriture Supabase : resynchronise les tables touchées si elle réussit."""
+    def enveloppe(*args, **kwargs):
+        success, message = ecriture(*args, **kwargs)
+        if success:
+            try:
+                for table in tables:
+                    synchroniser(table)
+            except Exception:
+                # Écriture enregistrée : la synchronisation d'arrière-plan rattrapera la réplique
+                metriques.incrementer('replique_echecs')
+                message = f"{message} (réplique mise à jour à la prochaine synchronisation)"
+        return success, message
+
+    enveloppe.__name__ = ecriture.__name__
+    enveloppe.__doc__ = ecriture.__doc__
+    return enveloppe
+
+
+sauvegarder_equipement = _ecrire_puis_synchroniser(distant.sauvegarder_equipement, 'equipements')
+sauvegarder_observation = _ecrire_puis_synchroniser(distant.sauvegarder_observation, 'observations')
+sauvegarder_suivi = _ecrire_puis_synchroniser(distant.sauvegarder_suivi, 'suivi')
+sauvegarder_equipements_lot = _ecrire_puis_synchroniser(distant.sauvegarder_equipements_lot, 'equipements')
+sauvegarder_observations_lot = _ecrire_puis_synchroniser(distant.sauvegarder_observations_lot, 'observations')
+sauvegarder_suivi_lot = _ecrire_puis_synchroniser(distant.sauvegarder_suivi_lot, 'suivi')
+modifier_observations = _ecrire_puis_synchroniser(distant.modifier_observations, 'observations')
+supprimer_observation = _ecrire_puis_synchroniser(distant.supprimer_observation, 'observations')
+supprimer_suivi = _ecrire_puis_synchroniser(distant.supprimer_suivi, 'suivi')
+supprimer_equipement = _ecrire_puis_synchroniser(
+    distant.supprimer_equipement, 'equipements', 'observations', 'suivi'
+)
@@ -0,0 +1,218 @@
+-- =============================================================================
+-- Schéma Supabase / PostgreSQL - Gestion des rapports de maintenance
+-- =============================================================================
+-- À exécuter une fois (éditeur SQL Supabase ou psql) avant de lancer
+-- l'application avec MAINTENANCE_STOCKAGE=supabase.
+
+-- Référentiel équipements
+create table if not exists equipements (
+    id_equipement text primary key,
+    departement   text not null
+);
+
+create index if not exists equipements_departement_idx
+    on equipements (departement, id_equipement);
+
+-- Historique des observations
+-- id : clé de pagination (keyset) ; la suppression d'un équipement
+-- supprime ses observations dans la même transaction (cascade)
+create table if not exists observations (
+    id             bigint generated always as identity primary key,
+    id_equipement  text not null
+                   references equipements (id_equipement)
+                   on update cascade on delete cascade,
+    date           date not null,
+    observation    text not null,
+    recommandation text,
+    travaux        text,
+    analyste       text,
+    importance     text
+);
+
+create index if not exists observations_equipement_date_idx
+    on observations (id_equipement, date);
+create index if not exists observations_date_idx
+    on observations (date);
+
+-- Mesures de suivi vibratoire
+create table if not exists suivi (
+    id                 bigint generated always as identity primary key,
+    id_equipement      text not null
+                       references equipements (id_equipement)
+                       on update cascade on delete cascade,
+    point_mesure       text not null,
+    date               date not null,
+    vitesse_rpm        double precision,
+    twf_rms_g          double precision,
+    crest_factor       double precision,
+    twf_peak_to_peak_g double precision
+);
+
+create index if not exists suivi_equipement_point_date_idx
+    on suivi (id_equipement, point_mesure, date);
+create index if not exists suivi_date_idx
+    on suivi (date);
+
+-- =============================================================================
+-- Synchronisation des répliques locales (data/replique.py)
+-- =============================================================================
+-- Chaque écriture reçoit un numéro de version croissant (séquence commune) ;
+-- chaque suppression laisse une « pierre tombale » dans `suppressions`.
+--
+-- Une version est tirée à l'écriture mais n'est visible qu'à la validation :
+-- une transaction longue peut valider des versions bien inférieures à celles
+-- d'une transaction validée avant elle. Chaque ligne porte donc aussi
+-- l'identifiant de la transaction qui l'a écrite (`transaction_ecriture`).
+-- Une réplique relève l'horizon (plus ancienne transaction encore ouverte,
+-- `maintenance_horizon`) avant chaque synchronisation, puis télécharge les
+-- lignes écrites par des transactions postérieures à l'horizon précédent :
+-- toute transaction antérieure était validée, donc déjà reçue.
+
+create sequence if not exists maintenance_version;
+
+alter table equipements  add column if not exists version bigint not null default nextval('maintenance_version');
+alter table observations add column if not exists version bigint not null default nextval('maintenance_version');
+alter table suivi        add column if not exists version bigint not null default nextval('maintenance_version');
+
+create index if not exists equipements_version_idx  on equipements (version);
+create index if not exists observations_version_idx on observations (version);
+create index if not exists suivi_version_idx        on suivi (version);
+
+alter table equipements  add column if not exists transaction_ecriture xid8 not null default pg_current_xact_id();
+alter table observations add column if not exists transaction_ecriture xid8 not null default pg_current_xact_id();
+alter table suivi        add column if not exists transaction_ecriture xid8 not null default pg_current_xact_id();
+
+create index if not exists equipements_transaction_idx  on equipements (transaction_ecriture);
+create index if not exists observations_transaction_idx on observations (transaction_ecriture);
+create index if not exists suivi_transaction_idx        on suivi (transaction_ecriture);
+
+create table if not exists suppressions (
+    version   bigint primary key default nextval('maintenance_version'),
+    table_nom text not null,
+    cle       text not null
+);
+
+alter table suppressions add column if not exists transaction_ecriture xid8 not null default pg_current_xact_id();
+
+create index if not exists suppressions_table_version_idx
+    on suppressions (table_nom, version);
+create index if not exists suppressions_table_transaction_idx
+    on suppressions (table_nom, transaction_ecriture);
+
+-- Horizon de visibilité : toute transaction d'identifiant inférieur est
+-- terminée (validée ou annulée)
+create or replace function maintenance_horizon() returns bigint
+language sql stable as $$
+    select pg_snapshot_xmin(pg_current_snapshot())::text::bigint
+$$;
+
+-- Nouvelle version à chaque modification
+create or replace function maintenance_nouvelle_version() returns trigger
+language plpgsql as $$
+begin
+    new.version := nextval('maintenance_version');
+    new.transaction_ecriture := pg_current_xact_id();
+    return new;
+end $$;
+
+-- Pierre tombale à chaque suppression (suppressions en cascade comprises) ;
+-- argument : colonne clé de la table
+create or replace function maintenance_pierre_tombale() returns trigger
+language plpgsql as $$
+begin
+    insert into suppressions (table_nom, cle)
+    values (tg_table_name, to_jsonb(old) ->> tg_argv[0]);
+    return old;
+end $$;
+
+drop trigger if exists equipements_version on equipements;
+create trigger equipements_version before update on equipements
+    for each row execute function maintenance_nouvelle_version();
+drop trigger if exists observations_version on observations;
+create trigger observations_version before update on observations
+    for each row execute function maintenance_nouvelle_version();
+drop trigger if exists suivi_version on suivi;
+create trigger suivi_version before update on suivi
+    for each row execute function maintenance_nouvelle_version();
+
+drop trigger if exists equipements_suppression on equipements;
+create trigger equipements_suppression after delete on equipements
+    for each row execute function maintenance_pierre_tombale('id_equipement');
+drop trigger if exists observations_suppression on observations;
+create trigger observations_suppression after delete on observations
+    for each row execute function maintenance_pierre_tombale('id');
+drop trigger if exists suivi_suppression on suivi;
+create trigger suivi_suppression after delete on suivi
+    for each row execute function maintenance_pierre_tombale('id');
+
+-- =============================================================================
+-- Boîte d'envoi (MAINTENANCE_BOITE_ENVOI=1)
+-- =============================================================================
+-- Clé d'idempotence de l'envoi d'origine : un envoi rejoué après une réponse
+-- perdue est ignoré (upsert « on conflict do nothing »). Les saisies directes
+-- et les imports la laissent nulle.
+
+alter table observations add column if not exists cle_idempotence text unique;
+alter table suivi        add column if not exists cle_idempotence text unique;
+
+-- =============================================================================
+-- Corrections d'observations (contrôle de version optimiste)
+-- =============================================================================
+-- Chaque élément porte la ligne telle que lue (« avant ») et ses nouvelles
+-- valeurs (« apres ») ; la ligne est retrouvée par son contenu lu. Si l'une
+-- d'elles a changé ou disparu entre-temps, l'exception annule toute la
+-- transaction : aucune correction n'est enregistrée. Des lignes identiques
+-- sont corrigées chacune une fois : une ligne déjà corrigée dans le lot
+-- n'est plus candidate, et s'il ne reste plus de ligne, c'est un conflit.
+
+create or replace function maintenance_modifier_observations(modifications jsonb)
+returns integer
+language plpgsql as $$
+declare
+    modification jsonb;
+    avant        jsonb;
+    apres        jsonb;
+    ligne        bigint;
+    corrigees    bigint[] := '{}';
+    conflits     integer := 0;
+begin
+    for modification in select * from jsonb_array_elements(modifications) loop
+        avant := modification -> 'avant';
+        apres := modification -> 'apres';
+
+        select id into ligne
+        from observations
+        where id_equipement = avant ->> 'id_equipement'
+          and date = (avant ->> 'date')::date
+          and observation    is not distinct from avant ->> 'observation'
+          and recommandation is not distinct from avant ->> 'recommandation'
+          and travaux        is not distinct from avant ->> 'travaux'
+          and analyste       is not distinct from avant ->> 'analyste'
+          and importance     is not distinct from avant ->> 'importance'
+          and id <> all(corrigees)
+        order by id
+        limit 1
+        for update;
+
+        if ligne is null then
+            conflits := conflits + 1;
+            continue;
+        end if;
+
+        update observations set
+            observation    = apres ->> 'observation',
+            recommandation = apres ->> 'recommandation',
+            travaux        = apres ->> 'travaux',
+            analyste       = apres ->> 'analyste',
+            importance     = apres ->> 'importance'
+        where id = ligne;
+        corrigees := corrigees || ligne;
+    end loop;
+
+    if conflits > 0 then
+        raise exception 'maintenance_conflit: % observation(s) modifiée(s) entre-temps', conflits
+            using errcode = 'P0001';
+    end if;
+
+    return jsonb_array_length(modifications);
+end $$;
@@ -0,0 +1,30 @@
+"""
+Sélection du stockage : fichiers locaux (data_manager), partitions ou Supabase
+
+``MAINTENANCE_STOCKAGE=supabase`` bascule toute l'application sur
+``data_manager_supabase``, qui expose la même API que ``data_manager``.
+Avec ``MAINTENANCE_REPLIQUE=1`` en plus, les lectures passent par une
+réplique locale synchronisée (``replique``).
+
+``MAINTENANCE_STOCKAGE=partitions`` répartit observations et mesures en
+fichiers par département et par année (``data_manager_partitions``).
+"""
+
+import os
+
+STOCKAGE_FICHIERS = "fichiers"
+STOCKAGE_SUPABASE = "supabase"
+STOCKAGE_PARTITIONS = "partitions"
+
+STOCKAGE = os.environ.get("MAINTENANCE_STOCKAGE", STOCKAGE_FICHIERS)
+REPLIQUE = STOCKAGE == STOCKAGE_SUPABASE and os.environ.get("MAINTENANCE_REPLIQUE") == "1"
+PARTITIONNE = STOCKAGE == STOCKAGE_PARTITIONS
+
+if REPLIQUE:
+    from data import replique as data_manager
+elif STOCKAGE == STOCKAGE_SUPABASE:
+    from data import data_manager_supabase as data_manager
+elif PARTITIONNE:
+    from data import data_manager_partitions as data_manager
+else:
+    from data import data_manager
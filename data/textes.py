@@ -0,0 +1,223 @@
+"""
+Textes des observations stockés hors de l'instantané
+
+``observation``, ``recommandation`` et ``travaux`` (texte libre, parfois
+plusieurs Ko) sont rangés dans une base SQLite locale, indexée par un
+identifiant de ligne (hash du contenu). L'instantané partagé des
+observations ne garde que les colonnes compactes (équipement, date,
+analyste, importance), l'identifiant ``id_texte`` et la clé de doublon
+``cle`` : listes, filtres, comptages et plages de dates ne touchent jamais
+le texte, qui n'est relu que pour les lignes affichées ou exportées
+(``completer``).
+"""
+
+import os
+import sqlite3
+import threading
+import numpy as np
+import pandas as pd
+from outils import metriques
+from data.cles import hash_observations
+
+ACTIVE = os.environ.get("MAINTENANCE_TEXTES", "1") == "1"
+
+FICHIER_TEXTES = os.environ.get(
+    "MAINTENANCE_TEXTES_FICHIER",
+    os.path.join(os.path.dirname(__file__), "textes.sqlite")
+)
+
+COLONNES_TEXTE = ['observation', 'recommandation', 'travaux']
+
+TAILLE_REQUETE = 500  # identifiants par requête IN (...)
+DELAI_VERROU = 30  # secondes d'attente si un autre processus écrit
+
+_verrou = threading.Lock()
+_connexion = None
+_connus = None
+_version = None  # PRAGMA data_version lors de la lecture de _connus
+
+
+def _connecter():
+    """Connexion SQLite du processus (à utiliser sous _verrou)."""
+    global _connexion
+
+    if _connexion is None:
+        _connexion = sqlite3.connect(
+            FICHIER_TEXTES, timeout=DELAI_VERROU,
+            isolation_level=None, check_same_thread=False
+        )
+        _connexion.execute("PRAGMA journal_mode=WAL")
+        _connexion.execute(
+            "CREATE TABLE IF NOT EXISTS textes ("
+            "id_texte INTEGER PRIMARY KEY, observation TEXT, recommandation TEXT, travaux TEXT)"
+        )
+
+    return _connexion
+
+
+def identifiants(df):
+    """Identifiant de ligne vectorisé : hash du contenu (équipement, date, textes).
+
+    Deux lignes identiques partagent le même texte stocké.
+
+    Returns:
+        Tableau numpy int64 (entier SQLite), un identifiant par ligne.
+    """
+    contenu = pd.DataFrame({
+        'id_equipement': df['id_equipement'].astype(str),
+        'date': pd.to_datetime(df['date'], errors='coerce').dt.strftime('%Y-%m-%d'),
+        **{colonne: df[colonne].fillna('').astype(str) for colonne in COLONNES_TEXTE},
+    })
+    return pd.util.hash_pandas_object(contenu, index=False).to_numpy().view(np.int64)
+
+
+def _identifiants_stockes(connexion):
+    """Identifiants présents dans le stockage (à appeler sous _verrou).
+
+    Relus si un autre processus a écrit ou supprimé des textes depuis la
+    dernière lecture.
+    """
+    global _connus, _version
+
+    version = connexion.execute("PRAGMA data_version").fetchone()[0]
+    if _connus is None or version != _version:
+        _connus = {ligne[0] for ligne in connexion.execute("SELECT id_texte FROM textes")}
+        _version = version
+    return _connus
+
+
+def _enregistrer(ids, textes):
+    """Ajoute au stockage les textes absents (à appeler sous _verrou)."""
+    connexion = _connecter()
+    connus = _identifiants_stockes(connexion)
+
+    nouveaux = np.fromiter((int(i) not in connus for i in ids), dtype=bool, count=len(ids))
+    if not nouveaux.any():
+        return
+
+    lignes = textes[nouveaux].astype(object).where(textes[nouveaux].notna(), None)
+    valeurs = list(zip(ids[nouveaux].tolist(), *(lignes[c].tolist() for c in COLONNES_TEXTE)))
+
+    connexion.execute("BEGIN IMMEDIATE")
+    try:
+        connexion.executemany("INSERT OR IGNORE INTO textes VALUES (?, ?, ?, ?)", valeurs)
+        connexion.execute("COMMIT")
+    except sqlite3.Error:
+        connexion.execute("ROLLBACK")
+        raise
+
+    connus.update(ids[nouveaux].tolist())
+    metriques.incrementer('textes_enregistres', len(valeurs))
+
+
+def separer(df):
+    """Range les textes d'un chargement d'observations et retourne la table compacte.
+
+    Args:
+        df: Observations chargées (colonnes complètes).
+
+    Returns:
+        DataFrame sans les colonnes de texte, avec ``id_texte`` et ``cle``
+        (clé de doublon, voir ``doublons``). Inchangé si le stockage des
+        textes est désactivé.
+    """
+    if not ACTIVE or not set(COLONNES_TEXTE) <= set(df.columns):
+        return df
+
+    ids = identifiants(df)
+    with _verrou, metriques.chronometre("textes_separer"):
+        _enregistrer(ids, df[COLONNES_TEXTE])
+
+    return df.drop(columns=COLONNES_TEXTE).assign(
+        id_texte=ids,
+        cle=hash_observations(df)
+    )
+
+
+def oublier(ids, references=()):
+    """Supprime les textes de lignes corrigées ou supprimées.
+
+    Args:
+        ids: Identifiants ``id_texte`` des lignes retirées du stockage.
+        references: Identifiants encore utilisés (lignes identiques
+            restantes, lignes corrigées) : leurs textes sont conservés.
+    """
+    if not ACTIVE:
+        return
+
+    orphelins = list({int(i) for i in ids} - {int(i) for i in references})
+    if not orphelins:
+        return
+
+    with _verrou:
+        connexion = _connecter()
+        connexion.execute("BEGIN IMMEDIATE")
+        try:
+            for debut in range(0, len(orphelins), TAILLE_REQUETE):
+                lot = orphelins[debut:debut + TAILLE_REQUETE]
+                connexion.execute(
+                    f"DELETE FROM textes WHERE id_texte IN ({','.join('?' * len(lot))})", lot
+                )
+            connexion.execute("COMMIT")
+        except sqlite3.Error:
+            connexion.execute("ROLLBACK")
+            raise
+
+        if _connus is not None:
+            _connus.difference_update(orphelins)
+
+    metriques.incrementer('textes_supprimes', len(orphelins))
+
+
+def lire(ids):
+    """Textes de lignes par identifiant.
+
+    Args:
+        ids: Identifiants ``id_texte``.
+
+    Returns:
+        DataFrame id_texte, observation, recommandation, travaux.
+    """
+    ids = list(dict.fromkeys(int(i) for i in ids))
+    lignes = []
+
+    with _verrou:
+        connexion = _connecter()
+        for debut in range(0, len(ids), TAILLE_REQUETE):
+            lot = ids[debut:debut + TAILLE_REQUETE]
+            lignes.extend(connexion.execute(
+                f"SELECT id_texte, observation, recommandation, travaux FROM textes "
+                f"WHERE id_texte IN ({','.join('?' * len(lot))})",
+                lot
+            ))
+
+    return pd.DataFrame(lignes, columns=['id_texte', *COLONNES_TEXTE])
+
+
+def completer(df):
+    """Réintègre les textes dans une sélection compacte d'observations.
+
+    Args:
+        df: Lignes de l'instantané (avec ``id_texte``), en général déjà
+            filtrées pour l'affichage ou l'export.
+
+    Returns:
+        DataFrame aux colonnes d'origine (textes à leur place), même ordre
+        de lignes. Inchangé s'il contient déjà les textes.
+    """
+    if 'id_texte' not in df.columns:
+        return df
+
+    with metriques.chronometre("textes_completer"):
+        textes = lire(df['id_texte'])
+        # Index int64 explicite : les identifiants sont des hash signés quelconques
+        index = pd.Index(textes['id_texte'].to_numpy(dtype=np.int64), dtype='int64')
+        ids = df['id_texte'].to_numpy(dtype=np.int64)
+        complet = df.assign(**{
+            colonne: pd.Series(textes[colonne].to_numpy(), index=index).reindex(ids).to_numpy()
+            for colonne in COLONNES_TEXTE
+        })
+
+    colonnes = [c for c in ['id_equipement', 'date', *COLONNES_TEXTE] if c in complet.columns]
+    autres = [c for c in complet.columns if c not in colonnes and c not in ('id_texte', 'cle')]
+    return complet[colonnes + autres]
@@ -0,0 +1,175 @@
+"""
+Signal de version partagé entre processus (plusieurs workers Streamlit, service d'ingestion)
+
+Chaque écriture incrémente le numéro de version de la table touchée dans une
+petite base SQLite commune. Chaque processus surveille cette base par un fil
+d'arrière-plan : ``PRAGMA data_version`` (lecture en mémoire, sans relire de
+fichier de données) indique si un autre processus a écrit depuis la dernière
+vérification ; seules les tables dont la version a changé sont invalidées.
+Une écriture d'un worker est donc visible des autres en au plus
+``INTERVALLE_VERIFICATION`` secondes (plus le temps de rechargement).
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from outils import metriques
+
+ACTIVE = os.environ.get("MAINTENANCE_VERSIONS", "1") == "1"
+
+FICHIER_VERSIONS = os.environ.get(
+    "MAINTENANCE_VERSIONS_FICHIER",
+    os.path.join(os.path.dirname(__file__), "versions.sqlite")
+)
+INTERVALLE_VERIFICATION = float(os.environ.get("MAINTENANCE_VERSIONS_INTERVALLE", "1"))
+
+DELAI_VERROU = 5  # secondes d'attente si un autre processus écrit
+
+_verrou = threading.Lock()
+_connexion = None
+_vues = {}
+_fil = None
+
+
+def _connecter():
+    """Connexion SQLite du processus (à utiliser sous _verrou)."""
+    global _connexion
+
+    if _connexion is None:
+        _connexion = sqlite3.connect(
+            FICHIER_VERSIONS, timeout=DELAI_VERROU,
+            isolation_level=None, check_same_thread=False
+        )
+        _connexion.execute("PRAGMA journal_mode=WAL")
+        _connexion.execute(
+            "CREATE TABLE IF NOT EXISTS versions ("
+            "table_nom TEXT PRIMARY KEY, version INTEGER NOT NULL, publie_le REAL NOT NULL)"
+        )
+
+    return _connexion
+
+
+def _lire_versions(connexion):
+    """{table: (version, horodatage de publication)}"""
+    return {
+        table: (version, publie_le)
+        for table, version, publie_le in connexion.execute(
+            "SELECT table_nom, version, publie_le FROM versions"
+        )
+    }
+
+
+def publier(tables):
+    """Signale aux autres processus qu'une ou plusieurs tables ont été modifiées.
+
+    Un échec (disque, verrou) n'interrompt jamais l'écriture qui l'a
+    déclenché : les autres processus verront la modification au prochain
+    signal réussi.
+
+    Args:
+        tables: Noms des tables modifiées.
+    """
+    if not ACTIVE:
+        return
+
+    with _verrou:
+        try:
+            connexion = _connecter()
+            connexion.execute("BEGIN IMMEDIATE")
+            try:
+                for table in tables:
+                    ligne = connexion.execute(
+                        "SELECT version FROM versions WHERE table_nom = ?", (table,)
+                    ).fetchone()
+                    ancienne = ligne[0] if ligne else 0
+                    connexion.execute(
+                        "INSERT INTO versions VALUES (?, ?, ?) ON CONFLICT (table_nom) "
+                        "DO UPDATE SET version = excluded.version, publie_le = excluded.publie_le",
+                        (table, ancienne + 1, time.time())
+                    )
+                    # Version intermédiaire d'un autre processus non encore vue :
+                    # on la laisse détecter par la surveillance
+                    if _vues.get(table, 0) == ancienne:
+                        _vues[table] = ancienne + 1
+                connexion.execute("COMMIT")
+            except sqlite3.Error:
+                connexion.execute("ROLLBACK")
+                raise
+        except sqlite3.Error:
+            metriques.incrementer('versions_echecs')
+            return
+
+    metriques.incrementer('versions_publiees', len(tables))
+
+
+def verifier():
+    """Tables modifiées par un autre processus depuis la dernière vérification.
+
+    Returns:
+        Liste des tables dont la version partagée a changé.
+    """
+    with _verrou:
+        connexion = _connecter()
+        courante = connexion.execute("PRAGMA data_version").fetchone()[0]
+        if courante == _vues.get(None):
+            return []
+        _vues[None] = courante
+
+        versions = _lire_versions(connexion)
+        changees = [t for t, (version, _) in versions.items() if _vues.get(t, 0) != version]
+        for table in changees:
+            _vues[table] = versions[table][0]
+
+    maintenant = time.time()
+    for table in changees:
+        metriques.enregistrer_duree("propagation_versions", max(maintenant - versions[table][1], 0))
+    return changees
+
+
+def _boucle_surveillance(sur_changement):
+    """Fil d'arrière-plan : invalide les tables modifiées par les autres processus."""
+    while True:
+        time.sleep(INTERVALLE_VERIFICATION)
+        try:
+            changees = verifier()
+        except sqlite3.Error:
+            metriques.incrementer('versions_echecs')
+            continue
+
+        for table in changees:
+            metriques.incrementer('versions_changements', table=table)
+            sur_changement(table)
+
+
+def demarrer_surveillance(sur_changement):
+    """Démarre (une seule fois par processus) la surveillance des versions.
+
+    Les versions présentes au démarrage sont considérées comme vues : les
+    tables ne sont pas encore chargées, rien n'est à invalider.
+
+    Args:
+        sur_changement: Fonction appelée avec le nom de chaque table modifiée
+            par un autre processus (invalidation des instantanés).
+    """
+    global _fil
+
+    if not ACTIVE:
+        return
+
+    with _verrou:
+        if _fil is not None:
+            return
+
+        connexion = _connecter()
+        _vues[None] = connexion.execute("PRAGMA data_version").fetchone()[0]
+        for table, (version, _) in _lire_versions(connexion).items():
+            _vues.setdefault(table, version)
+
+        _fil = threading.Thread(
+            target=_boucle_surveillance,
+            args=(sur_changement,),
+            name="surveillance-versions",
+            daemon=True
+        )
+        _fil.start()
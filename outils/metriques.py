@@ -0,0 +1,243 @@
+"""
+Instrumentation des chemins critiques : durées, compteurs et export Prometheus
+
+Les mesures sont agrégées en mémoire dans le processus (fenêtre glissante
+pour les percentiles) et exposées au format texte Prometheus, dans un fichier
+(collecteur « textfile ») et/ou sur un petit serveur HTTP local.
+"""
+
+import os
+import time
+import threading
+import functools
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+
+# Nombre de mesures conservées par opération pour le calcul des percentiles
+TAILLE_FENETRE = 2000
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+# Exposition (désactivée si la variable n'est pas définie)
+FICHIER_PROMETHEUS = os.environ.get("MAINTENANCE_METRIQUES_FICHIER")
+PORT_PROMETHEUS = os.environ.get("MAINTENANCE_METRIQUES_PORT")
+
+_verrou = threading.Lock()
+_durees = defaultdict(lambda: deque(maxlen=TAILLE_FENETRE))
+_cumuls = defaultdict(lambda: [0, 0.0])  # opération -> [nombre d'appels, durée totale]
+_compteurs = defaultdict(float)  # (nom, étiquettes) -> valeur
+_serveur = None
+
+
+# =============================================================================
+# COLLECTE
+# =============================================================================
+
+def enregistrer_duree(operation, secondes):
+    """Enregistre la durée d'une exécution d'une opération."""
+    with _verrou:
+        _durees[operation].append(secondes)
+        cumul = _cumuls[operation]
+        cumul[0] += 1
+        cumul[1] += secondes
+
+
+@contextmanager
+def chronometre(operation):
+    """Mesure la durée du bloc ``with`` (enregistrée même en cas d'exception)."""
+    debut = time.perf_counter()
+    try:
+        yield
+    finally:
+        enregistrer_duree(operation, time.perf_counter() - debut)
+
+
+def instrumenter(operation=None):
+    """Décorateur mesurant la durée de chaque appel d'une fonction.
+
+    Args:
+        operation: Nom de l'opération (par défaut le nom de la fonction).
+    """
+    def decorateur(fonction):
+        nom = operation or fonction.__name__
+
+        @functools.wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            with chronometre(nom):
+                return fonction(*args, **kwargs)
+
+        return enveloppe
+
+    return decorateur
+
+
+def incrementer(nom, valeur=1, **etiquettes):
+    """Incrémente un compteur (ex. ``incrementer('cache', resultat='hit')``)."""
+    cle = (nom, tuple(sorted(etiquettes.items())))
+    with _verrou:
+        _compteurs[cle] += valeur
+
+
+def reinitialiser():
+    """Remet toutes les mesures à zéro."""
+    with _verrou:
+        _durees.clear()
+        _cumuls.clear()
+        _compteurs.clear()
+
+
+# =============================================================================
+# AGRÉGATION
+# =============================================================================
+
+def resume_durees():
+    """Statistiques par opération : appels, total et percentiles (ms).
+
+    Returns:
+        DataFrame trié par durée totale décroissante.
+    """
+    with _verrou:
+        instantane = {op: (np.array(d), *_cumuls[op]) for op, d in _durees.items()}
+
+    lignes = []
+    for operation, (echantillon, appels, total) in instantane.items():
+        p50, p90, p99 = np.quantile(echantillon, QUANTILES) * 1000
+        lignes.append({
+            'operation': operation,
+            'appels': appels,
+            'total_ms': total * 1000,
+            'p50_ms': p50,
+            'p90_ms': p90,
+            'p99_ms': p99,
+            'max_ms': echantillon.max() * 1000,
+        })
+
+    colonnes = ['operation', 'appels', 'total_ms', 'p50_ms', 'p90_ms', 'p99_ms', 'max_ms']
+    return pd.DataFrame(lignes, columns=colonnes).sort_values('total_ms', ascending=False)
+
+
+def resume_compteurs():
+    """Valeur de chaque compteur, avec ses étiquettes en texte."""
+    with _verrou:
+        compteurs = dict(_compteurs)
+
+    lignes = [
+        {
+            'compteur': nom,
+            'etiquettes': ', '.join(f"{k}={v}" for k, v in etiquettes),
+            'valeur': valeur,
+        }
+        for (nom, etiquettes), valeur in sorted(compteurs.items())
+    ]
+    return pd.DataFrame(lignes, columns=['compteur', 'etiquettes', 'valeur'])
+
+
+# =============================================================================
+# EXPOSITION PROMETHEUS
+# =============================================================================
+
+def _echapper(valeur):
+    """Échappe une valeur d'étiquette Prometheus."""
+    return str(valeur).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _etiquettes(paires):
+    """Formate des étiquettes Prometheus : {cle="valeur",...}."""
+    if not paires:
+        return ""
+    return "{" + ','.join(f'{k}="{_echapper(v)}"' for k, v in paires) + "}"
+
+
+def format_prometheus():
+    """Retourne toutes les mesures au format texte d'exposition Prometheus."""
+    with _verrou:
+        durees = {op: np.array(d) for op, d in _durees.items()}
+        cumuls = {op: tuple(c) for op, c in _cumuls.items()}
+        compteurs = dict(_compteurs)
+
+    lignes = [
+        "# HELP maintenance_duree_secondes Durée des opérations instrumentées",
+        "# TYPE maintenance_duree_secondes summary",
+    ]
+    for operation in sorted(durees):
+        valeurs = np.quantile(durees[operation], QUANTILES)
+        for quantile, valeur in zip(QUANTILES, valeurs):
+            lignes.append(
+                f"maintenance_duree_secondes"
+                f"{_etiquettes([('operation', operation), ('quantile', quantile)])} {valeur:.6f}"
+            )
+        appels, total = cumuls[operation]
+        etiquette = _etiquettes([('operation', operation)])
+        lignes.append(f"maintenance_duree_secondes_sum{etiquette} {total:.6f}")
+        lignes.append(f"maintenance_duree_secondes_count{etiquette} {appels}")
+
+    for nom in sorted({nom for nom, _ in compteurs}):
+        lignes.append(f"# TYPE maintenance_{nom}_total counter")
+        for (nom_compteur, etiquettes), valeur in sorted(compteurs.items()):
+            if nom_compteur == nom:
+                lignes.append(f"maintenance_{nom}_total{_etiquettes(etiquettes)} {valeur:g}")
+
+    return "\n".join(lignes) + "\n"
+
+
+def ecrire_prometheus(chemin=None):
+    """Écrit les mesures dans un fichier (remplacement atomique).
+
+    Args:
+        chemin: Fichier cible (par défaut ``MAINTENANCE_METRIQUES_FICHIER``).
+    """
+    chemin = chemin or FICHIER_PROMETHEUS
+    if not chemin:
+        return
+
+    temporaire = f"{chemin}.{os.getpid()}.tmp"
+    with open(temporaire, 'w', encoding='utf-8') as f:
+        f.write(format_prometheus())
+    os.replace(temporaire, chemin)
+
+
+class _GestionnaireMetriques(BaseHTTPRequestHandler):
+    """Répond à GET /metrics avec le texte d'exposition."""
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+
+        contenu = format_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(contenu)))
+        self.end_headers()
+        self.wfile.write(contenu)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def demarrer_serveur(port=None, hote='127.0.0.1'):
+    """Démarre (une seule fois par processus) le serveur HTTP /metrics.
+
+    Args:
+        port: Port d'écoute (par défaut ``MAINTENANCE_METRIQUES_PORT``).
+        hote: Adresse d'écoute (locale par défaut).
+    """
+    global _serveur
+
+    port = port or PORT_PROMETHEUS
+    if not port:
+        return
+
+    with _verrou:
+        if _serveur is not None:
+            return
+        try:
+            _serveur = ThreadingHTTPServer((hote, int(port)), _GestionnaireMetriques)
+        except OSError:
+            # Port déjà pris (ex. module rechargé par Streamlit) : exposition inchangée
+            return
+
+    threading.Thread(target=_serveur.serve_forever, daemon=True).start()
@@ -0,0 +1,167 @@
+"""
+Profilage à la demande d'un rerun
+
+Activé par ``MAINTENANCE_PROFIL=1`` ou ``?profil=1`` dans l'URL. Chaque rerun
+profilé produit un dossier contenant :
+
+- ``profil.prof`` : profil déterministe cProfile (pstats, snakeviz, flameprof) ;
+- ``piles.folded`` : piles échantillonnées au format « folded » (flamegraph.pl,
+  speedscope) ;
+- ``contexte.json`` : date, paramètres d'URL et état des widgets du rerun.
+"""
+
+import os
+import sys
+import json
+import time
+import pstats
+import cProfile
+import threading
+from collections import Counter
+from datetime import datetime
+import pandas as pd
+
+DOSSIER_PROFILS = os.environ.get("MAINTENANCE_PROFIL_DOSSIER", "profils")
+
+# Intervalle d'échantillonnage des piles (secondes)
+INTERVALLE_ECHANTILLON = 0.005
+
+# Longueur maximale d'une valeur de widget dans le contexte enregistré
+LONGUEUR_MAX_VALEUR = 200
+
+
+def profilage_actif(parametres_url=None):
+    """Indique si le profilage est demandé (variable d'environnement ou URL)."""
+    if os.environ.get("MAINTENANCE_PROFIL") == "1":
+        return True
+    return bool(parametres_url) and parametres_url.get("profil") == "1"
+
+
+def _libelle(frame):
+    """Libellé d'un cadre de pile : fonction (fichier:ligne)."""
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _echantillonner(id_thread, arret, piles):
+    """Relève périodiquement la pile du thread profilé (format folded)."""
+    while not arret.wait(INTERVALLE_ECHANTILLON):
+        frame = sys._current_frames().get(id_thread)
+        pile = []
+        while frame is not None:
+            pile.append(_libelle(frame))
+            frame = frame.f_back
+        if pile:
+            piles[';'.join(reversed(pile))] += 1
+
+
+def _contexte_serialisable(etat):
+    """Convertit l'état des widgets en valeurs JSON (tronquées)."""
+    return {
+        str(cle): str(valeur)[:LONGUEUR_MAX_VALEUR]
+        for cle, valeur in etat.items()
+    }
+
+
+def profiler_rerun(fonction, etat_session=None, parametres_url=None):
+    """Exécute ``fonction`` sous profilage et enregistre le résultat.
+
+    Le profil est écrit même si le rerun est interrompu (``st.rerun``,
+    exception), puis l'interruption est propagée.
+
+    Args:
+        fonction: Fonction à profiler (ex. ``app.main``).
+        etat_session: État des widgets ayant déclenché le rerun.
+        parametres_url: Paramètres d'URL du rerun.
+
+    Returns:
+        Chemin du dossier contenant le profil.
+    """
+    horodatage = datetime.now()
+    dossier = os.path.join(
+        DOSSIER_PROFILS,
+        f"{horodatage.strftime('%Y%m%d_%H%M%S_%f')}_{os.getpid()}"
+    )
+    os.makedirs(dossier, exist_ok=True)
+
+    # Contexte enregistré avant l'exécution (état qui a déclenché le rerun)
+    contexte = {
+        'date': horodatage.isoformat(),
+        'parametres_url': _contexte_serialisable(parametres_url or {}),
+        'etat_widgets': _contexte_serialisable(etat_session or {}),
+    }
+
+    piles = Counter()
+    arret = threading.Event()
+    echantillonneur = threading.Thread(
+        target=_echantillonner,
+        args=(threading.get_ident(), arret, piles),
+        daemon=True
+    )
+
+    profil = cProfile.Profile()
+    debut = time.perf_counter()
+    echantillonneur.start()
+    profil.enable()
+
+    try:
+        fonction()
+    finally:
+        profil.disable()
+        arret.set()
+        echantillonneur.join()
+
+        contexte['duree_s'] = round(time.perf_counter() - debut, 4)
+        profil.dump_stats(os.path.join(dossier, "profil.prof"))
+
+        with open(os.path.join(dossier, "piles.folded"), 'w', encoding='utf-8') as f:
+            for pile, nombre in piles.most_common():
+                f.write(f"{pile} {nombre}\n")
+
+        with open(os.path.join(dossier, "contexte.json"), 'w', encoding='utf-8') as f:
+            json.dump(contexte, f, ensure_ascii=False, indent=2)
+
+    return dossier
+
+
+def lister_profils():
+    """Dossiers de profils enregistrés, du plus récent au plus ancien."""
+    if not os.path.isdir(DOSSIER_PROFILS):
+        return []
+    return sorted(
+        (os.path.join(DOSSIER_PROFILS, nom) for nom in os.listdir(DOSSIER_PROFILS)),
+        reverse=True
+    )
+
+
+def fonctions_chaudes(dossier, nombre=20):
+    """Fonctions les plus coûteuses d'un profil (temps propre décroissant).
+
+    Args:
+        dossier: Dossier d'un profil (``profiler_rerun``).
+        nombre: Nombre de fonctions retournées.
+
+    Returns:
+        DataFrame fonction, appels, temps propre et temps cumulé (ms).
+    """
+    stats = pstats.Stats(os.path.join(dossier, "profil.prof"))
+
+    lignes = [
+        {
+            'fonction': f"{nom} ({os.path.basename(fichier)}:{ligne})",
+            'appels': nb_appels,
+            'temps_propre_ms': temps_propre * 1000,
+            'temps_cumule_ms': temps_cumule * 1000,
+        }
+        for (fichier, ligne, nom), (_, nb_appels, temps_propre, temps_cumule, _)
+        in stats.stats.items()
+    ]
+
+    df = pd.DataFrame(lignes, columns=['fonction', 'appels', 'temps_propre_ms', 'temps_cumule_ms'])
+    return df.sort_values('temps_propre_ms', ascending=False).head(nombre)
+
+
+def lire_contexte(dossier):
+    """Contexte (date, durée, état des widgets) d'un profil."""
+    with open(os.path.join(dossier, "contexte.json"), encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,341 @@
+"""
+Tests du stockage Supabase (data/data_manager_supabase.py) contre un PostgREST simulé
+
+Le serveur simulé répond aux requêtes HTTP du client postgrest (transport
+httpx) à partir d'une base SQLite qui reproduit schema_supabase.sql :
+versions tirées d'une séquence commune, pierres tombales à chaque
+suppression (cascades comprises), clé d'idempotence unique et fonction de
+correction avec contrôle de version optimiste.
+"""
+
+import csv
+import json
+import sqlite3
+import httpx
+import pytest
+from postgrest import SyncPostgrestClient
+from data import data_manager_supabase as distant
+from data import replique
+
+TABLES = {
+    'equipements': "id_equipement TEXT PRIMARY KEY, departement TEXT NOT NULL",
+    'observations': (
+        "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "id_equipement TEXT NOT NULL REFERENCES equipements (id_equipement) ON DELETE CASCADE, "
+        "date TEXT NOT NULL, observation TEXT NOT NULL, recommandation TEXT, travaux TEXT, "
+        "analyste TEXT, importance TEXT, cle_idempotence TEXT UNIQUE"
+    ),
+    'suivi': (
+        "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "id_equipement TEXT NOT NULL REFERENCES equipements (id_equipement) ON DELETE CASCADE, "
+        "point_mesure TEXT NOT NULL, date TEXT NOT NULL, vitesse_rpm REAL, twf_rms_g REAL, "
+        "crest_factor REAL, twf_peak_to_peak_g REAL, cle_idempotence TEXT UNIQUE"
+    ),
+}
+CLES = {'equipements': 'id_equipement', 'observations': 'id', 'suivi': 'id'}
+
+OPERATEURS = {'eq': '=', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}
+PARAMETRES_RESERVES = {'select', 'order', 'limit', 'columns', 'on_conflict'}
+
+
+class PostgrestSimule:
+    """Sous-ensemble de PostgREST utilisé par data_manager_supabase, sur SQLite."""
+
+    def __init__(self):
+        self.base = sqlite3.connect(":memory:", isolation_level=None)
+        self.base.execute("PRAGMA foreign_keys = ON")
+        self.base.execute("CREATE TABLE sequence (valeur INTEGER)")
+        self.base.execute("INSERT INTO sequence VALUES (0)")
+        self.base.execute("CREATE TABLE transaction_courante (id INTEGER)")
+        self.base.execute("INSERT INTO transaction_courante VALUES (0)")
+        self.base.execute(
+            "CREATE TABLE suppressions (version INTEGER PRIMARY KEY, table_nom TEXT, cle TEXT, "
+            "transaction_ecriture INTEGER)"
+        )
+
+        version = "UPDATE sequence SET valeur = valeur + 1"
+        courante = "(SELECT valeur FROM sequence), (SELECT id FROM transaction_courante)"
+        for table, colonnes in TABLES.items():
+            cle = CLES[table]
+            self.base.execute(
+                f"CREATE TABLE {table} ({colonnes}, version INTEGER, transaction_ecriture INTEGER)"
+            )
+            # Déclencheurs de schema_supabase.sql : version à chaque écriture, pierre tombale
+            for evenement in ("INSERT", "UPDATE"):
+                self.base.execute(
+                    f"CREATE TRIGGER {table}_{evenement.lower()} AFTER {evenement} ON {table} "
+                    f"BEGIN {version}; UPDATE {table} SET (version, transaction_ecriture) = "
+                    f"({courante}) WHERE rowid = new.rowid; END"
+                )
+            self.base.execute(
+                f"CREATE TRIGGER {table}_suppression AFTER DELETE ON {table} BEGIN "
+                f"{version}; INSERT INTO suppressions SELECT (SELECT valeur FROM sequence), "
+                f"'{table}', CAST(old.{cle} AS TEXT), (SELECT id FROM transaction_courante); END"
+            )
+
+        self.panne = False
+        self.requetes = []
+
+    # Transport httpx
+
+    def __call__(self, requete):
+        if self.panne:
+            raise httpx.ConnectError("Connexion refusée", request=requete)
+        self.requetes.append(requete)
+
+        chemin = requete.url.path.removeprefix("/rest/v1/")
+        corps = json.loads(requete.content) if requete.content else None
+
+        self.base.execute("UPDATE transaction_courante SET id = id + 1")
+        self.base.execute("BEGIN")
+        try:
+            if chemin.startswith("rpc/"):
+                reponse = getattr(self, "_" + chemin.removeprefix("rpc/"))(corps)
+            elif requete.method == "GET":
+                reponse = self._lire(chemin, requete)
+            elif requete.method == "POST":
+                reponse = self._inserer(chemin, requete, corps)
+            else:
+                reponse = self._supprimer(chemin, requete)
+        except sqlite3.IntegrityError as e:
+            self.base.execute("ROLLBACK")
+            code = "23505" if "UNIQUE" in str(e) else "23503"
+            return httpx.Response(409, json=_erreur(code, e))
+        except ErreurSql as e:
+            self.base.execute("ROLLBACK")
+            return httpx.Response(400, json=_erreur(e.code, e))
+
+        self.base.execute("COMMIT")
+        return reponse
+
+    def _filtres(self, requete):
+        clauses, valeurs = [], []
+        for colonne, valeur in requete.url.params.multi_items():
+            if colonne in PARAMETRES_RESERVES:
+                continue
+            colonne = colonne.replace("equipements.", "e.")
+            operateur, _, valeur = valeur.partition(".")
+            if operateur == "in":
+                liste = next(csv.reader([valeur[1:-1]]))
+                clauses.append(f"{colonne} IN ({', '.join('?' * len(liste))})")
+                valeurs.extend(liste)
+            else:
+                clauses.append(f"{colonne} {OPERATEURS[operateur]} ?")
+                valeurs.append(valeur)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), valeurs
+
+    def _lire(self, table, requete):
+        parametres = requete.url.params
+        selection = [c for c in parametres['select'].split(",") if "(" not in c]
+        jointure = ""
+        if "!inner" in parametres['select']:
+            jointure = " t JOIN equipements e USING (id_equipement)"
+        where, valeurs = self._filtres(requete)
+        colonne, _, sens = parametres.get('order', 'rowid.asc').partition(".")
+        limite = f" LIMIT {int(parametres['limit'])}" if 'limit' in parametres else ""
+
+        colonnes = ', '.join(f"t.{c}" if jointure else c for c in selection)
+        lignes = self.base.execute(
+            f"SELECT {colonnes} FROM {table}{jointure}{where} ORDER BY {colonne} {sens}{limite}",
+            valeurs
+        ).fetchall()
+        return httpx.Response(200, json=[dict(zip(selection, ligne)) for ligne in lignes])
+
+    def _inserer(self, table, requete, corps):
+        lignes = corps if isinstance(corps, list) else [corps]
+        preference = requete.headers.get('prefer', '')
+        conflit = requete.url.params.get('on_conflict')
+
+        for ligne in lignes:
+            colonnes = list(ligne)
+            sql = (f"INSERT INTO {table} ({', '.join(colonnes)}) "
+                   f"VALUES ({', '.join('?' * len(colonnes))})")
+            if "ignore-duplicates" in preference:
+                sql += f" ON CONFLICT ({conflit}) DO NOTHING"
+            elif "merge-duplicates" in preference:
+                sql += f" ON CONFLICT ({conflit}) DO UPDATE SET " + ', '.join(
+                    f"{c} = excluded.{c}" for c in colonnes if c != conflit
+                )
+            self.base.execute(sql, list(ligne.values()))
+        return httpx.Response(201)
+
+    def _supprimer(self, table, requete):
+        where, valeurs = self._filtres(requete)
+        nombre = self.base.execute(f"DELETE FROM {table}{where}", valeurs).rowcount
+        return httpx.Response(204, headers={'content-range': f"*/{nombre}"})
+
+    # Fonctions SQL de schema_supabase.sql
+
+    def _maintenance_horizon(self, corps):
+        # Aucune transaction ne reste ouverte : toutes les précédentes sont validées
+        transaction = self.base.execute("SELECT id FROM transaction_courante").fetchone()[0]
+        return httpx.Response(200, json=transaction)
+
+    def _maintenance_modifier_observations(self, corps):
+        colonnes = ['observation', 'recommandation', 'travaux', 'analyste', 'importance']
+        corrigees, conflits = [], 0
+
+        for modification in corps['modifications']:
+            avant, apres = modification['avant'], modification['apres']
+            ligne = self.base.execute(
+                "SELECT id FROM observations WHERE id_equipement = ? AND date = ? AND "
+                + " AND ".join(f"{c} IS ?" for c in colonnes)
+                + f" AND id NOT IN ({', '.join('?' * len(corrigees))}) ORDER BY id LIMIT 1",
+                [avant['id_equipement'], avant['date'], *(avant[c] for c in colonnes), *corrigees]
+            ).fetchone()
+            if ligne is None:
+                conflits += 1
+                continue
+            self.base.execute(
+                f"UPDATE observations SET {', '.join(f'{c} = ?' for c in colonnes)} WHERE id = ?",
+                [*(apres[c] for c in colonnes), ligne[0]]
+            )
+            corrigees.append(ligne[0])
+
+        if conflits:
+            raise ErreurSql(
+                "P0001", f"maintenance_conflit: {conflits} observation(s) modifiée(s) entre-temps"
+            )
+        return httpx.Response(200, json=len(corps['modifications']))
+
+
+def _erreur(code, exception):
+    """Corps JSON d'une erreur PostgREST."""
+    return {'code': code, 'message': str(exception), 'details': None, 'hint': None}
+
+
+class ErreurSql(Exception):
+    """Exception levée par une fonction SQL (code SQLSTATE)."""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+@pytest.fixture
+def serveur(monkeypatch):
+    """Client Supabase branché sur un PostgREST simulé vide."""
+    serveur = PostgrestSimule()
+    monkeypatch.setattr(distant, '_client', SyncPostgrestClient(
+        "http://postgrest.test/rest/v1",
+        http_client=httpx.Client(transport=httpx.MockTransport(serveur))
+    ))
+    yield serveur
+    serveur.base.close()
+
+
+def _observation(**valeurs):
+    return {
+        'id_equipement': "EQ-001", 'date': "2026-01-15", 'observation': "Balourd",
+        'recommandation': None, 'travaux': None, 'analyste': "A. Martin", 'importance': None,
+        **valeurs,
+    }
+
+
+def _remplir(serveur, observations):
+    assert distant.sauvegarder_equipement("EQ-001", "Fonderie")[0]
+    assert distant.sauvegarder_equipement("EQ-002", "Laminoir")[0]
+    for observation in observations:
+        assert distant.sauvegarder_observation(**observation)[0]
+
+
+def test_pagination_par_cle_avec_egalites(serveur):
+    """Des lignes identiques (même date, même contenu) sont lues une fois chacune par page."""
+    _remplir(serveur, [_observation() for _ in range(7)] + [_observation(date="2026-02-01")])
+
+    lues = distant.lire_pages(
+        'observations', ['id', 'observation'], 'id', [('eq', 'date', "2026-01-15")], taille_page=3
+    )
+    assert lues['id'].tolist() == [1, 2, 3, 4, 5, 6, 7]
+
+    # Dernière page pleine : une page vide de plus, sans doublon
+    lues = distant.lire_pages('observations', ['id'], 'id', [('lte', 'id', 6)], taille_page=3)
+    assert lues['id'].tolist() == [1, 2, 3, 4, 5, 6]
+
+    assert len(distant.charger_observations(date_debut="2026-01-15", date_fin="2026-01-15")) == 7
+    assert len(distant.charger_observations(departements=["Fonderie"])) == 8
+    assert distant.charger_observations(departements=["Laminoir"]).empty
+
+
+def test_correction_en_conflit_annule_tout(serveur):
+    """Une ligne modifiée entre-temps fait échouer tout le lot, sans écriture partielle."""
+    _remplir(serveur, [_observation(), _observation(observation="Désalignement")])
+    avant = distant.charger_observations()
+    apres = avant.assign(recommandation="Contrôler")
+
+    # Un autre analyste corrige la seconde ligne entre la lecture et l'enregistrement
+    concurrente = avant.iloc[[1]]
+    assert distant.modifier_observations(concurrente, concurrente.assign(analyste="B. Durand"))[0]
+
+    success, message = distant.modifier_observations(avant, apres)
+    assert not success and message.startswith("⚠️")
+    assert distant.charger_observations()['recommandation'].isna().all()
+
+
+def test_correction_de_lignes_identiques(serveur):
+    """Deux lignes identiques sont corrigées une fois chacune ; une de plus est un conflit."""
+    _remplir(serveur, [_observation(), _observation()])
+    avant = distant.charger_observations()
+
+    assert distant.modifier_observations(avant, avant.assign(travaux=["Serrage", "Graissage"]))[0]
+    assert sorted(distant.charger_observations()['travaux']) == ["Graissage", "Serrage"]
+
+    premiere = avant.iloc[[0]]
+    success, message = distant.modifier_observations(premiere, premiere.assign(travaux="X"))
+    assert not success and message.startswith("⚠️")
+
+
+def test_rejeu_idempotent(serveur):
+    """Un envoi rejoué (même clé d'idempotence) ou un lot rejoué ne duplique rien."""
+    _remplir(serveur, [])
+    for _ in range(2):
+        assert distant.sauvegarder_observation(**_observation(), cle_idempotence="poste-1:42")[0]
+        assert distant.sauvegarder_suivi(
+            "EQ-001", "M-CA", "2026-01-15", 1480, 0.8, 3.2, 5.1, cle_idempotence="poste-1:43"
+        )[0]
+    assert len(distant.charger_observations()) == 1
+    assert len(distant.charger_suivi()) == 1
+
+    referentiel = distant.charger_equipements().assign(departement="Utilités")
+    for _ in range(2):
+        assert distant.sauvegarder_equipements_lot(referentiel)[0]
+    assert distant.charger_equipements()['departement'].tolist() == ["Utilités", "Utilités"]
+
+    success, message = distant.sauvegarder_equipement("EQ-001", "Fonderie")
+    assert not success and message.startswith("⚠️")
+
+
+def test_pierres_tombales_des_suppressions_en_cascade(serveur, tmp_path, monkeypatch):
+    """Supprimer un équipement laisse une pierre tombale par ligne, appliquée par la réplique."""
+    monkeypatch.setattr(replique, 'FICHIER_REPLIQUE', str(tmp_path / "replique.sqlite"))
+    monkeypatch.setattr(replique, '_connexion', None)
+
+    _remplir(serveur, [
+        _observation(), _observation(observation="Jeu"), _observation(id_equipement="EQ-002")
+    ])
+    assert distant.sauvegarder_suivi("EQ-001", "M-CA", "2026-01-15", 1480, 0.8, 3.2, 5.1)[0]
+    replique.synchroniser()
+    assert len(replique.charger_observations()) == 3
+
+    assert distant.supprimer_equipement("EQ-001")[0]
+
+    tombes = distant.lire_pages('suppressions', ['table_nom', 'cle'], 'version')
+    assert sorted(map(tuple, tombes.to_numpy().tolist())) == [
+        ('equipements', 'EQ-001'), ('observations', '1'), ('observations', '2'), ('suivi', '1')
+    ]
+
+    replique.synchroniser()
+    assert replique.charger_equipements()['id_equipement'].tolist() == ["EQ-002"]
+    assert replique.charger_observations()['id_equipement'].tolist() == ["EQ-002"]
+    assert replique.charger_suivi().empty
+    replique._connexion.close()
+
+
+def test_erreur_reseau(serveur):
+    """Une panne réseau donne le message d'erreur habituel, sans exception."""
+    serveur.panne = True
+
+    success, message = distant.sauvegarder_observation(**_observation())
+    assert not success and message.startswith("❌")
+    success, message = distant.supprimer_equipement("EQ-001")
+    assert not success and message.startswith("❌")
@@ -0,0 +1,146 @@
+"""
+Tests de la synchronisation de la réplique locale (data/replique.py)
+
+Le serveur simulé reproduit la visibilité PostgreSQL : une version est tirée
+à l'écriture mais la ligne n'est visible qu'à la validation de sa transaction.
+"""
+
+import itertools
+import pandas as pd
+import pytest
+from data import replique
+
+
+class ServeurSimule:
+    """Tables distantes, pierres tombales et transactions ouvertes."""
+
+    def __init__(self):
+        self.versions = itertools.count(1)
+        self.transactions = itertools.count(1)
+        self.ouvertes = set()
+        self.lignes = {table: {} for table in replique.TABLES}
+        self.tombes = []
+        self.en_attente = {}
+
+    def commencer(self):
+        transaction = next(self.transactions)
+        self.ouvertes.add(transaction)
+        self.en_attente[transaction] = []
+        return transaction
+
+    def ecrire(self, transaction, table, **valeurs):
+        """Écrit une ligne (version tirée maintenant, visible à la validation)."""
+        cle = replique.TABLES[table][0]
+        ligne = {**valeurs, 'version': next(self.versions), 'transaction_ecriture': transaction}
+        self.en_attente[transaction].append(lambda: self.lignes[table].__setitem__(ligne[cle], ligne))
+
+    def supprimer(self, transaction, table, cle):
+        tombe = {'version': next(self.versions), 'transaction_ecriture': transaction,
+                 'table_nom': table, 'cle': str(cle)}
+
+        def appliquer():
+            self.lignes[table].pop(cle, None)
+            self.tombes.append(tombe)
+        self.en_attente[transaction].append(appliquer)
+
+    def valider(self, transaction):
+        for operation in self.en_attente.pop(transaction):
+            operation()
+        self.ouvertes.discard(transaction)
+
+    # API de data_manager_supabase utilisée par la réplique
+
+    def horizon(self):
+        return min(self.ouvertes, default=next(self.transactions))
+
+    def lire_pages(self, table, colonnes, cle, filtres=(), selection=None):
+        lignes = self.tombes if table == 'suppressions' else list(self.lignes[table].values())
+        for methode, colonne, valeur in filtres:
+            if methode == 'eq':
+                lignes = [l for l in lignes if l[colonne] == valeur]
+            elif methode == 'gte':
+                lignes = [l for l in lignes if l[colonne] >= valeur]
+            elif methode == 'in_':
+                lignes = [l for l in lignes if l[colonne] in valeur]
+        return pd.DataFrame(sorted(lignes, key=lambda l: l[cle]), columns=colonnes)
+
+
+@pytest.fixture
+def serveur(tmp_path, monkeypatch):
+    """Réplique vide, propre au test, synchronisée avec un serveur simulé."""
+    serveur = ServeurSimule()
+    monkeypatch.setattr(replique, 'FICHIER_REPLIQUE', str(tmp_path / "replique.sqlite"))
+    monkeypatch.setattr(replique, '_connexion', None)
+    monkeypatch.setattr(replique.distant, 'horizon', serveur.horizon)
+    monkeypatch.setattr(replique.distant, 'lire_pages', serveur.lire_pages)
+    yield serveur
+    if replique._connexion is not None:
+        replique._connexion.close()
+
+
+def _observation(identifiant):
+    return {
+        'id': identifiant, 'id_equipement': "EQ-001", 'date': "2026-01-15",
+        'observation': f"Observation {identifiant}", 'recommandation': None,
+        'travaux': None, 'analyste': "A. Martin", 'importance': None,
+    }
+
+
+def test_validation_tardive_de_versions_anciennes(serveur):
+    """Un lot validé après un lot plus récent (versions très inférieures) est reçu."""
+    lente = serveur.commencer()
+    for identifiant in range(1, 501):          # un lot d'insertion : 500 versions
+        serveur.ecrire(lente, 'observations', **_observation(identifiant))
+
+    rapide = serveur.commencer()
+    for identifiant in range(501, 1001):
+        serveur.ecrire(rapide, 'observations', **_observation(identifiant))
+    serveur.valider(rapide)
+
+    replique.synchroniser('observations')
+    assert len(replique.charger_observations()) == 500
+
+    serveur.valider(lente)
+    replique.synchroniser('observations')
+    assert len(replique.charger_observations()) == 1000
+
+
+def test_pierre_tombale_validee_tardivement(serveur):
+    """Une suppression validée après des écritures plus récentes est appliquée."""
+    creation = serveur.commencer()
+    serveur.ecrire(creation, 'observations', **_observation(1))
+    serveur.ecrire(creation, 'observations', **_observation(2))
+    serveur.valider(creation)
+    replique.synchroniser('observations')
+
+    suppression = serveur.commencer()
+    serveur.supprimer(suppression, 'observations', 1)
+    autre = serveur.commencer()
+    serveur.ecrire(autre, 'observations', **_observation(3))
+    serveur.valider(autre)
+    replique.synchroniser('observations')
+    serveur.valider(suppression)
+    replique.synchroniser('observations')
+
+    restantes = replique.charger_observations()['observation'].tolist()
+    assert restantes == ["Observation 2", "Observation 3"]
+
+
+def test_reconciliation_repare_une_divergence(serveur):
+    """Ligne manquante, ligne en trop et ligne périmée sont réparées clé par clé."""
+    transaction = serveur.commencer()
+    for identifiant in (1, 2, 3):
+        serveur.ecrire(transaction, 'observations', **_observation(identifiant))
+    serveur.valider(transaction)
+    replique.synchroniser('observations')
+
+    connexion = replique._connecter()
+    connexion.execute("DELETE FROM observations WHERE id = 1")
+    connexion.execute("UPDATE observations SET observation = 'périmée', version = 0 WHERE id = 2")
+    connexion.execute("INSERT INTO observations (id, id_equipement, version) VALUES (9, 'EQ-009', 1)")
+    connexion.commit()
+
+    assert replique.reconcilier('observations') == {'observations': 3}
+    assert replique.charger_observations()['observation'].tolist() == [
+        "Observation 1", "Observation 2", "Observation 3"
+    ]
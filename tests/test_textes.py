@@ -0,0 +1,60 @@
+"""
+Tests du stockage des textes d'observations (data/textes.py)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from data import textes
+
+
+@pytest.fixture
+def stockage(tmp_path, monkeypatch):
+    """Base de textes vide, propre au test."""
+    monkeypatch.setattr(textes, 'FICHIER_TEXTES', str(tmp_path / "textes.sqlite"))
+    monkeypatch.setattr(textes, '_connexion', None)
+    monkeypatch.setattr(textes, '_connus', None)
+    monkeypatch.setattr(textes, '_version', None)
+    monkeypatch.setattr(textes, 'ACTIVE', True)
+    yield
+    if textes._connexion is not None:
+        textes._connexion.close()
+
+
+def _observations(nombre):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'id_equipement': [f"EQ-{i}" for i in range(nombre)],
+        'date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 300, nombre), unit='D'),
+        'observation': [f"Observation {i}" for i in range(nombre)],
+        'recommandation': [f"Recommandation {i}" for i in range(nombre)],
+        'travaux': [None if i % 3 else f"Travaux {i}" for i in range(nombre)],
+        'analyste': "A. Martin",
+        'importance': "Important",
+    })
+
+
+def test_completer_identifiants_hashes(stockage):
+    """Les identifiants réels (hash int64 signés) retrouvent leurs textes, quelle que soit la sélection."""
+    df = _observations(200)
+    compact = textes.separer(df)
+
+    assert (compact['id_texte'] < 0).any() and (compact['id_texte'] > 0).any()
+
+    for graine in range(100):
+        selection = compact.sample(2, random_state=graine)
+        complet = textes.completer(selection)
+        attendu = df.loc[selection.index]
+
+        assert complet['observation'].tolist() == attendu['observation'].tolist()
+        assert complet['recommandation'].tolist() == attendu['recommandation'].tolist()
+
+
+def test_oublier_conserve_les_references(stockage):
+    """Un texte retiré est supprimé, sauf s'il est encore référencé."""
+    df = _observations(3)
+    ids = textes.separer(df)['id_texte'].tolist()
+
+    textes.oublier(ids[:2], references=[ids[1]])
+
+    assert sorted(textes.lire(ids)['id_texte'].tolist()) == sorted(ids[1:])
@@ -0,0 +1,62 @@
+"""
+Panneau Boîte d'envoi - Saisies en attente d'envoi, conflits et échecs à examiner
+"""
+
+import streamlit as st
+from data import boite_envoi
+
+
+def render():
+    """Affiche l'état de la boîte d'envoi dans la barre latérale"""
+
+    comptes = boite_envoi.longueur()
+    en_attente, conflits, echecs = comptes['en_attente'], comptes['conflits'], comptes['echecs']
+
+    titre = f"📤 Boîte d'envoi ({en_attente} en attente"
+    titre += f", {conflits} conflit(s)" if conflits else ""
+    titre += f", {echecs} échec(s))" if echecs else ")"
+
+    with st.sidebar.expander(titre, expanded=bool(conflits or echecs)):
+        if not en_attente and not conflits and not echecs:
+            st.caption("✅ Toutes les saisies sont envoyées")
+            return
+
+        if en_attente:
+            attente = boite_envoi.lister(boite_envoi.STATUT_EN_ATTENTE)
+            reprises = attente[attente['tentatives'] > 0]
+            st.caption(f"⏳ {en_attente} saisie(s) en cours d'envoi")
+            if boite_envoi.erreur():
+                st.error(f"❌ Envoi en arrière-plan interrompu, nouvel essai en cours ({boite_envoi.erreur()})")
+            if not reprises.empty:
+                st.warning(
+                    f"⚠️ Stockage injoignable : {len(reprises)} saisie(s) en reprise "
+                    f"({reprises['message'].iloc[-1]})"
+                )
+
+        if not conflits and not echecs:
+            return
+
+        st.caption("Saisies refusées ou en échec : réessayez ou abandonnez")
+
+        a_examiner = boite_envoi.lister()
+        a_examiner = a_examiner[a_examiner['statut'].isin([boite_envoi.STATUT_CONFLIT, boite_envoi.STATUT_ECHOUE])]
+
+        for _, envoi in a_examiner.iterrows():
+            charge = envoi['charge']
+            detail = charge.get('point_mesure') or (charge.get('observation') or '')[:40]
+            st.markdown(f"**{charge['id_equipement']}** - {charge['date']} - {detail}")
+            st.caption(envoi['message'])
+
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("🔄 Réessayer", key=f"envoi_reessayer_{envoi['id']}",
+                             use_container_width=True):
+                    success, message = boite_envoi.reessayer(envoi['id'])
+                    (st.success if success else st.warning)(message)
+                    st.rerun()
+            with col2:
+                if st.button("🗑️ Abandonner", key=f"envoi_abandonner_{envoi['id']}",
+                             use_container_width=True):
+                    success, message = boite_envoi.abandonner(envoi['id'])
+                    (st.success if success else st.warning)(message)
+                    st.rerun()
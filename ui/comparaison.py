@@ -0,0 +1,141 @@
+"""
+Comparaison de séries - Plusieurs équipements / points de mesure superposés
+
+Mode « Comparaison » du bloc Tendances de l'onglet Observations : par
+exemple les six points d'un réducteur, ou un même point sur des machines
+sœurs. Les séries sont rééchantillonnées sur une grille de dates commune
+(data/comparaison.py) et tracées en WebGL (Scattergl).
+"""
+
+import streamlit as st
+import plotly.graph_objects as go
+from outils.metriques import chronometre
+from data.depot import charger_suivi, etendue_dates
+from data import comparaison
+from ui import selecteur_equipement
+
+VARIABLES = {
+    'vitesse_rpm': 'Vitesse (RPM)',
+    'twf_rms_g': 'TWF RMS (g)',
+    'crest_factor': 'Crest Factor',
+    'twf_peak_to_peak_g': 'TWF Peak-to-Peak (g)'
+}
+
+
+def render(df_suivi):
+    """Affiche la comparaison de séries (df_suivi : instantané de suivi)"""
+
+    options_equip, format_equip = selecteur_equipement.options(
+        "comparaison_equip", parmi=df_suivi['id_equipement'].unique()
+    )
+
+    col_e, col_p, col_v = st.columns([2, 2, 1])
+
+    with col_e:
+        equipements = st.multiselect(
+            "Équipement(s)",
+            options=options_equip,
+            format_func=format_equip,
+            placeholder="Un équipement (tous ses points) ou des machines sœurs",
+            key="comparaison_equip"
+        )
+
+    # Séries existantes des équipements choisis
+    series_disponibles = df_suivi.loc[
+        df_suivi['id_equipement'].isin(equipements), ['id_equipement', 'point_mesure']
+    ].drop_duplicates()
+
+    with col_p:
+        points = st.multiselect(
+            "Point(s) de mesure",
+            options=sorted(series_disponibles['point_mesure'].unique()),
+            placeholder="Tous les points",
+            key="comparaison_points"
+        )
+
+    with col_v:
+        variable = st.selectbox(
+            "Variable",
+            options=list(VARIABLES),
+            index=1,
+            format_func=lambda x: VARIABLES[x],
+            key="comparaison_variable"
+        )
+
+    if points:
+        series_disponibles = series_disponibles[series_disponibles['point_mesure'].isin(points)]
+    series = sorted(series_disponibles.itertuples(index=False, name=None))
+
+    if not series:
+        st.info("ℹ️ Choisissez un ou plusieurs équipements à comparer")
+        return
+
+    if len(series) > comparaison.SERIES_MAX:
+        st.warning(f"⚠️ {len(series)} séries : seules les {comparaison.SERIES_MAX} premières sont tracées")
+        series = series[:comparaison.SERIES_MAX]
+
+    # Période : données courantes par défaut, archives en reculant la date de début
+    date_defaut = df_suivi['date'].iloc[0].date()
+    date_max = df_suivi['date'].iloc[-1].date()
+    date_min = min(date_defaut, etendue_dates('suivi')[0].date())
+
+    col_d1, col_d2 = st.columns(2)
+
+    with col_d1:
+        date_debut = st.date_input(
+            "Date début",
+            value=date_defaut,
+            min_value=date_min,
+            max_value=date_max,
+            key="comparaison_debut"
+        )
+
+    with col_d2:
+        date_fin = st.date_input(
+            "Date fin",
+            value=date_max,
+            min_value=date_min,
+            max_value=date_max,
+            key="comparaison_fin"
+        )
+
+    if date_debut > date_fin:
+        st.warning("⚠️ La date de début doit précéder la date de fin")
+        return
+
+    valeurs, mesures = comparaison.comparer(
+        series,
+        variable,
+        date_debut,
+        date_fin,
+        df_suivi=charger_suivi(date_debut=date_debut) if date_debut < date_defaut else None
+    )
+
+    with chronometre("observations.figure_comparaison"):
+        fig = go.Figure()
+
+        for nom in valeurs.columns:
+            fig.add_trace(go.Scattergl(
+                x=valeurs.index,
+                y=valeurs[nom],
+                mode='lines',
+                name=f"{nom} ({mesures[nom]})",
+                hovertemplate=f"{nom}<br>%{{x|%d/%m/%Y}} : %{{y:.3f}}<extra></extra>"
+            ))
+
+        fig.update_layout(
+            title=f"{VARIABLES[variable]} - {len(series)} série(s)",
+            xaxis_title="Date",
+            yaxis_title=VARIABLES[variable],
+            hovermode='x unified',
+            height=500,
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+        )
+
+        st.plotly_chart(fig, use_container_width=True)
+
+    pas = (valeurs.index[1] - valeurs.index[0]).days if len(valeurs) > 1 else 1
+    st.caption(
+        f"Grille commune de {len(valeurs)} date(s), pas de {pas} jour(s) : valeurs interpolées "
+        f"entre mesures réelles (nombre de mesures de la période entre parenthèses)"
+    )
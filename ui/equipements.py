@@ -5,11 +5,24 @@ Onglet Équipements - Visualisation et gestion du référentiel
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-from data.data_manager import (
+from outils.metriques import chronometre
+from data.depot import (
     charger_equipements,
     sauvegarder_equipement,
     exporter_equipements_excel
 )
+from data.filtres import filtrer_equipements
+from data import recherche
+from ui import tableau
+from data.import_equipements import (
+    lire_fichier_equipements,
+    calculer_diff_equipements,
+    appliquer_import_equipements,
+    STATUT_NOUVEAU,
+    STATUT_DEPLACE,
+    STATUT_INCHANGE,
+    STATUT_DOUBLON
+)
 
 
 
@@ -35,7 +48,7 @@ def render():
     # BLOC 0 : AJOUT D'ÉQUIPEMENT
     # =============================================================================
 
-    with st.container(border=True):
+    with st.container(border=True), chronometre("equipements.ajout"):
         st.subheader("➕ Ajouter un nouvel équipement")
 
         # ✅ SORTIR le radio button HORS du formulaire pour permettre la réactivité
@@ -110,11 +123,73 @@ def render():
 
     st.markdown("##")
 
+    # =============================================================================
+    # BLOC 0 BIS : IMPORT EN MASSE
+    # =============================================================================
+
+    with st.container(border=True), chronometre("equipements.import"):
+        st.subheader("📤 Import d'une liste d'équipements")
+        st.caption("Fichier Excel ou CSV avec les colonnes id_equipement et departement")
+
+        fichier_import = st.file_uploader(
+            "Liste d'équipements",
+            type=["xlsx", "csv"],
+            key="import_equipements"
+        )
+
+        if fichier_import is not None:
+            try:
+                df_import = lire_fichier_equipements(fichier_import)
+            except ValueError as e:
+                st.error(f"⚠️ {e}")
+                df_import = None
+
+            if df_import is not None:
+                df_diff = calculer_diff_equipements(df_equipements, df_import)
+                compteurs = df_diff['statut'].value_counts()
+
+                # Aperçu des différences
+                col_n, col_d, col_i, col_x = st.columns(4)
+                col_n.metric("Nouveaux", int(compteurs.get(STATUT_NOUVEAU, 0)))
+                col_d.metric("Changement de département", int(compteurs.get(STATUT_DEPLACE, 0)))
+                col_i.metric("Inchangés", int(compteurs.get(STATUT_INCHANGE, 0)))
+                col_x.metric("Doublons (ignorés)", int(compteurs.get(STATUT_DOUBLON, 0)))
+
+                st.dataframe(
+                    df_diff[df_diff['statut'] != STATUT_INCHANGE],
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        'id_equipement': 'ID Équipement',
+                        'departement': 'Département (fichier)',
+                        'departement_actuel': 'Département (actuel)',
+                        'statut': 'Statut'
+                    }
+                )
+
+                a_appliquer = compteurs.get(STATUT_NOUVEAU, 0) + compteurs.get(STATUT_DEPLACE, 0)
+
+                if st.button(
+                        "✅ Appliquer l'import",
+                        type="primary",
+                        disabled=a_appliquer == 0,
+                        key="btn_appliquer_import_equip"
+                ):
+                    success, message = appliquer_import_equipements(df_diff)
+
+                    if success:
+                        st.success(message)
+                        st.rerun()
+                    else:
+                        st.error(message)
+
+    st.markdown("##")
+
     # =============================================================================
     # BLOC 1 : TABLEAU ET FILTRES
     # =============================================================================
 
-    with st.container(border=True):
+    with st.container(border=True), chronometre("equipements.liste"):
         st.subheader("📋 Liste des équipements")
 
         if df_equipements.empty:
@@ -132,28 +207,28 @@ def render():
                     placeholder="Tous les départements"
                 )
 
-            # Application filtre
-            if dept_selectionnes:
-                df_filtered = df_equipements[
-                    df_equipements['departement'].isin(dept_selectionnes)
-                ]
-            else:
-                df_filtered = df_equipements.copy()
+            # Total lu dans l'index de recherche, sans construire la table filtrée
+            nb_filtres = recherche.compter(dept_selectionnes)
 
             with col_stats:
                 st.metric(
                     "Total équipements",
-                    len(df_filtered),
+                    nb_filtres,
                     delta=None
                 )
 
-            # Tableau
-            df_display = df_filtered.sort_values(['departement', 'id_equipement'])
-
-            st.dataframe(
-                df_display,
-                use_container_width=True,
-                hide_index=True,
+            # Tableau paginé (seule la page affichée est envoyée au navigateur)
+            tableau.render(
+                "liste_equipements",
+                "equipements",
+                tris={
+                    "Département, ID": ['departement', 'id_equipement'],
+                    "ID": ['id_equipement'],
+                },
+                filtre=(
+                    (lambda df: df['departement'].isin(dept_selectionnes).to_numpy())
+                    if dept_selectionnes else None
+                ),
                 column_config={
                     'id_equipement': st.column_config.TextColumn(
                         'ID Équipement',
@@ -173,21 +248,24 @@ def render():
     st.markdown("##")
 
     if not df_equipements.empty:
-        with st.container(border=True):
+        with st.container(border=True), chronometre("equipements.export"):
             st.subheader("📥 Export Excel")
 
             col_desc, col_btn = st.columns([3, 1])
 
             with col_desc:
                 if dept_selectionnes:
-                    st.write(f"**{len(df_filtered)}** équipement(s) sélectionné(s)")
+                    st.write(f"**{nb_filtres}** équipement(s) sélectionné(s)")
                     st.caption(f"Départements : {', '.join(dept_selectionnes)}")
                 else:
-                    st.write(f"**{len(df_filtered)}** équipement(s) - Tous départements")
+                    st.write(f"**{nb_filtres}** équipement(s) - Tous départements")
 
             with col_btn:
-                if len(df_filtered) > 0:
-                    fichier_excel = exporter_equipements_excel(df_filtered)
+                if nb_filtres > 0:
+                    # Table filtrée construite pour l'export seulement (trié par département puis ID)
+                    fichier_excel = exporter_equipements_excel(
+                        filtrer_equipements(df_equipements, dept_selectionnes)
+                    )
 
                     # Nom fichier intelligent
                     if dept_selectionnes and len(dept_selectionnes) == 1:
@@ -218,7 +296,7 @@ def render():
     st.markdown("##")
 
     if not df_equipements.empty:
-        with st.container(border=True):
+        with st.container(border=True), chronometre("equipements.statistiques"):
             st.subheader("📊 Statistiques par département")
 
             stats = df_equipements.groupby('departement').size().reset_index(name='Nombre')
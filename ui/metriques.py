@@ -0,0 +1,135 @@
+"""
+Onglet Métriques (administration) - Durées et compteurs des chemins critiques
+"""
+
+import streamlit as st
+from datetime import datetime
+from outils.metriques import (
+    resume_durees,
+    resume_compteurs,
+    format_prometheus,
+    reinitialiser,
+    FICHIER_PROMETHEUS,
+    PORT_PROMETHEUS
+)
+
+
+def render():
+    """Affiche l'onglet Métriques"""
+
+    st.header("📈 Métriques de performance")
+    st.caption("Mesures agrégées depuis le démarrage du processus (toutes sessions)")
+
+    df_durees = resume_durees()
+    df_compteurs = resume_compteurs()
+
+    # =============================================================================
+    # CARTE 1 : INDICATEURS
+    # =============================================================================
+
+    with st.container(border=True):
+        col1, col2, col3, col4 = st.columns(4)
+
+        cache = df_compteurs[df_compteurs['compteur'] == 'cache']
+        hits = cache[cache['etiquettes'].str.contains('resultat=hit')]['valeur'].sum()
+        total_cache = cache['valeur'].sum()
+
+        with col1:
+            st.metric(
+                "Taux de succès du cache",
+                f"{hits / total_cache:.0%}" if total_cache else "—"
+            )
+
+        with col2:
+            octets = df_compteurs[df_compteurs['compteur'] == 'octets_exportes']['valeur'].sum()
+            st.metric("Volume exporté", f"{octets / 1024 / 1024:.2f} Mo")
+
+        with col3:
+            # Chargement parallèle : total proche de la table la plus lente
+            chargement = df_durees.set_index('operation')['p50_ms']
+            if 'chargement_tables' in chargement:
+                st.metric(
+                    "Chargement des tables (p50)",
+                    f"{chargement['chargement_tables']:.0f} ms",
+                    delta=f"table la plus lente : {chargement.get('chargement_table_plus_lente', 0):.0f} ms",
+                    delta_color="off"
+                )
+            else:
+                st.metric("Chargement des tables (p50)", "—")
+
+        with col4:
+            st.metric("Opérations suivies", len(df_durees))
+
+    st.markdown("##")
+
+    # =============================================================================
+    # CARTE 2 : DURÉES
+    # =============================================================================
+
+    with st.container(border=True):
+        st.subheader("⏱️ Durées par opération")
+
+        if df_durees.empty:
+            st.info("ℹ️ Aucune mesure pour le moment")
+        else:
+            st.dataframe(
+                df_durees,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    'operation': 'Opération',
+                    'appels': st.column_config.NumberColumn('Appels', format='%d'),
+                    'total_ms': st.column_config.NumberColumn('Total (ms)', format='%.1f'),
+                    'p50_ms': st.column_config.NumberColumn('p50 (ms)', format='%.2f'),
+                    'p90_ms': st.column_config.NumberColumn('p90 (ms)', format='%.2f'),
+                    'p99_ms': st.column_config.NumberColumn('p99 (ms)', format='%.2f'),
+                    'max_ms': st.column_config.NumberColumn('Max (ms)', format='%.2f')
+                }
+            )
+
+    st.markdown("##")
+
+    # =============================================================================
+    # CARTE 3 : COMPTEURS ET EXPOSITION
+    # =============================================================================
+
+    with st.container(border=True):
+        st.subheader("🔢 Compteurs")
+
+        st.dataframe(
+            df_compteurs,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'compteur': 'Compteur',
+                'etiquettes': 'Étiquettes',
+                'valeur': st.column_config.NumberColumn('Valeur', format='%d')
+            }
+        )
+
+        col_info, col_dl, col_reset = st.columns([2, 1, 1])
+
+        with col_info:
+            if FICHIER_PROMETHEUS:
+                st.caption(f"📄 Fichier Prometheus : `{FICHIER_PROMETHEUS}`")
+            if PORT_PROMETHEUS:
+                st.caption(f"🌐 Point d'accès : `http://127.0.0.1:{PORT_PROMETHEUS}/metrics`")
+            if not FICHIER_PROMETHEUS and not PORT_PROMETHEUS:
+                st.caption(
+                    "Exposition Prometheus désactivée "
+                    "(MAINTENANCE_METRIQUES_FICHIER / MAINTENANCE_METRIQUES_PORT)"
+                )
+
+        with col_dl:
+            st.download_button(
+                label="📥 Format Prometheus",
+                data=format_prometheus(),
+                file_name=f"metriques_{datetime.now().strftime('%Y%m%d_%H%M')}.prom",
+                mime="text/plain",
+                use_container_width=True
+            )
+
+        with col_reset:
+            if st.button("🔄 Réinitialiser", use_container_width=True, key="btn_reset_metriques"):
+                reinitialiser()
+                st.rerun()
@@ -6,13 +6,22 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-from data.data_manager import (
+from outils.metriques import chronometre
+from data.depot import (
     charger_equipements,
     charger_observations,
     charger_suivi,
+    etendue_dates,
+    modifier_observations,
+    CORRECTIONS_DISPONIBLES,
     sauvegarder_observation,
     sauvegarder_suivi
 )
+from data.filtres import filtrer_suivi, filtrer_periode
+from data.import_observations import importer_observations_excel
+from data.constantes import NIVEAUX_IMPORTANCE, POINTS_MESURE
+from data import agregats, textes
+from ui import selecteur_equipement, tableau, comparaison
 
 
 def render():
@@ -33,7 +42,7 @@ def render():
     # BLOC 1 : NOUVELLE OBSERVATION
     # =============================================================================
 
-    with st.container(border=True):
+    with st.container(border=True), chronometre("observations.nouvelle"):
         st.subheader("➕ Nouvelle observation")
 
         # Sélection du département HORS du formulaire
@@ -44,10 +53,10 @@ def render():
             key="dept_select_obs"
         )
 
-        # Filtrage équipements par département
-        equipements_dept = df_equipements[
-            df_equipements['departement'] == dept_selectionne
-        ]
+        # Recherche d'équipement HORS du formulaire (meilleurs résultats du département)
+        options_equip, format_equip = selecteur_equipement.options(
+            "form_equip", departements=[dept_selectionne]
+        )
 
         # Formulaire
         with st.form("form_observation", clear_on_submit=True):
@@ -58,7 +67,8 @@ def render():
             with col1:
                 id_selectionne = st.selectbox(
                     "2️⃣ Équipement",
-                    options=sorted(equipements_dept['id_equipement'].tolist()),
+                    options=options_equip,
+                    format_func=format_equip,
                     key="form_equip"
                 )
 
@@ -112,17 +122,9 @@ def render():
 
             with col_importance:
                 # Menu déroulant pour l'importance
-                importance_options = [
-                    "",  # Option vide par défaut
-                    "Très important",
-                    "Important",
-                    "Moins important",
-                    "Pas de collecte mais important",
-                    "Collecte réalisée"
-                ]
                 importance = st.selectbox(
                     "Importance",
-                    options=importance_options,
+                    options=[""] + NIVEAUX_IMPORTANCE,  # Option vide par défaut
                     key="form_importance",
                     help="Sélectionnez le niveau d'importance (optionnel)"
                 )
@@ -138,7 +140,9 @@ def render():
             # Validation et enregistrement
             if submitted:
                 # Validation champs requis
-                if not observation.strip():
+                if not id_selectionne:
+                    st.error("⚠️ Sélectionnez un équipement")
+                elif not observation.strip():
                     st.error("⚠️ L'observation est requise")
                 elif not analyste.strip():
                     st.error("⚠️ Le nom de l'analyste est requis")
@@ -155,33 +159,168 @@ def render():
                     )
 
                     if success:
+                        selecteur_equipement.noter_utilisation(id_selectionne, analyste.strip())
                         st.success(message)
                         st.rerun()
                     else:
                         st.error(message)
+
+    # =============================================================================
+    # BLOC 1 BIS : IMPORT DE RAPPORTS EXISTANTS
+    # =============================================================================
+
+    st.markdown("##")
+
+    with st.expander("📤 Importer des rapports d'observations (Excel)"), chronometre("observations.import"):
+        st.caption(
+            "Format du rapport exporté : département, ID, date, observation, "
+            "recommandation, travaux, analyste"
+        )
+
+        fichier_rapport = st.file_uploader(
+            "Rapport(s) Excel",
+            type=["xlsx"],
+            key="import_rapport_obs"
+        )
+
+        if fichier_rapport is not None:
+            fichier_rapport.seek(0)
+            analyse_ok, message_analyse, rapport = importer_observations_excel(
+                fichier_rapport,
+                simulation=True
+            )
+
+            if not analyse_ok:
+                st.error(message_analyse)
+
+            col_l, col_i, col_d, col_x = st.columns(4)
+            col_l.metric("Lignes lues", rapport['lues'])
+            col_i.metric("À importer", rapport['importees'])
+            col_d.metric("Doublons", rapport['doublons'])
+            col_x.metric(
+                "Rejetées",
+                rapport['equipements_inconnus'] + rapport['dates_invalides']
+            )
+
+            if rapport['equipements_inconnus']:
+                st.caption(f"🔧 {rapport['equipements_inconnus']} ligne(s) avec un équipement inconnu")
+            if rapport['dates_invalides']:
+                st.caption(f"📅 {rapport['dates_invalides']} ligne(s) avec une date invalide")
+            if rapport['departements_differents']:
+                st.caption(
+                    f"🏢 {rapport['departements_differents']} ligne(s) dont le département "
+                    f"diffère du référentiel (référentiel conservé)"
+                )
+
+            if st.button(
+                    "✅ Importer",
+                    type="primary",
+                    disabled=rapport['importees'] == 0,
+                    key="btn_import_rapport_obs"
+            ):
+                fichier_rapport.seek(0)
+                success, message, _ = importer_observations_excel(fichier_rapport)
+
+                if success:
+                    st.success(message)
+                    st.rerun()
+                else:
+                    st.error(message)
+
+    # =============================================================================
+    # BLOC 1 TER : HISTORIQUE DES OBSERVATIONS
+    # =============================================================================
+
+    st.markdown("##")
+
+    with st.container(border=True), chronometre("observations.historique"):
+        st.subheader("🗂️ Historique des observations")
+
+        if df_observations.empty:
+            st.info("ℹ️ Aucune observation enregistrée")
+        else:
+            dept_historique = st.multiselect(
+                "Département(s)",
+                options=departements,
+                default=None,
+                placeholder="Tous les départements",
+                key="historique_dept"
+            )
+
+            options_historique, format_historique = selecteur_equipement.options(
+                "historique_equip",
+                departements=dept_historique,
+                parmi=df_observations['id_equipement'].unique()
+            )
+            equip_historique = st.multiselect(
+                "Équipement(s)",
+                options=options_historique,
+                format_func=format_historique,
+                default=None,
+                placeholder="Tous les équipements",
+                key="historique_equip"
+            )
+
+            if equip_historique:
+                ids_historique = equip_historique
+            elif dept_historique:
+                ids_historique = df_equipements.loc[
+                    df_equipements['departement'].isin(dept_historique), 'id_equipement'
+                ]
+            else:
+                ids_historique = None
+
+            departement_par_id = df_equipements.set_index('id_equipement')['departement']
+            tris = {
+                "Date": ['date'],
+                "Équipement, date": ['id_equipement', 'date'],
+                "Analyste, date": ['analyste', 'date'],
+                "Importance, date": ['importance', 'date'],
+            }
+
+            # Textes et département lus pour la seule page affichée
+            tableau.render(
+                "historique_obs",
+                "observations",
+                tris={
+                    libelle: colonnes for libelle, colonnes in tris.items()
+                    if set(colonnes) <= set(df_observations.columns)
+                },
+                filtre=(
+                    (lambda df: df['id_equipement'].isin(ids_historique).to_numpy())
+                    if ids_historique is not None else None
+                ),
+                preparer=lambda page: textes.completer(page).assign(
+                    departement=lambda df: df['id_equipement'].map(departement_par_id)
+                ),
+                descendant=True,
+                modifier=modifier_observations if CORRECTIONS_DISPONIBLES else None,
+                modifiables=['observation', 'recommandation', 'travaux', 'analyste', 'importance'],
+                column_config={
+                    'id_equipement': 'ID Équipement',
+                    'date': st.column_config.DateColumn('Date', format="DD/MM/YYYY"),
+                    'observation': st.column_config.TextColumn('Observation', width='large'),
+                    'recommandation': st.column_config.TextColumn('Recommandation', width='medium'),
+                    'travaux': st.column_config.TextColumn('Travaux', width='medium'),
+                    'analyste': 'Analyste',
+                    'importance': st.column_config.SelectboxColumn('Importance', options=NIVEAUX_IMPORTANCE),
+                    'departement': 'Département'
+                }
+            )
+
     # =============================================================================
     # BLOC 2 : SAISIE DONNÉES DE SUIVI
     # =============================================================================
 
     st.markdown("##")
 
-    with st.container(border=True):
+    with st.container(border=True), chronometre("observations.saisie_suivi"):
         st.subheader("📊 Saisie des mesures de suivi")
         st.caption("Enregistrement des données vibratoires et de vitesse")
 
         # Chargement des données de suivi
         df_suivi = charger_suivi()
 
-        # Liste des points de mesure
-        POINTS_MESURE = [
-            "M-COA",
-            "M-CA",
-            "Entrée Réducteur",
-            "Sortie Réducteur",
-            "P-CA",
-            "P-COA"
-        ]
-
         # Sélection du département HORS du formulaire
         dept_suivi = st.selectbox(
             "1️⃣ Département",
@@ -189,10 +328,10 @@ def render():
             key="dept_select_suivi"
         )
 
-        # Filtrage équipements par département
-        equipements_dept_suivi = df_equipements[
-            df_equipements["departement"] == dept_suivi
-            ]
+        # Recherche d'équipement HORS du formulaire (meilleurs résultats du département)
+        options_suivi, format_suivi = selecteur_equipement.options(
+            "form_suivi_equip", departements=[dept_suivi]
+        )
 
         # Formulaire de saisie
         with st.form("form_suivi", clear_on_submit=True):
@@ -203,7 +342,8 @@ def render():
             with col1:
                 id_suivi = st.selectbox(
                     "2️⃣ Équipement",
-                    options=sorted(equipements_dept_suivi["id_equipement"].tolist()),
+                    options=options_suivi,
+                    format_func=format_suivi,
                     key="form_suivi_equip"
                 )
 
@@ -287,7 +427,9 @@ def render():
 
             # Validation et enregistrement
             if submitted_suivi:
-                if (
+                if not id_suivi:
+                    st.error("⚠️ Sélectionnez un équipement")
+                elif (
                         vitesse_rpm == 0.0
                         and twf_rms_g == 0.0
                         and crest_factor == 0.0
@@ -306,6 +448,7 @@ def render():
                     )
 
                     if success:
+                        selecteur_equipement.noter_utilisation(id_suivi)
                         st.success(message)
                         st.rerun()
                     else:
@@ -317,7 +460,7 @@ def render():
 
     st.markdown("##")
 
-    with st.container(border=True):
+    with st.container(border=True), chronometre("observations.tendances"):
         st.subheader("📈 Visualisation des tendances")
 
         # Charger les données de suivi
@@ -327,17 +470,31 @@ def render():
             st.info("ℹ️ Aucune donnée de suivi disponible")
             return
 
-        # Conversion dates
-        df_suivi['date'] = pd.to_datetime(df_suivi['date'], errors='coerce')
+        mode_tendances = st.radio(
+            "Affichage",
+            options=["Une série", "Comparaison"],
+            horizontal=True,
+            key="mode_tendances",
+            help="Comparaison : plusieurs équipements ou points de mesure superposés"
+        )
+
+        if mode_tendances == "Comparaison":
+            comparaison.render(df_suivi)
+            return
 
         # FILTRES
+        options_tendances, format_tendances = selecteur_equipement.options(
+            "id_equip_tendances", parmi=df_suivi['id_equipement'].unique()
+        )
+
         col_f1, col_f2 = st.columns(2)
 
         with col_f1:
             # Filtre ID équipement
             id_equip_suivi = st.selectbox(
                 "ID Équipement",
-                options=sorted(df_suivi['id_equipement'].unique()),
+                options=options_tendances,
+                format_func=format_tendances,
                 key="id_equip_tendances"
             )
 
@@ -351,17 +508,17 @@ def render():
             )
 
         # Filtrer les données
-        df_filtered_suivi = df_suivi[
-            (df_suivi['id_equipement'] == id_equip_suivi) &
-            (df_suivi['point_mesure'] == point_mesure_suivi)
-        ].copy()
+        df_filtered_suivi = filtrer_suivi(
+            df_suivi,
+            equipements=[id_equip_suivi],
+            points=[point_mesure_suivi]
+        )
 
         if df_filtered_suivi.empty:
             st.warning("⚠️ Aucune donnée pour cette sélection")
             return
 
-        # Trier par date
-        df_filtered_suivi = df_filtered_suivi.sort_values('date')
+        # Déjà trié par date au chargement
 
         st.markdown("##")
 
@@ -379,12 +536,14 @@ def render():
 
         if mode_filtrage == "Période personnalisée":
             with col_t2:
-                date_min_suivi = df_filtered_suivi['date'].min().date()
-                date_max_suivi = df_filtered_suivi['date'].max().date()
+                date_defaut_suivi = df_filtered_suivi['date'].iloc[0].date()
+                date_max_suivi = df_filtered_suivi['date'].iloc[-1].date()
+                # Les archives (stockage partitionné) restent accessibles en reculant la date de début
+                date_min_suivi = min(date_defaut_suivi, etendue_dates('suivi')[0].date())
 
                 date_debut_suivi = st.date_input(
                     "Date début",
-                    value=date_min_suivi,
+                    value=date_defaut_suivi,
                     min_value=date_min_suivi,
                     max_value=date_max_suivi,
                     key="date_debut_tendances"
@@ -399,13 +558,32 @@ def render():
                     key="date_fin_tendances"
                 )
 
-            # Appliquer le filtre de dates
-            df_filtered_suivi = df_filtered_suivi[
-                (df_filtered_suivi['date'].dt.date >= date_debut_suivi) &
-                (df_filtered_suivi['date'].dt.date <= date_fin_suivi)
-            ]
+            # Longue période : agrégats hebdomadaires ou mensuels, mesures brutes en vue rapprochée
+            niveau = agregats.choisir_niveau(date_debut_suivi, date_fin_suivi)
+
+            if niveau == agregats.NIVEAU_BRUT:
+                if date_debut_suivi < date_defaut_suivi:
+                    # Période archivée : mesures relues avec les archives
+                    df_filtered_suivi = filtrer_suivi(
+                        charger_suivi(date_debut=date_debut_suivi),
+                        equipements=[id_equip_suivi],
+                        points=[point_mesure_suivi]
+                    )
+
+                # Appliquer le filtre de dates
+                df_filtered_suivi = filtrer_periode(
+                    df_filtered_suivi,
+                    date_debut_suivi,
+                    date_fin_suivi
+                )
+            else:
+                df_agregats = agregats.serie(
+                    niveau, id_equip_suivi, point_mesure_suivi,
+                    date_debut_suivi, date_fin_suivi
+                )
         else:
             # Prendre les 22 dernières observations (ou moins si insuffisant)
+            niveau = agregats.NIVEAU_BRUT
             df_filtered_suivi = df_filtered_suivi.tail(22)
 
         st.markdown("##")
@@ -433,58 +611,121 @@ def render():
         st.markdown("##")
 
         # CRÉATION DU GRAPHIQUE
-        fig = go.Figure()
-
-        # Palette de couleurs
-        couleurs = {
-            'vitesse_rpm': '#1f77b4',
-            'twf_rms_g': '#ff7f0e',
-            'crest_factor': '#2ca02c',
-            'twf_peak_to_peak_g': '#d62728'
-        }
+        with chronometre("observations.figure_tendances"):
+            fig = go.Figure()
 
-        for var in variables_selectionnees:
-            fig.add_trace(go.Scatter(
-                x=df_filtered_suivi['date'],
-                y=df_filtered_suivi[var],
-                mode='lines+markers',
-                name=variables_disponibles[var],
-                line=dict(color=couleurs[var], width=2),
-                marker=dict(size=6)
-            ))
-
-        # Mise en forme
-        fig.update_layout(
-            title=f"Tendances - {id_equip_suivi} - {point_mesure_suivi}",
-            xaxis_title="Date",
-            yaxis_title="Valeurs",
-            hovermode='x unified',
-            height=500,
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
+            # Palette de couleurs
+            couleurs = {
+                'vitesse_rpm': '#1f77b4',
+                'twf_rms_g': '#ff7f0e',
+                'crest_factor': '#2ca02c',
+                'twf_peak_to_peak_g': '#d62728'
+            }
+
+            for var in variables_selectionnees:
+                if niveau == agregats.NIVEAU_BRUT:
+                    fig.add_trace(go.Scatter(
+                        x=df_filtered_suivi['date'],
+                        y=df_filtered_suivi[var],
+                        mode='lines+markers',
+                        name=variables_disponibles[var],
+                        line=dict(color=couleurs[var], width=2),
+                        marker=dict(size=6)
+                    ))
+                    continue
+
+                # Bande min-max puis moyenne de chaque période
+                fig.add_trace(go.Scatter(
+                    x=df_agregats['periode'],
+                    y=df_agregats[f"{var}_max"],
+                    mode='lines',
+                    line=dict(width=0),
+                    showlegend=False,
+                    hoverinfo='skip',
+                    legendgroup=var
+                ))
+                fig.add_trace(go.Scatter(
+                    x=df_agregats['periode'],
+                    y=df_agregats[f"{var}_min"],
+                    mode='lines',
+                    line=dict(width=0),
+                    fill='tonexty',
+                    fillcolor=couleurs[var],
+                    opacity=0.2,
+                    showlegend=False,
+                    hoverinfo='skip',
+                    legendgroup=var
+                ))
+                fig.add_trace(go.Scatter(
+                    x=df_agregats['periode'],
+                    y=df_agregats[f"{var}_moyenne"],
+                    customdata=df_agregats[[f"{var}_min", f"{var}_max", f"{var}_derniere", f"{var}_nombre"]],
+                    mode='lines+markers',
+                    name=variables_disponibles[var],
+                    line=dict(color=couleurs[var], width=2),
+                    marker=dict(size=5),
+                    legendgroup=var,
+                    hovertemplate=(
+                        "moy. %{y:.2f} (min %{customdata[0]:.2f}, max %{customdata[1]:.2f}, "
+                        "dernière %{customdata[2]:.2f}, %{customdata[3]} mesure(s))"
+                    )
+                ))
+
+            # Mise en forme
+            fig.update_layout(
+                title=f"Tendances - {id_equip_suivi} - {point_mesure_suivi}",
+                xaxis_title="Date",
+                yaxis_title="Valeurs",
+                hovermode='x unified',
+                height=500,
+                legend=dict(
+                    orientation="h",
+                    yanchor="bottom",
+                    y=1.02,
+                    xanchor="right",
+                    x=1
+                )
             )
-        )
 
-        st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(fig, use_container_width=True)
 
         # Statistiques
         st.markdown("##")
-        st.caption(f"**{len(df_filtered_suivi)}** mesure(s) affichée(s)")
+        if niveau == agregats.NIVEAU_BRUT:
+            st.caption(f"**{len(df_filtered_suivi)}** mesure(s) affichée(s)")
+        else:
+            libelle = "hebdomadaires" if niveau == agregats.NIVEAU_SEMAINE else "mensuelles"
+            st.caption(
+                f"**{len(df_agregats)}** moyenne(s) {libelle} (bande min-max), "
+                f"périodes entières ; mesures brutes sur {agregats.SEUIL_BRUT_JOURS} jours ou moins"
+            )
 
         # Tableau récapitulatif
         with st.expander("📊 Statistiques détaillées"):
+            if niveau == agregats.NIVEAU_BRUT:
+                statistiques = {
+                    var: {
+                        'min': df_filtered_suivi[var].min(),
+                        'max': df_filtered_suivi[var].max(),
+                        'moyenne': df_filtered_suivi[var].mean(),
+                        'ecart_type': df_filtered_suivi[var].std(),
+                    }
+                    for var in variables_selectionnees
+                }
+            else:
+                statistiques = agregats.statistiques(
+                    niveau, id_equip_suivi, point_mesure_suivi,
+                    date_debut_suivi, date_fin_suivi
+                )
+
             stats_data = []
             for var in variables_selectionnees:
                 stats_data.append({
                     'Variable': variables_disponibles[var],
-                    'Minimum': f"{df_filtered_suivi[var].min():.2f}",
-                    'Maximum': f"{df_filtered_suivi[var].max():.2f}",
-                    'Moyenne': f"{df_filtered_suivi[var].mean():.2f}",
-                    'Écart-type': f"{df_filtered_suivi[var].std():.2f}"
+                    'Minimum': f"{statistiques[var]['min']:.2f}",
+                    'Maximum': f"{statistiques[var]['max']:.2f}",
+                    'Moyenne': f"{statistiques[var]['moyenne']:.2f}",
+                    'Écart-type': f"{statistiques[var]['ecart_type']:.2f}"
                 })
 
             st.dataframe(
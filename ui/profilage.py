@@ -0,0 +1,69 @@
+"""
+Panneau Profilage - Fonctions chaudes et téléchargement des profils de rerun
+"""
+
+import os
+import streamlit as st
+from outils.profilage import lister_profils, fonctions_chaudes, lire_contexte
+
+
+def render():
+    """Affiche le panneau de profilage dans la barre latérale"""
+
+    profils = lister_profils()
+
+    with st.sidebar.expander("🔬 Profilage", expanded=True):
+        if not profils:
+            st.info("ℹ️ Aucun profil enregistré")
+            return
+
+        dossier = st.selectbox(
+            "Rerun profilé",
+            options=profils,
+            format_func=lambda d: (
+                f"{lire_contexte(d)['date'][:19].replace('T', ' ')} "
+                f"({lire_contexte(d).get('duree_s', 0):.2f} s)"
+            ),
+            key="profil_selectionne"
+        )
+
+        contexte = lire_contexte(dossier)
+        st.caption(f"⏱️ Durée : **{contexte.get('duree_s', 0):.3f} s**")
+
+        # Fonctions chaudes
+        st.dataframe(
+            fonctions_chaudes(dossier, nombre=15),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'fonction': 'Fonction',
+                'appels': st.column_config.NumberColumn('Appels', format='%d'),
+                'temps_propre_ms': st.column_config.NumberColumn('Propre (ms)', format='%.1f'),
+                'temps_cumule_ms': st.column_config.NumberColumn('Cumulé (ms)', format='%.1f')
+            }
+        )
+
+        nom = os.path.basename(dossier)
+
+        with open(os.path.join(dossier, "piles.folded"), 'rb') as f:
+            st.download_button(
+                label="📥 Flamegraph (.folded)",
+                data=f.read(),
+                file_name=f"piles_{nom}.folded",
+                mime="text/plain",
+                use_container_width=True,
+                key="dl_profil_folded"
+            )
+
+        with open(os.path.join(dossier, "profil.prof"), 'rb') as f:
+            st.download_button(
+                label="📥 Profil cProfile (.prof)",
+                data=f.read(),
+                file_name=f"profil_{nom}.prof",
+                mime="application/octet-stream",
+                use_container_width=True,
+                key="dl_profil_prof"
+            )
+
+        with st.popover("État des widgets"):
+            st.json(contexte.get('etat_widgets', {}))
@@ -0,0 +1,95 @@
+"""
+Sélecteur d'équipement avec recherche - Récents et favoris par analyste
+
+Le champ de recherche se place hors des formulaires (une saisie doit
+relancer le script) ; le selectbox / multiselect de l'appelant ne reçoit
+que les meilleurs résultats (``recherche.RESULTATS_MAX``).
+"""
+
+import streamlit as st
+from data import recherche, preferences
+
+CLE_ANALYSTE = "analyste_courant"
+
+
+def render_analyste():
+    """Nom de l'analyste dans la barre latérale (récents et favoris)"""
+    st.sidebar.text_input(
+        "👤 Analyste",
+        key=CLE_ANALYSTE,
+        placeholder="Nom, pour les récents et favoris"
+    )
+
+
+def analyste_courant():
+    """Analyste renseigné dans la barre latérale ('' sinon)."""
+    return st.session_state.get(CLE_ANALYSTE, '')
+
+
+def noter_utilisation(id_equipement, analyste=None):
+    """Ajoute un équipement aux récents de l'analyste (après un enregistrement)."""
+    preferences.ajouter_recent(analyste_courant() or analyste, id_equipement)
+
+
+def _favoris(cle, analyste, favoris, resultats):
+    """Bouton ⭐ : édition des favoris de l'analyste."""
+    with st.popover("⭐", use_container_width=True):
+        if not analyste:
+            st.caption("Renseignez l'analyste (barre latérale) pour enregistrer des favoris")
+            return
+
+        selection = st.multiselect(
+            "Favoris",
+            options=sorted(set(favoris) | set(resultats)),
+            default=favoris,
+            key=f"{cle}_favoris"
+        )
+        if st.button("💾 Enregistrer", key=f"{cle}_favoris_enregistrer", use_container_width=True):
+            success, message = preferences.definir_favoris(analyste, selection)
+            (st.success if success else st.error)(message)
+
+
+def options(cle, departements=None, parmi=None):
+    """Affiche le champ de recherche et retourne les options du sélecteur ``cle``.
+
+    Args:
+        cle: Clé du selectbox / multiselect de l'appelant (préfixe des clés
+            du champ de recherche et des favoris).
+        departements: Départements retenus (None ou vide = tous).
+        parmi: ID autorisés (None = tout le référentiel).
+
+    Returns:
+        Tuple (options, format_func) : favoris puis récents en tête, sélection
+        courante conservée ; format_func marque les favoris d'une étoile.
+    """
+    analyste = analyste_courant()
+    favoris = preferences.favoris(analyste)
+    recents = preferences.recents(analyste)
+
+    col_recherche, col_favoris = st.columns([5, 1])
+
+    with col_recherche:
+        terme = st.text_input(
+            "🔎 Rechercher un équipement",
+            key=f"{cle}_recherche",
+            placeholder="Début, partie ou approximation de l'ID"
+        )
+
+    resultats = recherche.chercher(terme, departements, parmi, prioritaires=favoris + recents)
+
+    # Valeurs déjà choisies : gardées si elles respectent encore les filtres
+    courante = st.session_state.get(cle)
+    choisies = [courante] if isinstance(courante, str) else list(courante or [])
+    resultats += [i for i in recherche.retenus(choisies, departements, parmi) if i not in resultats]
+
+    with col_favoris:
+        st.write("")
+        st.write("")
+        _favoris(cle, analyste, favoris, resultats)
+
+    total = recherche.compter(departements, parmi)
+    if total > len(resultats):
+        st.caption(f"{len(resultats)} équipement(s) affiché(s) sur {total} : précisez la recherche")
+
+    favoris = set(favoris)
+    return resultats, lambda i: f"⭐ {i}" if i in favoris else i
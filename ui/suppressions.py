@@ -3,9 +3,9 @@ Onglet Suppressions - Zone critique pour corrections
 """
 
 import streamlit as st
-import pandas as pd
 from datetime import datetime
-from data.data_manager import (
+from outils.metriques import chronometre
+from data.depot import (
     charger_equipements,
     charger_observations,
     charger_suivi,
@@ -13,6 +13,8 @@ from data.data_manager import (
     supprimer_equipement,
     supprimer_suivi
 )
+from data.filtres import dates_disponibles as lister_dates
+from ui import selecteur_equipement
 
 
 def render():
@@ -33,7 +35,7 @@ def render():
     # =============================================================================
     # CARTE 1 : SUPPRESSION D'OBSERVATIONS
     # =============================================================================
-    with st.container(border=True):
+    with st.container(border=True), chronometre("suppressions.observation"):
         st.subheader("🔴 Supprimer une observation")
         st.caption("Suppression ciblée par département, équipement et date")
 
@@ -63,12 +65,16 @@ def render():
                 st.warning(f"⚠️ Aucune observation dans le département '{dept_obs_select}'")
             else:
                 # Sélection équipement HORS formulaire
+                options_obs, format_obs = selecteur_equipement.options(
+                    "suppr_obs_equip", departements=[dept_obs_select], parmi=ids_avec_obs
+                )
                 col1, col2, col3 = st.columns([2, 2, 1])
 
                 with col1:
                     id_obs_suppr = st.selectbox(
                         "2️⃣ Équipement",
-                        options=sorted(equipements_avec_obs['id_equipement'].tolist()),
+                        options=options_obs,
+                        format_func=format_obs,
                         key="suppr_obs_equip"
                     )
 
@@ -76,13 +82,9 @@ def render():
                     # Filtrer les dates disponibles pour cet équipement
                     obs_equip = df_observations[
                         df_observations['id_equipement'] == id_obs_suppr
-                    ].copy()
+                    ]
 
-                    obs_equip['date'] = pd.to_datetime(obs_equip['date'])
-                    dates_disponibles = sorted(
-                        obs_equip['date'].dt.date.unique(),
-                        reverse=True
-                    )
+                    dates_disponibles = lister_dates(obs_equip)
 
                     if dates_disponibles:
                         date_obs_suppr = st.selectbox(
@@ -160,7 +162,7 @@ def render():
 
     st.markdown("##")
 
-    with st.container(border=True):
+    with st.container(border=True), chronometre("suppressions.suivi"):
         st.subheader("🔴 Supprimer un suivi de mesure")
         st.caption("Suppression ciblée par département, équipement, point de mesure et date")
 
@@ -190,12 +192,16 @@ def render():
                 st.warning(f"⚠️ Aucun suivi dans le département '{dept_suivi_select}'")
             else:
                 # Sélection équipement
+                options_suivi, format_suivi = selecteur_equipement.options(
+                    "suppr_suivi_equip", departements=[dept_suivi_select], parmi=ids_avec_suivi
+                )
                 col1, col2, col3, col4 = st.columns([2, 2, 2, 1])
 
                 with col1:
                     id_suivi_suppr = st.selectbox(
                         "2️⃣ Équipement",
-                        options=sorted(equipements_avec_suivi['id_equipement'].tolist()),
+                        options=options_suivi,
+                        format_func=format_suivi,
                         key="suppr_suivi_equip"
                     )
 
@@ -203,7 +209,7 @@ def render():
                     # Filtrer les points de mesure disponibles pour cet équipement
                     suivi_equip = df_suivi[
                         df_suivi['id_equipement'] == id_suivi_suppr
-                    ].copy()
+                    ]
 
                     points_disponibles = sorted(suivi_equip['point_mesure'].unique())
 
@@ -222,13 +228,9 @@ def render():
                         # Filtrer les dates disponibles
                         suivi_point = suivi_equip[
                             suivi_equip['point_mesure'] == point_suivi_suppr
-                        ].copy()
+                        ]
 
-                        suivi_point['date'] = pd.to_datetime(suivi_point['date'])
-                        dates_suivi_disponibles = sorted(
-                            suivi_point['date'].dt.date.unique(),
-                            reverse=True
-                        )
+                        dates_suivi_disponibles = lister_dates(suivi_point)
 
                         if dates_suivi_disponibles:
                             date_suivi_suppr = st.selectbox(
@@ -322,7 +324,7 @@ def render():
 
     st.markdown("##")
 
-    with st.container(border=True):
+    with st.container(border=True), chronometre("suppressions.equipement"):
         st.subheader("🔴 Supprimer un équipement")
         st.caption("⚠️ Suppression de l'équipement ET de toutes ses observations")
 
@@ -342,12 +344,16 @@ def render():
         if equipements_dept_equip.empty:
             st.warning(f"⚠️ Aucun équipement dans le département '{dept_equip_select}'")
         else:
+            options_equip, format_equip = selecteur_equipement.options(
+                "suppr_equip_id", departements=[dept_equip_select]
+            )
             col1, col2 = st.columns([3, 1])
 
             with col1:
                 id_equip_suppr = st.selectbox(
                     "2️⃣ Sélectionner l'équipement à supprimer",
-                    options=sorted(equipements_dept_equip['id_equipement'].tolist()),
+                    options=options_equip,
+                    format_func=format_equip,
                     key="suppr_equip_id"
                 )
 
@@ -372,7 +378,7 @@ def render():
                     st.session_state.confirm_equip_delete = False
 
                 # Premier clic : demander confirmation
-                if not st.session_state.confirm_equip_delete:
+                if id_equip_suppr and not st.session_state.confirm_equip_delete:
                     if st.button(
                             "🗑️ Supprimer",
                             type="secondary",
@@ -383,7 +389,7 @@ def render():
                         st.rerun()
 
             # Afficher la confirmation si demandée
-            if st.session_state.confirm_equip_delete:
+            if id_equip_suppr and st.session_state.confirm_equip_delete:
                 st.markdown("---")
                 st.error(
                     f"🚨 **ATTENTION - SUPPRESSION DÉFINITIVE**\n\n"
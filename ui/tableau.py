@@ -0,0 +1,128 @@
+"""
+Tableau paginé - Tri et pagination côté serveur (data/pagination.py)
+
+Le tri se choisit au-dessus du tableau : les en-têtes de st.dataframe ne
+trieraient que la page affichée. En mode correction, la page s'affiche
+dans un st.data_editor ; seules les lignes modifiées sont transmises,
+comparées aux lignes affichées à l'ouverture de l'éditeur.
+"""
+
+import streamlit as st
+from data import pagination
+
+
+def _lignes_modifiees(avant, apres, colonnes):
+    """(avant, après) restreints aux lignes dont une des colonnes a changé."""
+    colonnes = list(colonnes)
+    egales = (avant[colonnes] == apres[colonnes]) | (avant[colonnes].isna() & apres[colonnes].isna())
+    differe = ~egales.all(axis=1)
+    return avant[differe], apres[differe]
+
+
+def _editer(cle, cle_lus, df_page, modifiables, modifier, column_config):
+    """Page dans un éditeur ; enregistre le diff en une écriture groupée.
+
+    Les lignes affichées à l'ouverture de l'éditeur sont conservées en
+    session (``cle_lus``) : st.data_editor repère les modifications par
+    position, le diff et la version attendue portent donc sur ces lignes,
+    même si une écriture d'un autre analyste a déplacé celles de la page.
+    """
+    lus = st.session_state.get(cle_lus)
+    if lus is None or lus[0] != cle:
+        lus = (cle, df_page)
+        st.session_state[cle_lus] = lus
+    df_page = lus[1]
+
+    apres = st.data_editor(
+        df_page,
+        use_container_width=True,
+        hide_index=True,
+        column_config=column_config,
+        disabled=[c for c in df_page.columns if c not in modifiables],
+        key=cle
+    )
+    avant, apres = _lignes_modifiees(df_page, apres, modifiables)
+
+    col_info, col_btn = st.columns([3, 1])
+    with col_info:
+        st.caption(f"✏️ {len(avant)} ligne(s) modifiée(s)")
+    with col_btn:
+        if st.button(
+                "💾 Enregistrer les corrections",
+                type="primary",
+                disabled=avant.empty,
+                use_container_width=True,
+                key=f"{cle}_enregistrer"
+        ):
+            success, message = modifier(avant, apres)
+            # Éditeur réinitialisé sur la page rechargée (corrections ou version courante)
+            del st.session_state[cle]
+            del st.session_state[cle_lus]
+            if success:
+                st.success(message)
+                st.rerun()
+            else:
+                st.error(message)
+
+
+def render(cle, table, tris, filtre=None, preparer=None, descendant=False,
+           column_config=None, taille=pagination.TAILLE_PAGE, modifier=None, modifiables=()):
+    """Affiche une page d'une table avec les contrôles de tri et de navigation.
+
+    Args:
+        cle: Préfixe des clés des widgets.
+        table: 'equipements', 'observations' ou 'suivi'.
+        tris: {libellé: colonnes de tri} ; le premier est le tri par défaut.
+        filtre: Fonction instantané -> masque des lignes retenues.
+        preparer: Fonction appliquée à la seule page avant affichage
+            (textes, colonnes calculées).
+        descendant: Ordre décroissant par défaut.
+        column_config: Configuration des colonnes de st.dataframe.
+        taille: Lignes par page.
+        modifier: Fonction (avant, après) -> (succès, message) enregistrant
+            les lignes modifiées ; None = tableau en lecture seule.
+        modifiables: Colonnes modifiables en mode correction.
+
+    Returns:
+        Nombre total de lignes retenues par le filtre.
+    """
+    col_tri, col_ordre, col_page = st.columns([2, 1, 1])
+
+    with col_tri:
+        libelle = st.selectbox("Trier par", options=list(tris), key=f"{cle}_tri")
+
+    with col_ordre:
+        st.write("")
+        decroissant = st.toggle("Décroissant", value=descendant, key=f"{cle}_decroissant")
+        correction = modifier is not None and st.toggle("✏️ Corriger", key=f"{cle}_correction")
+
+    cle_page = f"{cle}_page"
+    df_page, total, numero = pagination.page(
+        table, tris[libelle], decroissant, filtre,
+        numero=st.session_state.get(cle_page, 1), taille=taille
+    )
+    # Page ramenée dans les bornes (filtre plus restrictif) avant de créer le widget
+    st.session_state[cle_page] = numero
+    pages = max(1, -(-total // taille))
+
+    with col_page:
+        st.number_input(f"Page (sur {pages})", min_value=1, max_value=pages, step=1, key=cle_page)
+
+    if preparer is not None:
+        df_page = preparer(df_page)
+
+    if correction:
+        # Une clé d'éditeur par page et par tri : les modifications en cours ne glissent pas d'une page à l'autre
+        _editer(
+            f"{cle}_editeur_{libelle}_{decroissant}_{numero}", f"{cle}_lus",
+            df_page, modifiables, modifier, column_config
+        )
+    else:
+        st.session_state.pop(f"{cle}_lus", None)
+        st.dataframe(df_page, use_container_width=True, hide_index=True, column_config=column_config)
+
+    if total:
+        debut = (numero - 1) * taille + 1
+        st.caption(f"Lignes {debut} à {debut + len(df_page) - 1} sur {total}")
+
+    return total
@@ -0,0 +1,156 @@
+"""
+Onglet Tableau de bord - Observations et couverture des mesures
+
+Tous les graphiques sont calculés à partir du cube pré-agrégé
+(data/cube.py) : quelques centaines de cellules, sans regrouper
+l'historique à chaque affichage.
+"""
+
+import streamlit as st
+import plotly.graph_objects as go
+from outils.metriques import chronometre
+from data import cube
+from data.constantes import NIVEAUX_IMPORTANCE
+
+# Ordre d'affichage des niveaux (vide = non renseigné)
+IMPORTANCES = [cube.NON_RENSEIGNE] + NIVEAUX_IMPORTANCE
+
+ANALYSTES_AFFICHES = 10
+
+
+def _choisir_periode(mois):
+    """Sélecteur de la période (en mois) ; retourne (debut, fin)."""
+    if len(mois) == 1:
+        st.caption(f"Période : {mois[0]:%m/%Y}")
+        return mois[0], mois[0]
+
+    return st.select_slider(
+        "Période",
+        options=mois,
+        value=(mois[0], mois[-1]),
+        format_func=lambda m: f"{m:%m/%Y}",
+        key="tableau_de_bord_periode"
+    )
+
+
+def render():
+    """Affiche l'onglet Tableau de bord"""
+
+    st.header("📊 Tableau de bord")
+    st.caption("Compteurs pré-agrégés, mis à jour à chaque enregistrement")
+
+    mois = cube.valeurs('observations', 'mois')
+    if not mois:
+        st.info("ℹ️ Aucune observation enregistrée")
+        return
+
+    col_dept, col_periode = st.columns([1, 2])
+
+    with col_dept:
+        departements = st.multiselect(
+            "Département(s)",
+            options=cube.valeurs('observations', 'departement'),
+            placeholder="Tous les départements",
+            key="tableau_de_bord_dept"
+        )
+
+    with col_periode:
+        debut, fin = _choisir_periode(mois)
+
+    filtres = {'departement': departements or None, 'debut': debut, 'fin': fin}
+
+    # =============================================================================
+    # CARTE 1 : INDICATEURS
+    # =============================================================================
+
+    par_importance = cube.agreger('observations', ['importance'], **filtres).set_index('importance')['observations']
+    par_analyste = cube.agreger('observations', ['analyste'], **filtres).sort_values('observations', ascending=False)
+
+    with st.container(border=True):
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            st.metric("Observations", int(par_importance.sum()))
+        with col2:
+            st.metric("Très importantes", int(par_importance.get("Très important", 0)))
+        with col3:
+            st.metric("Analystes", int((par_analyste['analyste'] != cube.NON_RENSEIGNE).sum()))
+
+    # =============================================================================
+    # CARTE 2 : OBSERVATIONS PAR MOIS ET IMPORTANCE
+    # =============================================================================
+
+    with st.container(border=True), chronometre("tableau_de_bord.figures"):
+        st.subheader("📅 Observations par mois")
+
+        par_mois = cube.agreger('observations', ['mois', 'importance'], **filtres).pivot_table(
+            index='mois', columns='importance', values='observations', fill_value=0
+        )
+
+        fig = go.Figure()
+        for importance in IMPORTANCES:
+            if importance in par_mois.columns:
+                fig.add_trace(go.Bar(x=par_mois.index, y=par_mois[importance], name=importance))
+
+        fig.update_layout(
+            barmode='stack',
+            xaxis_title="Mois",
+            yaxis_title="Observations",
+            height=400,
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+    # =============================================================================
+    # CARTE 3 : DÉPARTEMENTS ET ANALYSTES
+    # =============================================================================
+
+    with st.container(border=True):
+        col_gauche, col_droite = st.columns(2)
+
+        with col_gauche:
+            st.subheader("🏭 Par département")
+            par_dept = cube.agreger('observations', ['departement', 'importance'], **filtres).pivot_table(
+                index='departement', columns='importance', values='observations', fill_value=0
+            )
+            par_dept = par_dept[[i for i in IMPORTANCES if i in par_dept.columns]]
+            par_dept['Total'] = par_dept.sum(axis=1)
+            st.dataframe(par_dept.sort_values('Total', ascending=False), use_container_width=True)
+
+        with col_droite:
+            st.subheader("👤 Par analyste")
+            premiers = par_analyste.head(ANALYSTES_AFFICHES).iloc[::-1]
+            fig = go.Figure(go.Bar(x=premiers['observations'], y=premiers['analyste'], orientation='h'))
+            fig.update_layout(xaxis_title="Observations", height=350, margin=dict(l=0, r=0, t=10, b=0))
+            st.plotly_chart(fig, use_container_width=True)
+
+    # =============================================================================
+    # CARTE 4 : COUVERTURE DES MESURES PAR POINT
+    # =============================================================================
+
+    with st.container(border=True):
+        st.subheader("📡 Couverture des mesures par point")
+
+        couverture = cube.couverture(('departement',), **filtres)
+        if couverture.empty:
+            st.info("ℹ️ Aucune mesure de suivi sur la période")
+            return
+
+        taux = couverture.pivot_table(index='departement', columns='point_mesure', values='taux')
+        fig = go.Figure(go.Heatmap(
+            z=taux.to_numpy() * 100,
+            x=taux.columns,
+            y=taux.index,
+            colorscale='Blues',
+            zmin=0,
+            zmax=100,
+            colorbar=dict(title="%"),
+            hovertemplate="%{y} · %{x} : %{z:.0f} %<extra></extra>"
+        ))
+        fig.update_layout(height=max(250, 40 * len(taux)), margin=dict(l=0, r=0, t=10, b=0))
+        st.plotly_chart(fig, use_container_width=True)
+
+        st.caption(
+            f"Part des mois où chaque équipement du département a au moins une mesure au point "
+            f"({int(couverture['mesures'].sum())} mesure(s) sur la période)"
+        )
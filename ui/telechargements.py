@@ -3,16 +3,23 @@ Onglet Téléchargements - Export Excel filtré
 """
 
 import streamlit as st
-import pandas as pd
 from datetime import datetime
-from data.data_manager import (
+from outils.metriques import chronometre
+from data.depot import (
     charger_equipements,
     charger_observations,
     charger_suivi,
+    etendue_dates,
     exporter_observations_excel,
     exporter_equipements_excel,
     exporter_suivi_excel
 )
+from data.filtres import filtrer_equipements, filtrer_observations, filtrer_suivi
+from data.constantes import NIVEAUX_IMPORTANCE
+from data import rapprochement
+
+LIGNES_APERCU = 500
+from ui import selecteur_equipement
 
 
 def render():
@@ -34,15 +41,17 @@ def render():
     # CARTE 1 : RAPPORT D'OBSERVATIONS
     # =============================================================================
 
-    with st.container(border=True):
+    with st.container(border=True), chronometre("telechargements.observations"):
         st.subheader("📊 Rapport d'observations")
 
-        if df_observations.empty:
+        # Période complète, archives comprises
+        etendue_obs = etendue_dates('observations')
+
+        if etendue_obs is None:
             st.info("ℹ️ Aucune observation à exporter")
         else:
-            # Conversion dates
-            df_obs = df_observations.copy()
-            df_obs['date'] = pd.to_datetime(df_obs['date'], errors='coerce')
+            # Dates typées et triées au chargement
+            df_obs = df_observations
 
             # Filtres
             col_f1, col_f2 = st.columns(2)
@@ -57,17 +66,15 @@ def render():
                 )
 
             with col_f2:
-                # Équipements disponibles
-                if dept_filter:
-                    equip_disponibles = df_equipements[
-                        df_equipements['departement'].isin(dept_filter)
-                    ]['id_equipement'].tolist()
-                else:
-                    equip_disponibles = df_equipements['id_equipement'].tolist()
+                # Équipements disponibles (meilleurs résultats de la recherche)
+                options_obs, format_obs = selecteur_equipement.options(
+                    "dl_obs_equip", departements=dept_filter
+                )
 
                 equip_filter = st.multiselect(
                     "Équipement(s)",
-                    options=sorted(equip_disponibles),
+                    options=options_obs,
+                    format_func=format_obs,
                     default=None,
                     placeholder="Tous les équipements",
                     key="dl_obs_equip"
@@ -76,13 +83,15 @@ def render():
             # Intervalle dates
             col_d1, col_d2 = st.columns(2)
 
-            date_min = df_obs['date'].min().date()
-            date_max = df_obs['date'].max().date()
+            date_min = etendue_obs[0].date()
+            date_max = etendue_obs[1].date()
+            # Par défaut, données courantes : les archives ne sont lues que sur demande
+            date_defaut = df_obs['date'].iloc[0].date() if not df_obs.empty else date_min
 
             with col_d1:
                 date_debut = st.date_input(
                     "Date début",
-                    value=date_min,
+                    value=date_defaut,
                     min_value=date_min,
                     max_value=date_max,
                     key="dl_obs_date_start"
@@ -99,22 +108,60 @@ def render():
 
             st.markdown("##")
 
-            # Application filtres
-            df_filtered = df_obs.copy()
+            # Application filtres (archives ajoutées si la période les atteint)
+            df_filtered = filtrer_observations(
+                charger_observations(date_debut=date_debut),
+                df_equipements,
+                departements=dept_filter,
+                equipements=equip_filter,
+                date_debut=date_debut,
+                date_fin=date_fin
+            )
+
+            # Mesures les plus proches de chaque observation (vue et feuille d'export)
+            col_m1, col_m2 = st.columns([2, 1])
+
+            with col_m1:
+                avec_mesures = st.checkbox(
+                    "🔗 Ajouter la feuille « Mesures proches » (mesure la plus proche par point de mesure)",
+                    key="dl_obs_mesures"
+                )
 
-            if dept_filter:
-                ids_dept = df_equipements[
-                    df_equipements['departement'].isin(dept_filter)
-                ]['id_equipement'].tolist()
-                df_filtered = df_filtered[df_filtered['id_equipement'].isin(ids_dept)]
+            with col_m2:
+                ecart_max = st.number_input(
+                    "Écart maximal (jours, 0 = sans limite)",
+                    min_value=0,
+                    value=30,
+                    step=1,
+                    key="dl_obs_ecart_max"
+                )
 
-            if equip_filter:
-                df_filtered = df_filtered[df_filtered['id_equipement'].isin(equip_filter)]
+            df_suivi_proches = charger_suivi(date_debut=date_debut) if avec_mesures else None
 
-            df_filtered = df_filtered[
-                (df_filtered['date'].dt.date >= date_debut) &
-                (df_filtered['date'].dt.date <= date_fin)
-            ]
+            if avec_mesures and not df_filtered.empty:
+                with st.expander("🔗 Observations et mesures les plus proches"):
+                    importance_vue = st.multiselect(
+                        "Importance",
+                        options=NIVEAUX_IMPORTANCE,
+                        default=None,
+                        placeholder="Toutes",
+                        key="dl_obs_mesures_importance"
+                    )
+                    df_vue = df_filtered
+                    if importance_vue:
+                        df_vue = df_vue[df_vue['importance'].isin(importance_vue)]
+
+                    proches = rapprochement.mesures_proches(
+                        df_vue, df_suivi_proches, ecart_max or None
+                    ).iloc[::-1]
+
+                    st.dataframe(
+                        proches.head(LIGNES_APERCU).rename(columns=rapprochement.LIBELLES),
+                        use_container_width=True,
+                        hide_index=True
+                    )
+                    if len(proches) > LIGNES_APERCU:
+                        st.caption(f"{LIGNES_APERCU} lignes les plus récentes sur {len(proches)} : l'export les contient toutes")
 
             # Bouton export
             col_info, col_btn = st.columns([3, 1])
@@ -131,7 +178,9 @@ def render():
 
             with col_btn:
                 if len(df_filtered) > 0:
-                    fichier = exporter_observations_excel(df_filtered, df_equipements)
+                    fichier = exporter_observations_excel(
+                        df_filtered, df_equipements, df_suivi_proches, ecart_max or None
+                    )
 
                     # Nom fichier intelligent
                     timestamp = datetime.now().strftime('%Y%m%d_%H%M')
@@ -159,7 +208,7 @@ def render():
 
     st.markdown("##")
 
-    with st.container(border=True):
+    with st.container(border=True), chronometre("telechargements.equipements"):
         st.subheader("📦 Liste des équipements")
 
         # Filtre département
@@ -174,12 +223,7 @@ def render():
         st.markdown("##")
 
         # Application filtre
-        if dept_filter_equip:
-            df_filtered_equip = df_equipements[
-                df_equipements['departement'].isin(dept_filter_equip)
-            ]
-        else:
-            df_filtered_equip = df_equipements.copy()
+        df_filtered_equip = filtrer_equipements(df_equipements, dept_filter_equip)
 
         # Bouton export
         col_info2, col_btn2 = st.columns([3, 1])
@@ -220,25 +264,30 @@ def render():
 
     st.markdown("##")
 
-    with st.container(border=True):
+    with st.container(border=True), chronometre("telechargements.suivi"):
         st.subheader("📈 Rapport de suivi de mesures")
         st.caption("Export professionnel avec tableaux et graphiques intégrés")
 
-        if df_suivi.empty:
+        etendue_suivi = etendue_dates('suivi')
+
+        if etendue_suivi is None:
             st.info("ℹ️ Aucune donnée de suivi à exporter")
         else:
-            # Conversion dates
-            df_suivi_export = df_suivi.copy()
-            df_suivi_export['date'] = pd.to_datetime(df_suivi_export['date'], errors='coerce')
+            # Dates typées et triées au chargement
+            df_suivi_export = df_suivi
 
             # Filtres
             col_f1, col_f2, col_f3 = st.columns(3)
 
             with col_f1:
                 # Filtre ID équipement
+                options_suivi, format_suivi = selecteur_equipement.options(
+                    "dl_suivi_equip", parmi=df_suivi_export['id_equipement'].unique()
+                )
                 equip_suivi_filter = st.multiselect(
                     "ID Équipement(s)",
-                    options=sorted(df_suivi_export['id_equipement'].unique()),
+                    options=options_suivi,
+                    format_func=format_suivi,
                     default=None,
                     placeholder="Tous les équipements",
                     key="dl_suivi_equip"
@@ -264,13 +313,16 @@ def render():
             # Intervalle dates
             col_d1, col_d2 = st.columns(2)
 
-            date_min_suivi = df_suivi_export['date'].min().date()
-            date_max_suivi = df_suivi_export['date'].max().date()
+            date_min_suivi = etendue_suivi[0].date()
+            date_max_suivi = etendue_suivi[1].date()
+            date_defaut_suivi = (
+                df_suivi_export['date'].iloc[0].date() if not df_suivi_export.empty else date_min_suivi
+            )
 
             with col_d1:
                 date_debut_suivi = st.date_input(
                     "Date début",
-                    value=date_min_suivi,
+                    value=date_defaut_suivi,
                     min_value=date_min_suivi,
                     max_value=date_max_suivi,
                     key="dl_suivi_date_start"
@@ -287,23 +339,14 @@ def render():
 
             st.markdown("##")
 
-            # Application filtres
-            df_filtered_suivi = df_suivi_export.copy()
-
-            if equip_suivi_filter:
-                df_filtered_suivi = df_filtered_suivi[
-                    df_filtered_suivi['id_equipement'].isin(equip_suivi_filter)
-                ]
-
-            if points_suivi_filter:
-                df_filtered_suivi = df_filtered_suivi[
-                    df_filtered_suivi['point_mesure'].isin(points_suivi_filter)
-                ]
-
-            df_filtered_suivi = df_filtered_suivi[
-                (df_filtered_suivi['date'].dt.date >= date_debut_suivi) &
-                (df_filtered_suivi['date'].dt.date <= date_fin_suivi)
-            ]
+            # Application filtres (archives ajoutées si la période les atteint)
+            df_filtered_suivi = filtrer_suivi(
+                charger_suivi(date_debut=date_debut_suivi),
+                equipements=equip_suivi_filter,
+                points=points_suivi_filter,
+                date_debut=date_debut_suivi,
+                date_fin=date_fin_suivi
+            )
 
             # Bouton export
             col_info3, col_btn3 = st.columns([3, 1])